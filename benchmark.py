@@ -0,0 +1,240 @@
+import argparse
+import json
+import math
+import random
+import sys
+import time
+from collections import deque
+
+from comparesortingalgorithm import ALGORITHMS, PLAIN_ALGORITHMS, QUADRATIC, count_operations, cached_count
+from comparesearch import SEARCHES, PLAIN_SEARCHES, count_search
+from datasets import PRESETS, dataset
+from instrument import OpCounter
+from runcache import RunCache, CACHE_DIR
+from sortingalgorithm import merge_sort, merge_sort_bottom_up
+
+# ---------------- Headless Benchmark ---------------- #
+# Drives the algorithm generators without any Tk window, so the numbers
+# reflect algorithm + event cost only, never animation sleeps.
+#   traced: drain the step generator, counting events
+#   plain:  run the untraced implementation of the same algorithm
+# Traced rows also carry exact operation counts from one untimed, instrumented
+# run per input (see instrument.py). Those counts are kept in the run cache
+# (runcache.py), so repeating a benchmark only re-times it; timings are never
+# cached.
+
+MERGE_SORTS = {
+    "Merge Sort": merge_sort,
+    "Merge Sort (Bottom-Up)": merge_sort_bottom_up
+}
+
+def make_array(n, distribution, seed):
+    # A seeded datasets.py preset, values in [1, n]
+    return dataset(distribution, n, seed=seed).tolist()
+
+def drain(gen):
+    # Consumes a generator at C speed and returns how many items it yielded
+    last = deque(enumerate(gen, 1), maxlen=1)
+    return last[0][0] if last else 0
+
+def percentile(values, q):
+    # Nearest-rank percentile
+    ordered = sorted(values)
+    k = max(0, math.ceil(q / 100 * len(ordered)) - 1)
+    return ordered[k]
+
+def average_ops(counters):
+    if not counters:
+        return None
+    totals = {}
+    for counter in counters:
+        for key, value in counter.as_dict().items():
+            totals[key] = totals.get(key, 0) + value
+    return {key: value / len(counters) for key, value in totals.items()}
+
+def summarize(suite, name, mode, n, distribution, times, events, counters=()):
+    # `events` holds the event count of each traced run (empty when plain);
+    # `counters` the OpCounters of the instrumented runs, averaged per input
+    total = sum(times)
+    return {
+        "suite": suite,
+        "algorithm": name,
+        "mode": mode,
+        "n": n,
+        "distribution": distribution,
+        "runs": len(times),
+        "events": sum(events) // len(events) if events else 0,
+        "mean": total / len(times),
+        "min": min(times),
+        "p50": percentile(times, 50),
+        "p90": percentile(times, 90),
+        "p99": percentile(times, 99),
+        "events_per_sec": sum(events) / total if total and events else 0.0,
+        "ops": average_ops(counters)
+    }
+
+# ---------------- Suites ---------------- #
+
+def time_sort(run, base):
+    arr = base[:]
+    start = time.perf_counter()
+    result = run(arr)
+    elapsed = time.perf_counter() - start
+    if arr != sorted(base):
+        raise AssertionError("benchmark run produced an unsorted result")
+    return elapsed, result
+
+def operation_counts(cache, name, alg, base):
+    if cache is None:
+        return count_operations(alg, base)
+    return cached_count(cache, name, alg, base)
+
+def search_counts(cache, name, arr, targets):
+    def run():
+        counter = OpCounter()
+        for t in targets:
+            count_search(SEARCHES[name], arr, t, counter)
+        return counter.as_dict()
+    if cache is None:
+        return OpCounter.from_dict(run())
+    key = cache.key(name, SEARCHES[name], arr, {"targets": targets})
+    return OpCounter.from_dict(cache.metrics(key, run))
+
+def bench_sorts(names, sizes, distributions, seeds, repeats, modes, quadratic_limit,
+                counts=True, traced=ALGORITHMS, plain=PLAIN_ALGORITHMS, suite="sort", cache=None):
+    rows = []
+    for n in sizes:
+        for distribution in distributions:
+            inputs = [make_array(n, distribution, seed) for seed in seeds]
+            for name in names:
+                if name in QUADRATIC and n > quadratic_limit:
+                    print(f"skipping {name} at n={n} (above --quadratic-limit)", file=sys.stderr)
+                    continue
+                for mode in modes:
+                    if mode == "plain" and name not in plain:
+                        continue
+                    times, events, counters = [], [], []
+                    if mode == "traced" and counts:
+                        counters = [operation_counts(cache, name, traced[name], base) for base in inputs]
+                    for base in inputs:
+                        for _ in range(repeats):
+                            if mode == "traced":
+                                elapsed, count = time_sort(lambda a: drain(traced[name](a)), base)
+                                events.append(count)
+                            else:
+                                elapsed, _ = time_sort(plain[name], base)
+                            times.append(elapsed)
+                    rows.append(summarize(suite, name, mode, n, distribution, times, events, counters))
+    return rows
+
+def bench_searches(names, sizes, distributions, seeds, repeats, modes, queries, counts=True,
+                   cache=None):
+    # Each timed run performs `queries` searches: half for values present in
+    # the array, half for a value that is not. Binary search gets sorted input.
+    rows = []
+    for n in sizes:
+        for distribution in distributions:
+            for name in names:
+                for mode in modes:
+                    times, events, counters = [], [], []
+                    for seed in seeds:
+                        arr = make_array(n, distribution, seed)
+                        if name == "Binary":
+                            arr.sort()
+                        rng = random.Random(seed)
+                        missing = max(arr, default=0) + 1
+                        targets = [rng.choice(arr) if arr and k % 2 == 0 else missing
+                                   for k in range(queries)]
+                        if mode == "traced" and counts:
+                            counters.append(search_counts(cache, name, arr, targets))
+                        for _ in range(repeats):
+                            start = time.perf_counter()
+                            if mode == "traced":
+                                events.append(sum(drain(SEARCHES[name](arr, t)) for t in targets))
+                            else:
+                                for t in targets:
+                                    PLAIN_SEARCHES[name](arr, t)
+                            times.append(time.perf_counter() - start)
+                    rows.append(summarize("search", name, mode, n, distribution, times, events, counters))
+    return rows
+
+# ---------------- Reporting ---------------- #
+
+def print_table(rows, out=sys.stdout):
+    w = max([24] + [len(r["algorithm"]) + 2 for r in rows])
+    header = (f"{'suite':<7}{'algorithm':<{w}}{'mode':<8}{'n':>9} {'distribution':<14}"
+              f"{'mean s':>10}{'p50 s':>10}{'p90 s':>10}{'p99 s':>10}{'events':>12}{'events/s':>12}")
+    print(header, file=out)
+    print("-" * len(header), file=out)
+    for r in rows:
+        print(f"{r['suite']:<7}{r['algorithm']:<{w}}{r['mode']:<8}{r['n']:>9} {r['distribution']:<14}"
+              f"{r['mean']:>10.4f}{r['p50']:>10.4f}{r['p90']:>10.4f}{r['p99']:>10.4f}"
+              f"{r['events']:>12}{r['events_per_sec']:>12.0f}", file=out)
+
+    counted = [r for r in rows if r["ops"]]
+    if not counted:
+        return
+    header = (f"{'suite':<7}{'algorithm':<{w}}{'n':>9} {'distribution':<14}"
+              f"{'comparisons':>14}{'swaps':>12}{'writes':>12}{'reads':>14}{'aux peak':>10}")
+    print(file=out)
+    print(header, file=out)
+    print("-" * len(header), file=out)
+    for r in counted:
+        ops = r["ops"]
+        print(f"{r['suite']:<7}{r['algorithm']:<{w}}{r['n']:>9} {r['distribution']:<14}"
+              f"{ops['comparisons']:>14.0f}{ops['swaps']:>12.0f}{ops['writes']:>12.0f}"
+              f"{ops['reads']:>14.0f}{ops['aux_peak']:>10.0f}", file=out)
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Headless benchmark for the sorting and search generators")
+    parser.add_argument("--suite", choices=["sort", "search", "merge", "all"], default="sort")
+    parser.add_argument("--algorithms", nargs="+",
+                        help="names from ALGORITHMS / SEARCHES (default: all in the suite)")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000])
+    parser.add_argument("--distributions", nargs="+", choices=PRESETS, default=["uniform"])
+    parser.add_argument("--seeds", type=int, nargs="+", default=[0])
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--mode", choices=["traced", "plain", "both"], default="both")
+    parser.add_argument("--queries", type=int, default=100, help="searches per timed search run")
+    parser.add_argument("--quadratic-limit", type=int, default=20000)
+    parser.add_argument("--no-counts", action="store_true",
+                        help="skip the instrumented runs that collect operation counts")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="always recompute operation counts instead of using the run cache")
+    parser.add_argument("--cache-dir", default=CACHE_DIR)
+    parser.add_argument("--json", metavar="PATH", help="also write the results as JSON ('-' for stdout)")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    modes = ["traced", "plain"] if args.mode == "both" else [args.mode]
+    common = (args.sizes, args.distributions, args.seeds, args.repeats, modes)
+    cache = None if args.no_cache else RunCache(args.cache_dir)
+    rows = []
+    if args.suite in ("sort", "all"):
+        names = [a for a in (args.algorithms or ALGORITHMS) if a in ALGORITHMS]
+        rows += bench_sorts(names, *common, args.quadratic_limit, counts=not args.no_counts,
+                            cache=cache)
+    if args.suite in ("merge", "all"):
+        names = [a for a in (args.algorithms or MERGE_SORTS) if a in MERGE_SORTS]
+        rows += bench_sorts(names, *common, args.quadratic_limit, counts=False,
+                            traced=MERGE_SORTS, plain={}, suite="merge")
+    if args.suite in ("search", "all"):
+        names = [a for a in (args.algorithms or SEARCHES) if a in SEARCHES]
+        rows += bench_searches(names, *common, args.queries, counts=not args.no_counts,
+                               cache=cache)
+
+    print_table(rows)
+    if cache is not None and cache.hits + cache.misses:
+        print(f"run cache: {cache.summary()} ({cache.directory})", file=sys.stderr)
+    if args.json == "-":
+        json.dump(rows, sys.stdout, indent=2)
+        print()
+    elif args.json:
+        with open(args.json, "w") as f:
+            json.dump(rows, f, indent=2)
+    return rows
+
+# -------------------- Main -------------------- #
+if __name__ == "__main__":
+    main()
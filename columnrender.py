@@ -0,0 +1,244 @@
+import numpy as np
+from matplotlib.artist import Artist
+from matplotlib.colors import to_rgba
+
+# ---------------- Pixel-Column Rendering ---------------- #
+# Past a few thousand elements one bar per element is slow to draw and most
+# bars are narrower than a pixel anyway. Instead the array is aggregated onto
+# the pixel columns of the axes and drawn as a single RGBA image the size of
+# the axes. Each column shows the span every element in it covers (0 up to
+# the column minimum) solid, and the span only some cover (up to the column
+# maximum) in a lighter shade, so outliers and disorder stay visible.
+# Highlighted elements recolor the whole column they fall in.
+# The image is already at screen resolution, so it is handed to the renderer
+# as is; an AxesImage would resample and mask it on every frame.
+
+PIXEL_MODE_THRESHOLD = 1000   # arrays longer than this are drawn as columns
+RANGE_ALPHA = 0.35
+
+def use_columns(n):
+    return n > PIXEL_MODE_THRESHOLD
+
+def column_starts(n, width):
+    # First element of each column; repeats when there are fewer elements
+    # than columns, so one element then spans several columns
+    return (np.arange(width) * n) // width
+
+def columns_of(indices, starts):
+    # All columns that show any of the given element indices. An element
+    # covers columns first..last; marking +1 at first and -1 past last and
+    # taking the running sum flags every covered column at once.
+    if not isinstance(indices, np.ndarray):
+        indices = np.fromiter(indices, dtype=np.int64)
+    if not indices.size:
+        return np.empty(0, dtype=np.int64)
+    first = np.searchsorted(starts, indices, side='left')
+    last = np.searchsorted(starts, indices, side='right') - 1
+    first = np.minimum(first, last)
+    marks = np.zeros(len(starts) + 1, dtype=np.int64)
+    np.add.at(marks, first, 1)
+    np.add.at(marks, last + 1, -1)
+    return np.flatnonzero(np.cumsum(marks[:-1]))
+
+def column_extrema(values, starts):
+    return np.minimum.reduceat(values, starts), np.maximum.reduceat(values, starts)
+
+def paint_columns(mins, maxs, colors, height, ylim):
+    # (height, len(mins), 4) uint8 image of the given columns, row 0 at the
+    # bottom of the axes; colors holds one RGBA row (0-255) per column
+    low, high = ylim
+    y = low + (np.arange(height)[:, None] + 0.5) * (high - low) / height
+    solid = (y >= np.minimum(0, maxs)) & (y <= np.maximum(0, mins))
+    some = (y >= np.minimum(0, mins)) & (y <= np.maximum(0, maxs))
+    light = colors.copy()
+    light[:, 3] = light[:, 3] * RANGE_ALPHA
+    out = np.where(solid[..., None], colors[None], 0)
+    return np.where((some & ~solid)[..., None], light[None], out).astype(np.uint8)
+
+def rgba255(color):
+    return np.array(to_rgba(color)) * 255
+
+def value_limits(values):
+    low = min(0, values.min()) if values.size else 0
+    high = values.max() if values.size else 1
+    return low, high + max(1, (high - low) * 0.05)
+
+def axes_pixels(ax):
+    return max(1, int(round(ax.bbox.width))), max(1, int(round(ax.bbox.height)))
+
+class ColumnImage(Artist):
+    # RGBA pixels (row 0 at the bottom) pinned to the lower left of the axes
+    def __init__(self, ax, pixels, **kwargs):
+        super().__init__()
+        self.ax = ax
+        self.pixels = pixels
+        self.set_clip_box(ax.bbox)
+        self.set(**kwargs)
+
+    def set_data(self, pixels):
+        self.pixels = pixels
+        self.stale = True
+
+    def draw(self, renderer):
+        if not self.get_visible():
+            return
+        gc = renderer.new_gc()
+        gc.set_clip_rectangle(self.get_clip_box())
+        renderer.draw_image(gc, round(self.ax.bbox.x0), round(self.ax.bbox.y0), self.pixels)
+        gc.restore()
+        self.stale = False
+
+def draw_columns(ax, values, color='lightblue', overlays=()):
+    # One-off, non-animated column plot for views that redraw the whole
+    # figure anyway. overlays is a sequence of (indices, color), applied in
+    # order so later ones win.
+    values = np.asarray(values)
+    n = len(values)
+    width, height = axes_pixels(ax)
+    ylim = value_limits(values)
+    if n:
+        starts = column_starts(n, width)
+        mins, maxs = column_extrema(values, starts)
+        colors = np.tile(rgba255(color), (width, 1))
+        for indices, overlay_color in overlays:
+            colors[columns_of(indices, starts)] = rgba255(overlay_color)
+        img = paint_columns(mins, maxs, colors, height, ylim)
+    else:
+        img = np.zeros((height, width, 4), dtype=np.uint8)
+    image = ax.add_artist(ColumnImage(ax, img))
+    ax.set_xlim(-0.5, max(n, 1) - 0.5)
+    ax.set_ylim(*ylim)
+    return image
+
+class ColumnRenderer:
+    """
+    Drop-in replacement for BarRenderer on large arrays: same reset / update
+    / set_base_color / set_partitions / redraw interface, but the array is
+    one animated image of per-pixel-column min/max aggregates. Updates only
+    recompute the columns whose elements changed, then redraw the image over
+    the cached background.
+    """
+    def __init__(self, ax, canvas, color='black', highlight_color='grey', **bar_kwargs):
+        # bar_kwargs (edge color, line width) have no meaning for columns
+        self.ax = ax
+        self.canvas = canvas
+        self.color = color
+        self.highlight_color = highlight_color
+        self.image = None
+        self.values = np.empty(0)
+        self.highlighted = set()
+        self.highlight_cols = set()
+        self.partitions = []
+        self.size = None
+        self.background = None
+        self.cid = self.canvas.mpl_connect("draw_event", self.on_draw)
+
+    def disconnect(self):
+        self.canvas.mpl_disconnect(self.cid)
+
+    def reset(self, arr, draw=True):
+        self.ax.clear()
+        self.values = np.array(arr)
+        n = len(self.values)
+        self.ylim = value_limits(self.values)
+        self.image = self.ax.add_artist(ColumnImage(self.ax, np.zeros((1, 1, 4), dtype=np.uint8),
+                                                    animated=True))
+        self.ax.set_xlim(-0.5, max(n, 1) - 0.5)
+        self.ax.set_ylim(*self.ylim)
+        self.highlighted = set()
+        self.highlight_cols = set()
+        self.partitions = []
+        self.size = None
+        self.layout()
+        if draw:
+            self.canvas.draw()
+
+    def layout(self):
+        # (Re)build every column when the axes size in pixels changes
+        size = axes_pixels(self.ax)
+        if size == self.size:
+            return
+        self.size = size
+        width, height = size
+        self.pixels = np.zeros((height, width, 4), dtype=np.uint8)
+        if not len(self.values):
+            self.image.set_data(self.pixels)
+            return
+        self.starts = column_starts(len(self.values), width)
+        self.ends = np.append(self.starts[1:], len(self.values))
+        self.highlight_cols = set(columns_of(self.highlighted, self.starts).tolist())
+        self.mins, self.maxs = column_extrema(self.values, self.starts)
+        self.paint(np.arange(width))
+
+    def paint(self, cols):
+        colors = np.tile(rgba255(self.color), (len(cols), 1))
+        for lo, hi, color in self.partitions:
+            first = self.starts[cols]
+            colors[(first >= lo) & (first < hi)] = rgba255(color)
+        lit = [k for k, c in enumerate(cols) if c in self.highlight_cols]
+        colors[lit] = rgba255(self.highlight_color)
+        self.pixels[:, cols] = paint_columns(self.mins[cols], self.maxs[cols], colors,
+                                             self.size[1], self.ylim)
+        self.image.set_data(self.pixels)
+
+    def on_draw(self, event):
+        if self.image is None:
+            return
+        self.layout()
+        self.background = self.canvas.copy_from_bbox(self.ax.bbox)
+        self.ax.draw_artist(self.image)
+
+    def update(self, arr, highlights=(), dirty=(), blit=True):
+        # Returns the display region that was repainted, or None
+        if self.image is None or len(arr) != len(self.values):
+            self.reset(arr)
+        highlights = set(highlights)
+        if (not highlights and not dirty) or len(dirty) + len(highlights) > len(self.values) // 16:
+            # Steps without positions may have rewritten anything, and past a
+            # few positions one vectorized comparison beats looking each up
+            new = np.array(arr)
+            changed = np.flatnonzero(new != self.values)
+            self.values = new
+        else:
+            changed = [i for i in set(dirty) | highlights if arr[i] != self.values[i]]
+            for i in changed:
+                self.values[i] = arr[i]
+        if not len(self.values):
+            return None
+
+        cols = set(columns_of(changed, self.starts).tolist())
+        if len(cols) > len(self.starts) // 4:
+            self.mins, self.maxs = column_extrema(self.values, self.starts)
+        else:
+            for c in cols:
+                segment = self.values[self.starts[c]:max(self.ends[c], self.starts[c] + 1)]
+                self.mins[c], self.maxs[c] = segment.min(), segment.max()
+        if highlights != self.highlighted:
+            lit = set(columns_of(highlights, self.starts).tolist())
+            cols |= lit ^ self.highlight_cols
+            self.highlight_cols = lit
+            self.highlighted = highlights
+        if self.background is None or not cols:
+            return None
+        self.paint(np.array(sorted(cols)))
+        return self.redraw(blit)
+
+    def set_base_color(self, color, blit=True):
+        self.color = color
+        if len(self.values):
+            self.paint(np.arange(self.size[0]))
+        if self.background is None:
+            return None
+        return self.redraw(blit)
+
+    def set_partitions(self, partitions, blit=True):
+        # Columns are colored by the partition of their first element
+        self.partitions = list(partitions)
+        return self.set_base_color(self.color, blit)
+
+    def redraw(self, blit=True):
+        self.canvas.restore_region(self.background)
+        self.ax.draw_artist(self.image)
+        if blit:
+            self.canvas.blit(self.ax.bbox)
+        return self.ax.bbox
@@ -1,9 +1,14 @@
+import os
 import tkinter as tk
-from tkinter import ttk
-import random
+from tkinter import ttk, filedialog
 import time
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+from instrument import OpCounter, CountingArray, CountedValue
+from columnrender import draw_columns, use_columns
+from tracefile import Trace, record_search
+from runcache import RunCache
+from datasets import PRESETS, generate, parse_seed
 
 # -------------------------------------------------
 # Algorithm generators yield (array, index, line)
@@ -35,6 +40,73 @@ def binary_search(arr, target):
             high = mid - 1
     yield arr, None, 8
 
+SEARCHES = {
+    "Linear": linear_search,
+    "Binary": binary_search
+}
+
+def counted_search(search, arr, target, counter):
+    # Same generator, but every element read and every comparison against
+    # the target is tallied in counter
+    return search(CountingArray(arr, counter), CountedValue(target, counter))
+
+def count_search(search, arr, target, counter=None):
+    counter = counter if counter is not None else OpCounter()
+    for _ in counted_search(search, arr, target, counter):
+        pass
+    return counter
+
+# Searches in the run cache (runcache.py): one record per step with the
+# counts so far, so a replay shows the same figures as the recorded run
+SEARCH_RECORD = [("index", "<i8"), ("line", "<i2"), ("comparisons", "<i8"), ("reads", "<i8")]
+
+def cached_search(cache, name, arr, target, counter):
+    # Steps of SEARCHES[name] and whether they came from the cache; a miss
+    # runs the counted search and records it as it goes
+    key = cache.key(name, SEARCHES[name], arr, {"target": target})
+    entry = cache.get(key)
+    if entry is not None:
+        return stored_search(*entry, arr, counter), True
+    steps = counted_search(SEARCHES[name], arr, target, counter)
+    encode = lambda step: [(-1 if step[1] is None else step[1], step[2],
+                            counter.comparisons, counter.reads)]
+    return cache.tee(key, steps, encode, counter.as_dict, SEARCH_RECORD), False
+
+def stored_search(records, metrics, arr, counter):
+    for index, line, comparisons, reads in records.tolist():
+        counter.comparisons = comparisons
+        counter.reads = reads
+        yield arr, None if index < 0 else index, line
+    counter.comparisons = metrics["comparisons"]
+    counter.reads = metrics["reads"]
+
+# -------------------------------------------------
+# Untraced versions, for timing the searches themselves
+# -------------------------------------------------
+
+def linear_search_plain(arr, target):
+    for i in range(len(arr)):
+        if arr[i] == target:
+            return i
+    return -1
+
+def binary_search_plain(arr, target):
+    low, high = 0, len(arr) - 1
+    while low <= high:
+        mid = (low + high) // 2
+        if arr[mid] == target:
+            return mid
+        elif arr[mid] < target:
+            low = mid + 1
+        else:
+            high = mid - 1
+    return -1
+
+PLAIN_SEARCHES = {
+    "Linear": linear_search_plain,
+    "Binary": binary_search_plain
+}
+
 # -------------------------------------------------
 # Visualizer class
 # -------------------------------------------------
@@ -53,6 +125,11 @@ class SearchComparison:
 
         self.array = []
         self.gens = {}
+        self.counters = {}
+        self.traces = {}
+        self.trace_pos = -1
+        self.cache = RunCache()
+        self.cached = {}
 
         self.build_ui()
 
@@ -69,6 +146,14 @@ class SearchComparison:
             e.pack(side=tk.LEFT)
             setattr(self, lbl.lower(), e)
 
+        tk.Label(control, text="Dataset:").pack(side=tk.LEFT, padx=(5, 0))
+        self.dataset = ttk.Combobox(control, values=PRESETS, state="readonly", width=12)
+        self.dataset.current(0)
+        self.dataset.pack(side=tk.LEFT)
+        tk.Label(control, text="Seed:").pack(side=tk.LEFT)
+        self.seed = tk.Entry(control, width=10)
+        self.seed.pack(side=tk.LEFT)
+
         tk.Label(control, text="Target:").pack(side=tk.LEFT, padx=5)
         self.target = tk.Entry(control, width=6)
         self.target.pack(side=tk.LEFT)
@@ -77,7 +162,16 @@ class SearchComparison:
         tk.Button(control, text="Start", command=self.start).pack(side=tk.LEFT)
         tk.Button(control, text="Pause", command=self.pause).pack(side=tk.LEFT)
         tk.Button(control, text="Stop", command=self.stop).pack(side=tk.LEFT)
-
+        tk.Button(control, text="Record Traces...", command=self.record_traces).pack(side=tk.LEFT, padx=(10, 0))
+        tk.Button(control, text="Open Traces...", command=self.open_traces).pack(side=tk.LEFT)
+        self.step_scale = tk.Scale(control, from_=0, to=0, orient=tk.HORIZONTAL, length=250,
+                                   label="Trace step")
+        self.step_scale.pack(side=tk.LEFT, padx=5)
+        self.step_scale.bind("<B1-Motion>", lambda e: self.seek(self.step_scale.get()))
+        self.step_scale.bind("<ButtonRelease-1>", lambda e: self.seek(self.step_scale.get()))
+
+        self.cache_label = tk.Label(control, text="Cache: 0 hits, 0 misses")
+        self.cache_label.pack(side=tk.RIGHT, padx=10)
         self.timer_l = tk.Label(control, text="Linear: 0.000 s")
         self.timer_l.pack(side=tk.RIGHT, padx=10)
         self.timer_b = tk.Label(control, text="Binary: 0.000 s")
@@ -116,8 +210,11 @@ class SearchComparison:
         mx = int(self.max.get())
         n = int(self.elements.get())
 
-        base = random.sample(range(mn, mx + 1), n)
+        # Duplicates allowed, so any size works for any value range
+        base = generate(self.dataset.get(), n, mn, mx, parse_seed(self.seed.get())).tolist()
 
+        self.traces = {}
+        self.step_scale.config(to=0)
         self.array = {
             "Linear": base[:],
             "Binary": sorted(base)
@@ -133,10 +230,16 @@ class SearchComparison:
         self.running = True
         self.paused = False
 
-        target = int(self.target.get())
+        if self.traces:
+            self.start_traces()
+        else:
+            target = int(self.target.get())
 
-        self.gens["Linear"] = linear_search(self.array["Linear"], target)
-        self.gens["Binary"] = binary_search(self.array["Binary"], target)
+            for name in ["Linear", "Binary"]:
+                self.counters[name] = OpCounter()
+                self.gens[name], self.cached[name] = cached_search(
+                    self.cache, name, self.array[name], target, self.counters[name])
+            self.cache_label.config(text=f"Cache: {self.cache.summary()}")
 
         self.start_time["Linear"] = time.time() - self.elapsed["Linear"]
         self.start_time["Binary"] = time.time() - self.elapsed["Binary"]
@@ -176,15 +279,96 @@ class SearchComparison:
 
                 self.draw(name, idx)
                 self.highlight(name, line)
+                if self.traces:
+                    self.frames[name].config(
+                        text=f"{name} Search - step {self.trace_pos + 1} of {len(self.traces[name])}")
+                else:
+                    c = self.counters[name]
+                    source = " (cached)" if self.cached[name] else ""
+                    self.frames[name].config(
+                        text=f"{name} Search - {c.comparisons} comparisons, {c.reads} reads{source}")
 
             except StopIteration:
                 finished.append(name)
 
+        if self.traces:
+            self.step_scale.set(self.trace_pos)
         if len(finished) == 2:
             self.running = False
         else:
             self.root.after(600, self.animate)
 
+    # ---------------- Trace Recording and Playback ---------------- #
+
+    def record_traces(self):
+        # Records both searches for the current array and target as
+        # <name>-linear.trc and <name>-binary.trc, then opens them
+        if not self.array:
+            return
+        path = filedialog.asksaveasfilename(defaultextension=".trc",
+                                            filetypes=[("Trace files", "*.trc")])
+        if not path:
+            return
+        target = int(self.target.get())
+        root, ext = os.path.splitext(path)
+        paths = []
+        for name in ["Linear", "Binary"]:
+            paths.append(f"{root}-{name.lower()}{ext}")
+            record_search(paths[-1], SEARCHES[name], self.array[name], target, {"name": name})
+        self.load_traces(paths)
+
+    def open_traces(self):
+        paths = filedialog.askopenfilenames(filetypes=[("Trace files", "*.trc")])
+        if paths:
+            self.load_traces(paths)
+
+    def load_traces(self, paths):
+        # Each trace goes to the panel named in its metadata
+        self.stop()
+        traces = {}
+        for path in paths:
+            trace = Trace(path)
+            if trace.kind == "search" and trace.meta.get("name") in SEARCHES:
+                traces[trace.meta["name"]] = trace
+        if len(traces) != 2:
+            return
+        self.traces = traces
+        self.trace_pos = -1
+        self.array = {name: trace.state_at(-1).tolist() for name, trace in traces.items()}
+        self.target.delete(0, tk.END)
+        self.target.insert(0, str(traces["Linear"].meta.get("target", "")))
+        self.step_scale.config(to=max(len(t) for t in traces.values()) - 1)
+        self.step_scale.set(0)
+        self.load_texts()
+        self.draw("Linear")
+        self.draw("Binary")
+
+    def trace_steps(self, name, start):
+        # The shorter search stops at its last step, like a live run
+        for s, (_, highlights, line) in enumerate(self.traces[name].play(start), start):
+            self.trace_pos = max(self.trace_pos, s)
+            yield self.array[name], highlights[0] if highlights else None, line
+
+    def start_traces(self):
+        start = self.trace_pos + 1
+        if start >= max(len(t) for t in self.traces.values()):
+            start = 0
+        self.trace_pos = start - 1
+        for name in ["Linear", "Binary"]:
+            self.gens[name] = self.trace_steps(name, start)
+
+    def seek(self, s):
+        if not self.traces:
+            return
+        self.running = False
+        self.trace_pos = int(s)
+        for name, trace in self.traces.items():
+            if not len(trace):
+                continue
+            _, highlights, line = trace.frame(min(self.trace_pos, len(trace) - 1))
+            self.draw(name, highlights[0] if highlights else None)
+            self.highlight(name, line)
+
     # ---------------- Drawing ---------------- #
 
     def draw(self, name, highlight=None):
@@ -192,6 +376,12 @@ class SearchComparison:
         arr = self.array[name]
 
         ax.clear()
+        if use_columns(len(arr)):
+            draw_columns(ax, arr, color="skyblue",
+                         overlays=[([highlight] if highlight is not None else [], "red")])
+            self.canvases[name].draw()
+            return
+
         colors = ["skyblue"] * len(arr)
         if highlight is not None:
             colors[highlight] = "red"
@@ -1,128 +1,445 @@
 import tkinter as tk
 from tkinter import ttk
 import random
+import time
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+from matplotlib.patches import Rectangle
+from matplotlib.transforms import Bbox
 import copy
+import numpy as np
+from instrument import OpCounter, CountingArray
+from sortingalgorithm import BarRenderer
+from columnrender import ColumnRenderer, use_columns
+from race import Race, STATE_NAMES
+from runcache import RunCache
+from datasets import PRESETS, generate, parse_seed, fresh_seed
+from networksort import network_steps
+from radixsort import COUNT, RADIX_BITS, SCATTER, radix_passes, radix_steps
+from hybridsort import auto_sort_plain, counting_sort_plain, introsort_plain, natural_merge_sort_plain
 
-# ---------------- Fixed Sorting Algorithms as Generators ---------------- #
+# ---------------- Step Event Protocol ---------------- #
+# Generators sort their own list in place and yield small delta events
+# instead of copies of the whole array:
+#   (COMPARE, i, j)    arr[i] and arr[j] were compared
+#   (SWAP, i, j)       arr[i] and arr[j] were exchanged
+#   (WRITE, i, value)  arr[i] was overwritten with value
+#   (AUX, size, None)  size auxiliary slots were allocated (negative: freed)
+# A consumer keeps its own buffer, starting from the same input, and applies
+# each event to it, so every step costs O(1) time and memory. Vectorized
+# sorts, which move many elements per pass, yield a pass as one step instead:
+#   (BLOCK, positions, values)  arr[positions] = values, NumPy arrays
+#   (COMPARES, count, None)     count comparisons were made by that pass
+# COMPARES, like AUX, only feeds the counters.
+
+COMPARE = "compare"
+SWAP = "swap"
+WRITE = "write"
+AUX = "aux"
+BLOCK = "block"
+COMPARES = "compares"
+
+def apply_event(buf, event):
+    op, a, b = event
+    if op == SWAP:
+        buf[a], buf[b] = buf[b], buf[a]
+    elif op == WRITE:
+        buf[a] = b
+    elif op == BLOCK:
+        for i, value in zip(a.tolist(), b.tolist()):
+            buf[i] = value
+
+def event_positions(event):
+    op, a, b = event
+    if op == WRITE:
+        return (a,)
+    if op == BLOCK:
+        return a.tolist()
+    return (a, b)
+
+def count_event(counter, event):
+    op, a, b = event
+    if op == COMPARE:
+        counter.comparisons += 1
+    elif op == SWAP:
+        counter.swaps += 1
+        counter.writes += 2
+    elif op == WRITE:
+        counter.writes += 1
+    elif op == AUX:
+        counter.alloc(a)
+    elif op == BLOCK:
+        counter.writes += len(a)
+    elif op == COMPARES:
+        counter.comparisons += a
+
+def replay(events, buf, snapshot=False, counter=None, tracker=None):
+    # Applies each event to buf and yields (state, positions). By default the
+    # state is buf itself; snapshot=True yields an independent copy per step
+    # for consumers that need to keep full states around. AUX and COMPARES
+    # events only feed the counter and are not yielded as steps. A
+    # SortednessTracker over buf, if given, applies the event so its metrics
+    # stay current.
+    for event in events:
+        if counter is not None:
+            count_event(counter, event)
+        if event[0] in (AUX, COMPARES):
+            continue
+        if tracker is not None:
+            tracker.apply(event)
+        else:
+            apply_event(buf, event)
+        yield (buf[:] if snapshot else buf), event_positions(event)
+
+def count_operations(alg, base):
+    # Runs alg over a counting copy of base and returns its OpCounter
+    counter = OpCounter()
+    arr = CountingArray(base, counter)
+    for event in alg(arr):
+        count_event(counter, event)
+    return counter
+
+# ---------------- Cached Runs ---------------- #
+# Event streams in the run cache (runcache.py): one record per event plus
+# the element reads made so far, so a replay reports the same counts as the
+# live run that was recorded. AUX and COMPARES events store no second field;
+# a BLOCK record holds the number of (position, value) WRITE records after it.
+
+EVENT_OPS = [COMPARE, SWAP, WRITE, AUX, BLOCK, COMPARES]
+EVENT_CODES = {op: code for code, op in enumerate(EVENT_OPS)}
+EVENT_RECORD = [("op", "u1"), ("a", "<i8"), ("b", "<i8"), ("reads", "<i8")]
+REPLAY_CHUNK = 4096
+
+def cached_events(cache, alg_name, base, counter):
+    # Events of ALGORITHMS[alg_name] over base and whether they came from
+    # the cache; a miss runs the algorithm on a counting copy of base and
+    # records it as it goes
+    key = cache.key(alg_name, ALGORITHMS[alg_name], base)
+    entry = cache.get(key)
+    if entry is not None:
+        return stored_events(*entry, counter), True
+    arr = CountingArray(base, counter)
+    encode = lambda e: encode_event(e, counter.reads)
+    return cache.tee(key, ALGORITHMS[alg_name](arr), encode, counter.as_dict, EVENT_RECORD), False
+
+def encode_event(event, reads):
+    op, a, b = event
+    if op == BLOCK:
+        return [(EVENT_CODES[BLOCK], len(a), 0, reads)] + \
+            [(EVENT_CODES[WRITE], i, value, reads) for i, value in zip(a.tolist(), b.tolist())]
+    return [(EVENT_CODES[op], a, 0 if b is None else b, reads)]
+
+def stored_events(records, metrics, counter):
+    start = 0
+    while start < len(records):
+        for op, a, b, reads in records[start:start + REPLAY_CHUNK].tolist():
+            start += 1
+            counter.reads = reads
+            op = EVENT_OPS[op]
+            if op == BLOCK:
+                block = records[start:start + a]
+                start += a
+                yield op, np.array(block["a"]), np.array(block["b"])
+                # Carry on from the record after the block
+                break
+            yield op, a, None if op in (AUX, COMPARES) else b
+    # Reads made after the last event
+    counter.reads = metrics["reads"]
+
+def cached_count(cache, alg_name, alg, base):
+    # count_operations, with the counts kept in the cache
+    key = cache.key(alg_name, alg, base, {"counts": True})
+    return OpCounter.from_dict(cache.metrics(key, lambda: count_operations(alg, base).as_dict()))
+
+# ---------------- Progress Metrics ---------------- #
+
+class SortednessTracker:
+    # Sortedness of a buffer, maintained from the indices each event touches
+    # instead of rescanning the array:
+    #   ordered_pairs  adjacent pairs with buf[k-1] <= buf[k] (exact, O(1)/event)
+    #   inversions()   estimated from a fixed random sample of index pairs
+    #                  (exact when every pair fits in the sample)
+    #   longest_run()  longest non-decreasing run, from per-block summaries
+    #                  that are only recomputed for blocks touched since the
+    #                  last query
+    def __init__(self, buf, samples=2048, seed=0):
+        self.buf = buf
+        n = len(buf)
+        self.n = n
+        self.ordered_pairs = sum(1 for k in range(1, n) if buf[k-1] <= buf[k])
+
+        total_pairs = n * (n - 1) // 2
+        if total_pairs <= samples:
+            self.pairs = [(i, j) for i in range(n) for j in range(i+1, n)]
+        else:
+            rng = random.Random(seed)
+            self.pairs = []
+            while len(self.pairs) < samples:
+                i, j = rng.randrange(n), rng.randrange(n)
+                if i != j:
+                    self.pairs.append((min(i, j), max(i, j)))
+        self.total_pairs = total_pairs
+        self.pairs_of = {}
+        for p, (i, j) in enumerate(self.pairs):
+            self.pairs_of.setdefault(i, []).append(p)
+            self.pairs_of.setdefault(j, []).append(p)
+        self.inverted = sum(1 for i, j in self.pairs if buf[i] > buf[j])
+
+        self.block = max(64, int(n ** 0.5))
+        self.blocks = [None] * (n // self.block + 1)
+        self.dirty_blocks = set(range(len(self.blocks)))
+
+    def _affected(self, positions):
+        adjacent = set()
+        sampled = set()
+        for i in positions:
+            if i > 0:
+                adjacent.add(i)
+            if i + 1 < self.n:
+                adjacent.add(i + 1)
+            sampled.update(self.pairs_of.get(i, ()))
+        return adjacent, sampled
+
+    def _tally(self, adjacent, sampled, sign):
+        buf = self.buf
+        for k in adjacent:
+            if buf[k-1] <= buf[k]:
+                self.ordered_pairs += sign
+        for p in sampled:
+            i, j = self.pairs[p]
+            if buf[i] > buf[j]:
+                self.inverted += sign
+
+    def apply(self, event):
+        positions = event_positions(event)
+        adjacent, sampled = self._affected(positions)
+        self._tally(adjacent, sampled, -1)
+        apply_event(self.buf, event)
+        self._tally(adjacent, sampled, +1)
+        for k in adjacent:
+            self.dirty_blocks.add(k // self.block)
+
+    def progress(self):
+        return self.ordered_pairs / (self.n - 1) if self.n > 1 else 1.0
+
+    def inversions(self):
+        if not self.pairs:
+            return 0
+        return round(self.inverted / len(self.pairs) * self.total_pairs)
+
+    def _summarize_block(self, b):
+        # (first descent, last descent, longest gap between descents) over
+        # pair indices k in this block, where a descent is buf[k-1] > buf[k]
+        buf = self.buf
+        first = last = None
+        best = 0
+        for k in range(max(1, b * self.block), min(self.n, (b + 1) * self.block)):
+            if buf[k-1] > buf[k]:
+                if first is None:
+                    first = k
+                else:
+                    best = max(best, k - last)
+                last = k
+        return first, last, best
+
+    def longest_run(self):
+        for b in self.dirty_blocks:
+            self.blocks[b] = self._summarize_block(b)
+        self.dirty_blocks.clear()
+        prev = 0
+        best = 0
+        for first, last, inner in self.blocks:
+            if first is not None:
+                best = max(best, first - prev, inner)
+                prev = last
+        return max(best, self.n - prev)
+
+# ---------------- Sorting Algorithms as Event Generators ---------------- #
 
 def bubble_sort(arr):
     n = len(arr)
     for i in range(n):
         for j in range(n-i-1):
+            yield COMPARE, j, j+1
             if arr[j] > arr[j+1]:
                 arr[j], arr[j+1] = arr[j+1], arr[j]
-            yield arr[:], (j, j+1)
+                yield SWAP, j, j+1
 
 def insertion_sort(arr):
     for i in range(1, len(arr)):
         key = arr[i]
         j = i-1
-        while j >= 0 and arr[j] > key:
-            arr[j+1] = arr[j]
+        while j >= 0:
+            yield COMPARE, j, j+1
+            if arr[j] <= key:
+                break
+            v = arr[j]
+            arr[j+1] = v
+            yield WRITE, j+1, v
             j -= 1
-            yield arr[:], (j+1, i)
-        arr[j+1] = key
-        yield arr[:], (j+1, i)
+        if j+1 != i:
+            arr[j+1] = key
+            yield WRITE, j+1, key
 
 def selection_sort(arr, ascending=True):
     n = len(arr)
     for i in range(n):
         min_idx = i
         for j in range(i+1, n):
-            yield arr[:], (i, j)
+            yield COMPARE, j, min_idx
             if (arr[j] < arr[min_idx] and ascending) or (arr[j] > arr[min_idx] and not ascending):
                 min_idx = j
-                yield arr[:], (i, min_idx)
         if min_idx != i:
             arr[i], arr[min_idx] = arr[min_idx], arr[i]
-        yield arr[:], (i, min_idx)
+            yield SWAP, i, min_idx
 
 def merge_sort(arr, ascending=True):
-    def merge(left, right, start):
-        i, j, k = 0, 0, start
+    def merge(low, mid, high):
+        left = arr[low:mid+1]
+        right = arr[mid+1:high+1]
+        yield AUX, high - low + 1, None
+        i, j, k = 0, 0, low
         while i < len(left) and j < len(right):
+            yield COMPARE, low+i, mid+1+j
             if (left[i] <= right[j] and ascending) or (left[i] >= right[j] and not ascending):
-                arr[k] = left[i]
+                v = left[i]
                 i += 1
             else:
-                arr[k] = right[j]
+                v = right[j]
                 j += 1
+            arr[k] = v
+            yield WRITE, k, v
             k += 1
-            yield arr[:], tuple(range(start, min(k+1, len(arr))))
 
         while i < len(left):
-            arr[k] = left[i]
+            v = left[i]
+            arr[k] = v
             i += 1
+            yield WRITE, k, v
             k += 1
-            yield arr[:], tuple(range(start, min(k+1, len(arr))))
         while j < len(right):
-            arr[k] = right[j]
+            v = right[j]
+            arr[k] = v
             j += 1
+            yield WRITE, k, v
             k += 1
-            yield arr[:], tuple(range(start, min(k+1, len(arr))))
+        yield AUX, -(high - low + 1), None
 
     def ms(low, high):
         if low < high:
             mid = (low + high) // 2
             yield from ms(low, mid)
             yield from ms(mid+1, high)
-            yield from merge(arr[low:mid+1], arr[mid+1:high+1], low)
+            yield from merge(low, mid, high)
 
     yield from ms(0, len(arr)-1)
 
+def median_of_three(arr, low, high):
+    # Yields the comparisons it makes and returns the median's index.
+    mid = (low + high) // 2
+    yield COMPARE, low, mid
+    if arr[low] <= arr[mid]:
+        yield COMPARE, mid, high
+        if arr[mid] <= arr[high]:
+            return mid
+        yield COMPARE, low, high
+        return high if arr[low] <= arr[high] else low
+    yield COMPARE, low, high
+    if arr[low] <= arr[high]:
+        return low
+    yield COMPARE, mid, high
+    return high if arr[mid] <= arr[high] else mid
+
 def quick_sort(arr, ascending=True):
-    def qs(low, high):
-        if low < high:
-            pivot = arr[high]
-            i = low - 1
-            for j in range(low, high):
-                yield arr[:], (j, high)
-                if (arr[j] < pivot and ascending) or (arr[j] > pivot and not ascending):
-                    i += 1
+    # Explicit stack of ranges, smaller side first: at most log2(n) + 1
+    # pending ranges, and no generator delegation chain per event.
+    stack = [(0, len(arr)-1)] if len(arr) > 1 else []
+    yield AUX, 2 * len(stack), None
+    while stack:
+        low, high = stack.pop()
+        yield AUX, -2, None
+        p = yield from median_of_three(arr, low, high)
+        if p != high:
+            arr[p], arr[high] = arr[high], arr[p]
+            yield SWAP, p, high
+        pivot = arr[high]
+        i = low - 1
+        for j in range(low, high):
+            yield COMPARE, j, high
+            if (arr[j] < pivot and ascending) or (arr[j] > pivot and not ascending):
+                i += 1
+                if i != j:
                     arr[i], arr[j] = arr[j], arr[i]
-                    yield arr[:], (i, j)
-            arr[i+1], arr[high] = arr[high], arr[i+1]
-            pi = i+1
-            yield arr[:], (pi, high)
-            yield from qs(low, pi-1)
-            yield from qs(pi+1, high)
-
-    yield from qs(0, len(arr)-1)
+                    yield SWAP, i, j
+        pi = i+1
+        if pi != high:
+            arr[pi], arr[high] = arr[high], arr[pi]
+            yield SWAP, pi, high
+        left, right = (low, pi-1), (pi+1, high)
+        if pi - low > high - pi:
+            left, right = right, left
+        for part in (right, left):
+            if part[0] < part[1]:
+                stack.append(part)
+                yield AUX, 2, None
 
 def heap_sort(arr, ascending=True):
     def heapify(n, i):
-        largest = i
-        l, r = 2*i+1, 2*i+2
-        if l < n and arr[l] > arr[largest]:
-            largest = l
-        if r < n and arr[r] > arr[largest]:
-            largest = r
-        if largest != i:
+        while True:
+            largest = i
+            l, r = 2*i+1, 2*i+2
+            if l < n:
+                yield COMPARE, l, largest
+                if arr[l] > arr[largest]:
+                    largest = l
+            if r < n:
+                yield COMPARE, r, largest
+                if arr[r] > arr[largest]:
+                    largest = r
+            if largest == i:
+                return
             arr[i], arr[largest] = arr[largest], arr[i]
-            yield arr[:], (i, largest)
-            yield from heapify(n, largest)
+            yield SWAP, i, largest
+            i = largest
 
     n = len(arr)
     for i in range(n//2 - 1, -1, -1):
         yield from heapify(n, i)
     for i in range(n-1, 0, -1):
         arr[0], arr[i] = arr[i], arr[0]
-        yield arr[:], (0, i)
+        yield SWAP, 0, i
         yield from heapify(i, 0)
 
 def radix_sort(arr, ascending=True):
-    max_num = max(arr)
-    exp = 1
-    while max_num // exp > 0:
-        buckets = [[] for _ in range(10)]
-        for num in arr:
-            digit = (num // exp) % 10
-            buckets[digit].append(num)
-        arr[:] = [num for bucket in buckets for num in bucket]
-        yield arr[:], ()
-        exp *= 10
+    # One BLOCK event per scatter pass of radixsort.py (the positions whose
+    # value changed), inside the pass's n-element buffer; no comparisons
+    values = np.array(arr[:], dtype=np.int64)
+    previous = values.copy()
+    for line, _, _ in radix_steps(values, RADIX_BITS, ascending):
+        if line == SCATTER:
+            changed = np.flatnonzero(values != previous)
+            yield AUX, len(values), None
+            if len(changed):
+                yield BLOCK, changed, values[changed]
+                previous[changed] = values[changed]
+            yield AUX, -len(values), None
+    arr[:] = values.tolist()
+
+def network_events(name, arr):
+    # One COMPARES and one BLOCK event per compare-exchange pass of a
+    # networksort.py network; the input is read once, into NumPy
+    values = np.array(arr[:], dtype=np.int64)
+    for _, comparisons, changed in network_steps(values, name):
+        yield COMPARES, comparisons, None
+        if len(changed):
+            yield BLOCK, changed, values[changed]
+    arr[:] = values.tolist()
+
+def bitonic_sort(arr):
+    yield from network_events("Bitonic Sort", arr)
+
+def odd_even_sort(arr):
+    yield from network_events("Odd-Even Transposition Sort", arr)
 
 ALGORITHMS = {
     "Bubble Sort": bubble_sort,
@@ -131,9 +448,242 @@ ALGORITHMS = {
     "Merge Sort": merge_sort,
     "Quick Sort": quick_sort,
     "Heap Sort": heap_sort,
-    "Radix Sort": radix_sort
+    "Radix Sort": radix_sort,
+    "Bitonic Sort": bitonic_sort,
+    "Odd-Even Transposition Sort": odd_even_sort
+}
+
+# ---------------- Untraced Reference Implementations ---------------- #
+# Same algorithms without events, for timing the real cost of a sort. An
+# optional progress(fraction) callback is called at coarse points (outer
+# passes, large merges and partitions) with an estimate of the work done.
+
+PROGRESS_CHUNK = 1024
+
+def bubble_sort_plain(arr, progress=None):
+    n = len(arr)
+    for i in range(n):
+        if progress:
+            progress(1 - (1 - i / n) ** 2)
+        for j in range(n-i-1):
+            if arr[j] > arr[j+1]:
+                arr[j], arr[j+1] = arr[j+1], arr[j]
+
+def insertion_sort_plain(arr, progress=None):
+    n = len(arr)
+    for i in range(1, n):
+        if progress and i % PROGRESS_CHUNK == 0:
+            progress((i / n) ** 2)
+        key = arr[i]
+        j = i-1
+        while j >= 0 and arr[j] > key:
+            arr[j+1] = arr[j]
+            j -= 1
+        arr[j+1] = key
+
+def selection_sort_plain(arr, progress=None):
+    n = len(arr)
+    for i in range(n):
+        if progress:
+            progress(1 - (1 - i / n) ** 2)
+        min_idx = i
+        for j in range(i+1, n):
+            if arr[j] < arr[min_idx]:
+                min_idx = j
+        if min_idx != i:
+            arr[i], arr[min_idx] = arr[min_idx], arr[i]
+
+def merge_sort_plain(arr, progress=None):
+    # Every level of the recursion merges n elements in total
+    total = max(1, len(arr) * (len(arr) - 1).bit_length())
+    merged = 0
+
+    def ms(low, high):
+        nonlocal merged
+        if low < high:
+            mid = (low + high) // 2
+            ms(low, mid)
+            ms(mid+1, high)
+            left = arr[low:mid+1]
+            right = arr[mid+1:high+1]
+            i, j, k = 0, 0, low
+            while i < len(left) and j < len(right):
+                if left[i] <= right[j]:
+                    arr[k] = left[i]
+                    i += 1
+                else:
+                    arr[k] = right[j]
+                    j += 1
+                k += 1
+            arr[k:high+1] = left[i:] + right[j:]
+            merged += high - low + 1
+            if progress and high - low >= PROGRESS_CHUNK:
+                progress(merged / total)
+
+    ms(0, len(arr)-1)
+
+def quick_sort_plain(arr, progress=None):
+    # Progress is the share of elements already in their final position
+    stack = [(0, len(arr)-1)] if len(arr) > 1 else []
+    placed = 0
+    while stack:
+        low, high = stack.pop()
+        mid = (low + high) // 2
+        a, b, c = arr[low], arr[mid], arr[high]
+        if a <= b:
+            p = mid if b <= c else (high if a <= c else low)
+        else:
+            p = low if a <= c else (high if b <= c else mid)
+        arr[p], arr[high] = arr[high], arr[p]
+        pivot = arr[high]
+        i = low - 1
+        for j in range(low, high):
+            if arr[j] < pivot:
+                i += 1
+                arr[i], arr[j] = arr[j], arr[i]
+        pi = i+1
+        arr[pi], arr[high] = arr[high], arr[pi]
+        placed += 1
+        left, right = (low, pi-1), (pi+1, high)
+        if pi - low > high - pi:
+            left, right = right, left
+        for part in (right, left):
+            if part[0] < part[1]:
+                stack.append(part)
+            elif part[0] == part[1]:
+                placed += 1
+        if progress and high - low >= PROGRESS_CHUNK:
+            progress(placed / len(arr))
+
+def heap_sort_plain(arr, progress=None):
+    def heapify(n, i):
+        while True:
+            largest = i
+            l, r = 2*i+1, 2*i+2
+            if l < n and arr[l] > arr[largest]:
+                largest = l
+            if r < n and arr[r] > arr[largest]:
+                largest = r
+            if largest == i:
+                return
+            arr[i], arr[largest] = arr[largest], arr[i]
+            i = largest
+
+    n = len(arr)
+    for i in range(n//2 - 1, -1, -1):
+        heapify(n, i)
+    for i in range(n-1, 0, -1):
+        if progress and i % PROGRESS_CHUNK == 0:
+            progress(1 - i / n)
+        arr[0], arr[i] = arr[i], arr[0]
+        heapify(i, 0)
+
+def radix_sort_plain(arr, progress=None):
+    values = np.array(arr, dtype=np.int64)
+    passes = max(1, radix_passes(values))
+    done = 0
+    for line, _, _ in radix_steps(values, track=False):
+        if line != COUNT:
+            done += 1
+            if progress:
+                progress(done / passes)
+    arr[:] = values.tolist()
+
+def network_plain(name, arr, passes, progress=None):
+    # passes: the most passes the network can take, for progress
+    values = np.array(arr, dtype=np.int64)
+    for p, _ in enumerate(network_steps(values, name, track=False), 1):
+        if progress:
+            progress(p / passes)
+    arr[:] = values.tolist()
+
+def bitonic_sort_plain(arr, progress=None):
+    levels = (len(arr) - 1).bit_length()
+    network_plain("Bitonic Sort", arr, max(1, levels * (levels + 1) // 2), progress)
+
+def odd_even_sort_plain(arr, progress=None):
+    network_plain("Odd-Even Transposition Sort", arr, max(1, len(arr)), progress)
+
+PLAIN_ALGORITHMS = {
+    "Bubble Sort": bubble_sort_plain,
+    "Insertion Sort": insertion_sort_plain,
+    "Selection Sort": selection_sort_plain,
+    "Merge Sort": merge_sort_plain,
+    "Quick Sort": quick_sort_plain,
+    "Heap Sort": heap_sort_plain,
+    "Radix Sort": radix_sort_plain,
+    "Bitonic Sort": bitonic_sort_plain,
+    "Odd-Even Transposition Sort": odd_even_sort_plain,
+    "Introsort": introsort_plain,
+    "Natural Merge Sort": natural_merge_sort_plain,
+    "Counting Sort": counting_sort_plain,
+    "Auto": auto_sort_plain
 }
 
+# O(n^2) sorts, skipped above a size limit by the benchmark and the race
+QUADRATIC = {"Bubble Sort", "Insertion Sort", "Selection Sort", "Odd-Even Transposition Sort"}
+
+# ---------------- Shared-Figure Panels ---------------- #
+# Every selected algorithm is drawn into one figure: a thin status strip over
+# a bar axes per panel, all artists persistent and animated. Each tick repaints
+# the changed regions without blitting and then blits their union once, so
+# the Tk transfer happens once per frame however many panels there are.
+
+REDRAW_MODES = ["All panels", "Round-robin dirty panels"]
+ROUND_ROBIN_PANELS = 2
+STATUS_INTERVAL = 0.5  # seconds between status text refreshes; text is the slowest artist
+
+class StatusStrip:
+    """
+    Name, counters and a progress bar above one panel, as animated artists
+    repainted over a cached background like the BarRenderer bars.
+    """
+    def __init__(self, ax, canvas):
+        self.ax = ax
+        self.canvas = canvas
+        ax.set_axis_off()
+        ax.set_xlim(0, 1)
+        ax.set_ylim(0, 1)
+        ax.add_patch(Rectangle((0, 0), 1, 0.2, color='lightgrey'))
+        self.bar = ax.add_patch(Rectangle((0, 0), 0, 0.2, color='steelblue', animated=True))
+        self.text = ax.text(0, 0.3, "", fontsize=7, family='monospace', va='bottom',
+                            clip_on=True, animated=True)
+        self.background = None
+        canvas.mpl_connect("draw_event", self.on_draw)
+
+    def on_draw(self, event):
+        # Clip to the whole pixels the background covers, so the partly
+        # covered edge pixels are never painted twice
+        self.background = self.canvas.copy_from_bbox(self.ax.bbox)
+        left, bottom, right, top = self.background.get_extents()
+        height = self.canvas.figure.bbox.height
+        clip = Bbox([[left, height - top], [right, height - bottom]])
+        self.bar.set_clip_box(clip)
+        self.text.set_clip_box(clip)
+        self.ax.draw_artist(self.bar)
+        self.ax.draw_artist(self.text)
+
+    def update(self, text, fraction, color='black', blit=True):
+        self.text.set_text(text)
+        self.text.set_color(color)
+        self.bar.set_width(fraction)
+        if self.background is None:
+            return None
+        self.canvas.restore_region(self.background)
+        self.ax.draw_artist(self.bar)
+        self.ax.draw_artist(self.text)
+        if blit:
+            self.canvas.blit(self.ax.bbox)
+        return self.ax.bbox
+
+# ---------------- Race Mode ---------------- #
+# Runs the selected untraced sorts in parallel worker processes (race.py) and
+# polls their shared progress counters; these are real timings on inputs far
+# too large to animate.
+
+RACE_POLL_MS = 100
+RACE_QUADRATIC_LIMIT = 20000
+
 # ---------------- Unlimited Algorithm Tkinter App ---------------- #
 
 class SortingVisualizer:
@@ -141,7 +691,7 @@ class SortingVisualizer:
         self.root = root
         self.root.title("Live Algorithm Comparison - Unlimited")
 
-        self.array = [random.randint(1, 50) for _ in range(20)]
+        self.array = []
 
         self.compare_vars = {}
         compare_frame = tk.LabelFrame(root, text="Select Any Number of Algorithms")
@@ -170,29 +720,109 @@ class SortingVisualizer:
                   command=lambda: [v.set(False) for v in self.compare_vars.values()]
                   ).pack(side=tk.LEFT)
 
+        # Input for both the live comparison and the race; the seed starts
+        # filled in so repeated runs use the same array (and hit the cache)
+        tk.Label(compare_frame, text="Dataset:").pack(side=tk.LEFT, padx=(15, 2))
+        self.dataset_menu = ttk.Combobox(compare_frame, values=PRESETS, state="readonly", width=12)
+        self.dataset_menu.current(0)
+        self.dataset_menu.pack(side=tk.LEFT)
+        tk.Label(compare_frame, text="Live size:").pack(side=tk.LEFT, padx=(10, 2))
+        self.live_size = tk.Entry(compare_frame, width=6)
+        self.live_size.insert(0, "20")
+        self.live_size.pack(side=tk.LEFT)
+        tk.Label(compare_frame, text="Seed:").pack(side=tk.LEFT, padx=(10, 2))
+        self.seed_entry = tk.Entry(compare_frame, width=11)
+        self.seed_entry.insert(0, str(fresh_seed()))
+        self.seed_entry.pack(side=tk.LEFT)
+
+        tk.Label(compare_frame, text="Redraw:").pack(side=tk.LEFT, padx=(15, 2))
+        self.redraw_mode = ttk.Combobox(compare_frame, values=REDRAW_MODES,
+                                        state="readonly", width=24)
+        self.redraw_mode.current(0)
+        self.redraw_mode.pack(side=tk.LEFT)
+
+        self.frame_label = tk.Label(compare_frame, text="Frame: 0.0 ms", font=("Consolas", 9))
+        self.frame_label.pack(side=tk.LEFT, padx=10)
+
+        tk.Label(compare_frame, text="Race size:").pack(side=tk.LEFT, padx=(15, 2))
+        self.race_size = tk.Entry(compare_frame, width=9)
+        self.race_size.insert(0, "1000000")
+        self.race_size.pack(side=tk.LEFT)
+        tk.Button(compare_frame, text="Race (real time)",
+                  command=self.start_race).pack(side=tk.LEFT, padx=5)
+        tk.Button(compare_frame, text="Stop Race",
+                  command=self.stop_race).pack(side=tk.LEFT)
+        self.race_label = tk.Label(compare_frame, text="", font=("Consolas", 9))
+        self.race_label.pack(side=tk.LEFT, padx=10)
+        self.cache_label = tk.Label(compare_frame, text="Cache: 0 hits, 0 misses",
+                                    font=("Consolas", 9))
+        self.cache_label.pack(side=tk.LEFT, padx=10)
+
+        self.figure_canvas = None
         self.active_gens = {}
-        self.canvases = {}
-        self.alg_frames = {}
+        self.renderers = {}
+        self.status = {}
+        self.counters = {}
+        self.trackers = {}
+        self.pending = {}
+        self.status_time = {}
+        self.next_panel = 0
+        self.tick_id = None
+        self.cache = RunCache()
+        self.cached = {}
 
-    def start_live_comparison(self):
-        
+        self.race = None
+        self.race_rows = {}
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+
+    def clear_view(self):
+        # Ends whatever the main area shows: a live comparison or a race
+        if self.tick_id is not None:
+            self.root.after_cancel(self.tick_id)
+            self.tick_id = None
+        if self.race is not None:
+            self.race.close()
+            self.race = None
         if self.main_canvas is not None:
             self.main_canvas.destroy()
             self.main_canvas = None
+        if self.figure_canvas is not None:
+            plt.close(self.figure_canvas.figure)
+            self.figure_canvas = None
+
+    def make_array(self, n, high=None):
+        try:
+            seed = parse_seed(self.seed_entry.get())
+        except ValueError:
+            seed = fresh_seed()
+        return generate(self.dataset_menu.get(), n, 1, high, seed).tolist()
+
+    def on_close(self):
+        self.clear_view()
+        self.root.destroy()
+
+    def start_live_comparison(self):
+        
+        self.clear_view()
 
         selected_algorithms = [name for name, var in self.compare_vars.items() if var.get()]
         if not selected_algorithms:
             return
 
-        for frame in self.alg_frames.values():
-            frame.destroy()
-        for canvas_tuple in self.canvases.values():
-            canvas_tuple[2].get_tk_widget().destroy()
-
         self.active_gens.clear()
-        self.canvases.clear()
-        self.alg_frames.clear()
+        self.renderers.clear()
+        self.status.clear()
+        self.counters.clear()
+        self.trackers.clear()
+        self.pending.clear()
+        self.status_time.clear()
+        self.next_panel = 0
 
+        try:
+            size = max(1, int(self.live_size.get()))
+        except ValueError:
+            size = 20
+        self.array = self.make_array(size, max(50, size))
         base_array = self.array.copy()
         self.main_canvas = tk.Canvas(self.root)
         main_canvas = self.main_canvas
@@ -226,80 +856,166 @@ class SortingVisualizer:
         fig_height = max(2.5, 7 / rows)
         # ------------------------------------------------------- #
 
+        # One status row and one bar row per grid row
+        fig = plt.figure(figsize=(fig_width * cols, fig_height * rows))
+        grid = fig.add_gridspec(rows * 2, cols, height_ratios=[1, 4] * rows,
+                                hspace=0.15, wspace=0.15,
+                                left=0.03, right=0.99, bottom=0.04, top=0.99)
+        canvas = FigureCanvasTkAgg(fig, master=self.comparison_frame)
+        canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+        self.figure_canvas = canvas
+
         for i, alg_name in enumerate(selected_algorithms):
-            frame = tk.LabelFrame(self.comparison_frame, text=alg_name, padx=5, pady=5)
-            frame.grid(row=i // cols, column=i % cols,
-                       sticky='nsew', padx=5, pady=5)
-            self.alg_frames[alg_name] = frame
-
-            arr_copy = base_array.copy()
-            gen = ALGORITHMS[alg_name](arr_copy)
-            self.active_gens[alg_name] = (gen, arr_copy)
-
-            fig, ax = plt.subplots(figsize=(fig_width, fig_height))
-            ax.set_title(alg_name, fontsize=10)
-            ax.set_ylim(0, 60)
-            ax.tick_params(labelsize=6)
+            r, c = i // cols, i % cols
 
-            canvas = FigureCanvasTkAgg(fig, master=frame)
-            canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
-            self.canvases[alg_name] = (fig, ax, canvas)
+            # The algorithm sorts its own copy (or its events come from the
+            # run cache); this panel's buffer is kept in step by applying them.
+            counter = OpCounter()
+            events, self.cached[alg_name] = cached_events(self.cache, alg_name, base_array, counter)
+            display = base_array.copy()
+            tracker = SortednessTracker(display)
+            gen = replay(events, display, counter=counter, tracker=tracker)
+            self.active_gens[alg_name] = (gen, display)
+            self.counters[alg_name] = counter
+            self.trackers[alg_name] = tracker
 
-        for c in range(cols):
-            self.comparison_frame.grid_columnconfigure(c, weight=1)
-        for r in range(rows):
-            self.comparison_frame.grid_rowconfigure(r, weight=1)
+            self.status[alg_name] = StatusStrip(fig.add_subplot(grid[2 * r, c]), canvas)
+            ax = fig.add_subplot(grid[2 * r + 1, c])
+            kind = ColumnRenderer if use_columns(len(display)) else BarRenderer
+            renderer = kind(ax, canvas, color='skyblue', highlight_color='red',
+                            edgecolor='black', linewidth=0.5)
+            renderer.reset(display, draw=False)
+            ax.tick_params(labelsize=6)
+            self.renderers[alg_name] = renderer
+            self.pending[alg_name] = (set(), ())
+            self.update_status(alg_name, blit=False)
 
+        self.cache_label.config(text=f"Cache: {self.cache.summary()}")
+        canvas.draw()
         self.animate_all_algorithms()
 
     def animate_all_algorithms(self):
+        start = time.perf_counter()
         finished = []
 
         for alg_name, (gen, arr) in list(self.active_gens.items()):
-            fig, ax, canvas = self.canvases[alg_name]
             try:
                 arr_state, highlights = next(gen)
+                dirty, _ = self.pending[alg_name]
+                dirty.update(highlights)
+                self.pending[alg_name] = (dirty, highlights)
+            except StopIteration:
+                finished.append(alg_name)
+
+        # Panels with pending steps, in grid order; finished panels are
+        # always drawn so their final state is never skipped
+        dirty_panels = [name for name in self.renderers
+                        if self.pending[name][0] and name not in finished]
+        if self.redraw_mode.get() == REDRAW_MODES[1] and dirty_panels:
+            k = self.next_panel % len(dirty_panels)
+            dirty_panels = (dirty_panels[k:] + dirty_panels[:k])[:ROUND_ROBIN_PANELS]
+            self.next_panel = k + len(dirty_panels)
+
+        regions = []
+        for alg_name in dirty_panels + finished:
+            dirty, highlights = self.pending[alg_name]
+            arr = self.active_gens[alg_name][1]
+            if alg_name in finished:
+                highlights = ()
+            regions.append(self.renderers[alg_name].update(arr, highlights, dirty, blit=False))
+            self.pending[alg_name] = (set(), ())
+            if alg_name in finished:
+                regions.append(self.renderers[alg_name].set_base_color('green', blit=False))
+                self.active_gens.pop(alg_name, None)
+            if alg_name in finished or start - self.status_time[alg_name] >= STATUS_INTERVAL:
+                regions.append(self.update_status(alg_name, blit=False))
+
+        regions = [r for r in regions if r is not None]
+        if regions:
+            self.figure_canvas.blit(Bbox.union(regions))
 
-                ax.clear()
-                ax.set_ylim(0, 60)
+        elapsed = (time.perf_counter() - start) * 1000
+        self.frame_label.config(text=f"Frame: {elapsed:.1f} ms")
 
-                colors = ['skyblue'] * len(arr_state)
-                if highlights:
-                    for i in highlights:
-                        if 0 <= i < len(colors):
-                            colors[i] = 'red'
+        if self.active_gens:
+            delay = max(100, 400 - len(self.active_gens) * 30)
+            self.tick_id = self.root.after(delay, self.animate_all_algorithms)
+        else:
+            self.tick_id = None
 
-                ax.bar(range(len(arr_state)), arr_state,
-                       color=colors, edgecolor='black', linewidth=0.5)
+    def start_race(self):
+        self.clear_view()
+        try:
+            n = int(self.race_size.get())
+        except ValueError:
+            self.race_label.config(text="Race size must be an integer")
+            return
+        selected_algorithms = [name for name, var in self.compare_vars.items() if var.get()]
+        if not selected_algorithms or n < 1:
+            return
 
-                sorted_count = sum(
-                    1 for k in range(1, len(arr_state))
-                    if arr_state[k-1] <= arr_state[k]
-                )
-                ax.set_title(
-                    f"{alg_name}\n({sorted_count}/{len(arr_state)} sorted)",
-                    fontsize=9
-                )
+        racing = {name: PLAIN_ALGORITHMS[name] for name in selected_algorithms
+                  if not (name in QUADRATIC and n > RACE_QUADRATIC_LIMIT)}
+        base = self.make_array(n)
 
-                canvas.draw()
-                canvas.flush_events()
+        self.main_canvas = tk.Frame(self.root)
+        self.main_canvas.pack(side=tk.TOP, fill=tk.X, padx=5, pady=5)
+        self.race_rows.clear()
+        for row, name in enumerate(selected_algorithms):
+            tk.Label(self.main_canvas, text=name, width=16, anchor="w").grid(row=row, column=0)
+            progress = ttk.Progressbar(self.main_canvas, maximum=100, length=500)
+            progress.grid(row=row, column=1, padx=5, pady=2)
+            status = tk.Label(self.main_canvas, width=32, anchor="w", font=("Consolas", 9))
+            status.grid(row=row, column=2)
+            if name not in racing:
+                status.config(text=f"skipped: O(n^2) above n={RACE_QUADRATIC_LIMIT}")
+            self.race_rows[name] = (progress, status)
 
-            except StopIteration:
-                finished.append(alg_name)
-                ax.clear()
-                ax.set_ylim(0, 60)
-                ax.bar(range(len(arr)), arr,
-                       color='green', edgecolor='black', linewidth=0.5)
-                ax.set_title(f"{alg_name}\nFINISHED ✓",
-                             fontsize=9, color='green')
-                canvas.draw()
+        if not racing:
+            return
+        self.race = Race(racing, base)
+        self.race_label.config(text=f"Racing n={n} on {self.race.max_workers} worker(s)")
+        self.poll_race()
 
-        for alg in finished:
-            self.active_gens.pop(alg, None)
+    def poll_race(self):
+        race = self.race
+        rows = race.poll()
+        for name, state, fraction, seconds in rows:
+            progress, status = self.race_rows[name]
+            progress["value"] = fraction * 100
+            status.config(text=f"{STATE_NAMES[state]:<9}{seconds:9.3f} s")
 
-        if self.active_gens:
-            delay = max(100, 400 - len(self.active_gens) * 30)
-            self.root.after(delay, self.animate_all_algorithms)
+        if race.finished:
+            for place, (name, seconds) in enumerate(race.results(), 1):
+                self.race_rows[name][1].config(text=f"#{place:<8}{seconds:9.3f} s", fg="green")
+            self.race.close()
+            self.race = None
+            self.tick_id = None
+        else:
+            self.tick_id = self.root.after(RACE_POLL_MS, self.poll_race)
+
+    def stop_race(self):
+        if self.race is None:
+            return
+        if self.tick_id is not None:
+            self.root.after_cancel(self.tick_id)
+        self.race.stop()
+        self.poll_race()
+
+    def update_status(self, alg_name, blit=True):
+        tracker = self.trackers[alg_name]
+        counter = self.counters[alg_name]
+        if alg_name in self.active_gens:
+            title, color = f"{alg_name} ({tracker.ordered_pairs}/{tracker.n} sorted)", 'black'
+        else:
+            title, color = f"{alg_name} FINISHED ✓", 'green'
+        if self.cached[alg_name]:
+            title += " (cached)"
+        text = (f"{title}\n{counter.summary()}\n"
+                f"ordered {tracker.progress():.1%}  inv ~{tracker.inversions()}  "
+                f"run {tracker.longest_run()}/{tracker.n}")
+        self.status_time[alg_name] = time.perf_counter()
+        return self.status[alg_name].update(text, tracker.progress(), color, blit)
 
 # ---------------- RUN ---------------- #
 
@@ -0,0 +1,141 @@
+import os
+import random
+import tempfile
+
+import numpy as np
+
+# ---------------- Datasets ---------------- #
+# Seeded, reproducible input arrays for the visualizers, the benchmark and
+# the command-line tools. Every preset is generated with vectorized NumPy
+# (10^8 elements take seconds), draws values from [low, high] and returns
+# int64; the same (preset, n, low, high, seed) always gives the same array.
+#   uniform        independent uniform values
+#   sorted         uniform values, ascending
+#   reversed       uniform values, descending
+#   nearly-sorted  ascending, then n/100 random pairs swapped
+#   sawtooth       SAWTOOTH_TEETH ascending ramps over the whole range
+#   few-unique     FEW_UNIQUE distinct values (all of them if the range is
+#                  smaller), shuffled
+#   zipf           Zipf-distributed: a few small values dominate
+#   organ-pipe     ascending to a peak in the middle, then descending
+# Arrays of CACHE_MIN_SIZE elements or more are saved as .npy files under
+# DATASET_DIR and loaded back memory-mapped, so large inputs are generated
+# once. DATASET_VERSION is part of their names and goes up whenever a preset
+# changes its values, so stale files are never loaded.
+
+PRESETS = ["uniform", "sorted", "reversed", "nearly-sorted", "sawtooth", "few-unique", "zipf",
+           "organ-pipe"]
+SAWTOOTH_TEETH = 8
+FEW_UNIQUE = 10
+ZIPF_EXPONENT = 1.5
+CACHE_MIN_SIZE = 1000000
+DATASET_VERSION = 2
+DATASET_DIR = os.environ.get("DATASET_DIR",
+                             os.path.join(os.path.expanduser("~"), ".cache", "jackfruit", "datasets"))
+
+def uniform(rng, n, low, high):
+    return rng.integers(low, high + 1, n, dtype=np.int64)
+
+def nearly_sorted(rng, n, low, high):
+    arr = np.sort(uniform(rng, n, low, high))
+    i = rng.integers(0, n, max(1, n // 100))
+    j = rng.integers(0, n, len(i))
+    arr[np.concatenate([i, j])] = arr[np.concatenate([j, i])]
+    return arr
+
+def sawtooth(rng, n, low, high):
+    period = max(2, -(-n // SAWTOOTH_TEETH))
+    return low + (np.arange(n, dtype=np.int64) % period) * (high - low) // (period - 1)
+
+def few_unique(rng, n, low, high):
+    # The pool is drawn without replacement, so its values are distinct
+    span = high - low + 1
+    return rng.choice(low + rng.choice(span, min(FEW_UNIQUE, span), replace=False), n)
+
+def zipf(rng, n, low, high):
+    # Ranks with P(rank >= k) = k^-(ZIPF_EXPONENT - 1), drawn by inverting
+    # that tail directly; much faster than rng.zipf's rejection sampling
+    u = 1.0 - rng.random(n)
+    ranks = np.minimum(np.floor(u ** (-1 / (ZIPF_EXPONENT - 1))), high - low + 1)
+    return low - 1 + ranks.astype(np.int64)
+
+def organ_pipe(rng, n, low, high):
+    arr = np.sort(uniform(rng, n, low, high))
+    return np.concatenate([arr[0::2], arr[1::2][::-1]])
+
+GENERATORS = {
+    "uniform": uniform,
+    "sorted": lambda rng, n, low, high: np.sort(uniform(rng, n, low, high)),
+    "reversed": lambda rng, n, low, high: np.sort(uniform(rng, n, low, high))[::-1].copy(),
+    "nearly-sorted": nearly_sorted,
+    "sawtooth": sawtooth,
+    "few-unique": few_unique,
+    "zipf": zipf,
+    "organ-pipe": organ_pipe
+}
+
+def generate(preset, n, low=1, high=None, seed=0):
+    # high defaults to n, so values are on the same scale as the length
+    high = max(n, low) if high is None else high
+    if high < low:
+        raise ValueError(f"empty value range [{low}, {high}]")
+    if n <= 0:
+        return np.empty(0, dtype=np.int64)
+    return GENERATORS[preset](np.random.default_rng(seed), n, low, high)
+
+def fresh_seed():
+    return random.randrange(2 ** 32)
+
+def parse_seed(text):
+    # A seed entry left blank means a new random seed
+    text = text.strip()
+    return int(text) if text else fresh_seed()
+
+# ---------------- .npy Files ---------------- #
+
+def save(path, arr):
+    # Written to a temporary file first, so a reader never sees half an array
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp = tempfile.mkstemp(dir=directory, suffix=".npy")
+    with os.fdopen(fd, "wb") as f:
+        np.save(f, np.asarray(arr))
+    os.replace(tmp, path)
+
+def load(path):
+    return np.load(path, mmap_mode="r")
+
+def dataset_path(preset, n, low, high, seed, directory=DATASET_DIR):
+    return os.path.join(directory, f"{preset}-n{n}-{low}-{high}-s{seed}-v{DATASET_VERSION}.npy")
+
+def dataset(preset, n, low=1, high=None, seed=0, directory=DATASET_DIR):
+    # generate(), going through the .npy cache for large arrays; those come
+    # back as read-only memory maps
+    high = max(n, low) if high is None else high
+    if n < CACHE_MIN_SIZE:
+        return generate(preset, n, low, high, seed)
+    path = dataset_path(preset, n, low, high, seed, directory)
+    if not os.path.exists(path):
+        os.makedirs(directory, exist_ok=True)
+        save(path, generate(preset, n, low, high, seed))
+    return load(path)
+
+# ---------------- Command Line ---------------- #
+
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(description="Generate a seeded dataset as a .npy file")
+    parser.add_argument("preset", choices=PRESETS)
+    parser.add_argument("size", type=int)
+    parser.add_argument("output", help="the .npy file to write")
+    parser.add_argument("--low", type=int, default=1)
+    parser.add_argument("--high", type=int, help="largest value (default: size)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    arr = generate(args.preset, args.size, args.low, args.high, args.seed)
+    save(args.output, arr)
+    span = f" in [{arr.min()}, {arr.max()}]" if len(arr) else ""
+    print(f"{args.preset}: {len(arr)} values{span} -> {args.output}")
+
+# -------------------- Main -------------------- #
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,264 @@
+import argparse
+import math
+import multiprocessing as mp
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from matplotlib.image import imsave
+
+from columnrender import draw_columns, use_columns
+from tracefile import Trace, maze_path
+
+# ---------------- Offline Export ---------------- #
+# Renders a recorded run (a trace file, see tracefile.py) to a GIF, a video
+# or a directory of PNG frames without any window: figures are drawn on the
+# Agg canvas directly, never through pyplot or Tk. Frames are independent
+# (each one seeks its own step in the trace), so they are spread over a pool
+# of worker processes that each write PNGs; the parent then assembles them.
+#   .gif           Pillow (installed with matplotlib)
+#   .mp4 / .webm   ffmpeg, which must be on the PATH
+#   anything else  a directory of frame_000000.png ...
+
+FRAME_NAME = "frame_%06d.png"
+VIDEO_CODECS = {
+    ".mp4": ["-c:v", "libx264", "-pix_fmt", "yuv420p"],
+    ".webm": ["-c:v", "libvpx-vp9", "-pix_fmt", "yuv420p"]
+}
+
+def frame_steps(steps, skip=1, max_frames=None):
+    # Every `skip`-th step (more if max_frames asks for it), always ending on
+    # the last step so the final state is shown
+    if not steps:
+        return []
+    if max_frames:
+        skip = max(skip, math.ceil(steps / max_frames))
+    picked = list(range(0, steps, skip))
+    if picked[-1] != steps - 1:
+        picked.append(steps - 1)
+    return picked
+
+# ---------------- Frame Painters ---------------- #
+# One per trace kind. Each sets its artists up once per worker from the
+# trace's initial state, then updates the animated ones in place for every
+# frame and returns them for drawing over the cached static background.
+
+class SortPainter:
+    def __init__(self, ax, trace):
+        self.ax = ax
+        initial = trace.state_at(-1)
+        self.columns = use_columns(len(initial))
+        self.image = None
+        if not self.columns:
+            n = len(initial)
+            self.bars = ax.bar(range(n), initial, color="skyblue", width=1.0 if n > 200 else 0.8,
+                               animated=True)
+            ax.set_xlim(-0.5, max(n, 1) - 0.5)
+            low, high = min(0, initial.min(initial=0)), initial.max(initial=1)
+            ax.set_ylim(low, high + max(1, (high - low) * 0.05))
+
+    def paint(self, state, highlights, line):
+        if self.columns:
+            if self.image is not None:
+                self.image.remove()
+            self.image = draw_columns(self.ax, state, color="skyblue", overlays=[(highlights, "red")])
+            self.image.set_animated(True)
+            return [self.image]
+        for bar, value in zip(self.bars, state.tolist()):
+            bar.set_height(value)
+            bar.set_facecolor("skyblue")
+        for i in highlights:
+            self.bars[i].set_facecolor("red")
+        return list(self.bars)
+
+class SearchPainter(SortPainter):
+    def __init__(self, ax, trace):
+        super().__init__(ax, trace)
+        target = trace.meta.get("target")
+        if target is not None:
+            ax.axhline(target, color="green", linewidth=1, linestyle="--")
+
+class MazePainter:
+    def __init__(self, ax, trace):
+        # Maze traces hold the maze and a parent plane, see record_maze
+        self.cols = trace.shape[2]
+        ax.imshow(trace.state_at(-1).reshape(trace.shape)[0], cmap="gray_r", interpolation="nearest")
+        self.path, = ax.plot([], [], color="red", linewidth=2, animated=True)
+        ax.set_xticks([])
+        ax.set_yticks([])
+
+    def paint(self, state, highlights, line):
+        y, x = np.divmod(np.asarray(maze_path(state, highlights, self.cols), dtype=np.int64), self.cols)
+        self.path.set_data(x, y)
+        return [self.path]
+
+PAINTERS = {
+    "sort": SortPainter,
+    "search": SearchPainter,
+    "maze": MazePainter
+}
+
+# ---------------- Workers ---------------- #
+# Each worker opens the trace once and keeps one figure, reused per frame:
+# the static parts (axes, ticks, maze walls) are drawn once and restored
+# under every frame. Temporary frames are compressed lightly, since they are
+# only read back for assembly.
+
+worker = None
+
+class FrameRenderer:
+    def __init__(self, trace_path, width, height, dpi, out_dir, compress_level=6):
+        self.trace = Trace(trace_path)
+        self.lines = self.trace.meta.get("lines", [])
+        self.title = self.trace.meta.get("name", self.trace.kind)
+        self.out_dir = out_dir
+        self.compress_level = compress_level
+        self.fig = Figure(figsize=(width / dpi, height / dpi), dpi=dpi)
+        self.canvas = FigureCanvasAgg(self.fig)
+        self.ax = self.fig.add_axes([0.05, 0.12, 0.92, 0.8])
+        self.painter = PAINTERS[self.trace.kind](self.ax, self.trace)
+        self.heading = self.ax.text(0.5, 1.01, "", transform=self.ax.transAxes, ha="center",
+                                    va="bottom", fontsize=11, animated=True)
+        self.caption = self.fig.text(0.05, 0.03, "", family="monospace", fontsize=10, animated=True)
+        self.background = None
+
+    def render(self, frame, step):
+        state, highlights, line = self.trace.frame(step)
+        artists = self.painter.paint(state, highlights, line)
+        self.heading.set_text(f"{self.title}   step {step + 1} / {len(self.trace)}")
+        self.caption.set_text(self.lines[line].strip() if 0 <= line < len(self.lines) else "")
+        if self.background is None:
+            self.canvas.draw()
+            self.background = self.canvas.copy_from_bbox(self.fig.bbox)
+        else:
+            self.canvas.restore_region(self.background)
+        for artist in artists + [self.heading, self.caption]:
+            self.fig.draw_artist(artist)
+        path = os.path.join(self.out_dir, FRAME_NAME % frame)
+        imsave(path, np.asarray(self.canvas.buffer_rgba()),
+               pil_kwargs={"compress_level": self.compress_level})
+        return path
+
+def init_worker(*args):
+    global worker
+    worker = FrameRenderer(*args)
+
+def render_frame(job):
+    return worker.render(*job)
+
+def render_frames(trace_path, out_dir, steps, width=1280, height=720, dpi=100, workers=None,
+                  progress=None, compress_level=6):
+    # Writes one PNG per entry of steps into out_dir and returns the paths in
+    # frame order; progress(done, total) is called as frames complete
+    workers = workers or os.cpu_count() or 1
+    jobs = list(enumerate(steps))
+    args = (trace_path, width, height, dpi, out_dir, compress_level)
+    paths = []
+    if workers == 1:
+        init_worker(*args)
+        results = map(render_frame, jobs)
+    else:
+        # spawn, like race.py: safe from a running GUI as well as the shell
+        pool = ProcessPoolExecutor(workers, mp.get_context("spawn"), init_worker, args)
+        results = pool.map(render_frame, jobs, chunksize=max(1, len(jobs) // (workers * 8)))
+    try:
+        for path in results:
+            paths.append(path)
+            if progress:
+                progress(len(paths), len(jobs))
+    finally:
+        if workers > 1:
+            pool.shutdown()
+    return paths
+
+# ---------------- Assembly ---------------- #
+
+def write_gif(paths, output, fps):
+    from PIL import Image
+    frames = (Image.open(p).convert("RGB") for p in paths)
+    first = next(frames)
+    first.save(output, save_all=True, append_images=frames, duration=round(1000 / fps), loop=0)
+
+def find_ffmpeg():
+    ffmpeg = shutil.which("ffmpeg")
+    if ffmpeg is None:
+        raise RuntimeError("ffmpeg was not found on the PATH; export to .gif or a PNG directory instead")
+    return ffmpeg
+
+def write_video(frame_dir, output, fps):
+    ext = os.path.splitext(output)[1].lower()
+    subprocess.run([find_ffmpeg(), "-y", "-loglevel", "error", "-framerate", str(fps),
+                    "-i", os.path.join(frame_dir, FRAME_NAME),
+                    # yuv420p needs even dimensions
+                    "-vf", "pad=ceil(iw/2)*2:ceil(ih/2)*2", *VIDEO_CODECS[ext], output],
+                   check=True)
+
+def export(trace_path, output, fps=30, skip=1, max_frames=None, width=1280, height=720, dpi=100,
+           workers=None, progress=None):
+    # Returns the number of frames rendered
+    steps = frame_steps(len(Trace(trace_path)), skip, max_frames)
+    ext = os.path.splitext(output)[1].lower()
+    if ext != ".gif" and ext not in VIDEO_CODECS:
+        os.makedirs(output, exist_ok=True)
+        render_frames(trace_path, output, steps, width, height, dpi, workers, progress)
+        return len(steps)
+    if ext in VIDEO_CODECS:
+        find_ffmpeg()
+    with tempfile.TemporaryDirectory() as frame_dir:
+        paths = render_frames(trace_path, frame_dir, steps, width, height, dpi, workers, progress,
+                              compress_level=1)
+        if ext == ".gif":
+            write_gif(paths, output, fps)
+        else:
+            write_video(frame_dir, output, fps)
+    return len(steps)
+
+# ---------------- Command Line ---------------- #
+
+def parse_size(text):
+    width, height = text.lower().split("x")
+    return int(width), int(height)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render a recorded run to GIF, video or PNG frames")
+    parser.add_argument("trace", help="a trace file (tracefile.py), or with --sort the file to record")
+    parser.add_argument("output", help="out.gif, out.mp4, out.webm, or a directory for PNG frames")
+    parser.add_argument("--sort", metavar="ALGORITHM",
+                        help="first record this sortingalgorithm sort into TRACE")
+    parser.add_argument("--n", type=int, default=100, help="array size for --sort")
+    parser.add_argument("--dataset", default="uniform", help="datasets.py preset for --sort")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--fps", type=float, default=30)
+    parser.add_argument("--skip", type=int, default=1, help="render every SKIP-th step")
+    parser.add_argument("--max-frames", type=int, help="raise --skip to stay under this many frames")
+    parser.add_argument("--resolution", type=parse_size, default=(1280, 720), metavar="WxH")
+    parser.add_argument("--dpi", type=int, default=100)
+    parser.add_argument("--workers", type=int, help="render processes (default: CPU count)")
+    args = parser.parse_args(argv)
+
+    if args.sort:
+        # Imported here: recording needs the sort generators, rendering does not
+        from datasets import generate
+        from sortingalgorithm import SORTS, algorithm_steps
+        from tracefile import record_sort
+        arr = generate(args.dataset, args.n, seed=args.seed).tolist()
+        record_sort(args.trace, SORTS[args.sort], arr,
+                    {"name": args.sort, "lines": algorithm_steps(args.sort, arr)})
+
+    def progress(done, total):
+        print(f"rendered {done}/{total} frames", end="\r", file=sys.stderr)
+
+    width, height = args.resolution
+    frames = export(args.trace, args.output, args.fps, args.skip, args.max_frames, width, height,
+                    args.dpi, args.workers, progress)
+    print(f"\n{frames} frames -> {args.output}", file=sys.stderr)
+
+# -------------------- Main -------------------- #
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,265 @@
+import heapq
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+# ---------------- External Merge Sort ---------------- #
+# Sorts int64 data that need not fit in memory: the input is a memory-mapped
+# .npy or raw int64 file and only RUN_SIZE elements, or FAN_IN read buffers,
+# are in memory at once.
+#   run formation  each RUN_SIZE chunk is sorted in memory and written to a
+#                  temporary run file
+#   merge passes   up to FAN_IN adjacent runs at a time are merged into one,
+#                  until a single pass can write the output
+# The k-way merge works on blocks rather than elements. Each run is read
+# through a BUFFER_SIZE buffer and a heap orders the runs by the last value
+# in their buffer. Every element up to the smallest such value can be output
+# at once: it is cut from the front of every buffer, merged with one NumPy
+# sort and appended to the output buffer, and the run that set the bound is
+# refilled. Output is written in blocks of at least BUFFER_SIZE.
+#
+# external_sort_steps yields after every run written and every output block
+# flushed, with the current contents of the span being worked on, which is
+# what the visualizer adapter (external_merge_sort) draws.
+
+RUN_SIZE = 1 << 22        # elements sorted in memory per run (32 MB)
+BUFFER_SIZE = 1 << 16     # elements per read buffer and output block
+FAN_IN = 64               # runs merged at once
+
+RUN, MERGE = 2, 5         # pseudocode lines of the two kinds of step
+
+EXTERNAL_STEPS = [
+    "externalSort(file):",
+    "  for each chunk of RUN elements:",
+    "    sort chunk in memory, write it as a run",
+    "  while more than one run:",
+    "    merge up to FAN_IN runs (heap of buffer tails)",
+    "    write each merged block"
+]
+
+class RunReader:
+    # Buffered sequential reader over one sorted run
+    def __init__(self, data, buffer_size):
+        self.data = data
+        self.buffer_size = buffer_size
+        self.pos = 0
+        self.fill()
+
+    def fill(self):
+        self.buf = np.array(self.data[self.pos:self.pos + self.buffer_size])
+        self.pos += len(self.buf)
+
+    def rest(self):
+        # Everything not yet moved to the output, buffered or not
+        return self.data[self.pos - len(self.buf):]
+
+def merge_runs(runs, out, lo, buffer_size, sign=1):
+    # Merges the sorted arrays in runs into out[lo:], multiplying by sign on
+    # the way out. Yields (written, readers) after every block written.
+    readers = [RunReader(run, buffer_size) for run in runs]
+    heap = [(int(r.buf[-1]), k) for k, r in enumerate(readers) if len(r.buf)]
+    heapq.heapify(heap)
+    pending = []
+    pending_len = 0
+    written = 0
+    while heap:
+        bound = heap[0][0]
+        parts = []
+        for r in readers:
+            if len(r.buf):
+                k = int(np.searchsorted(r.buf, bound, side="right"))
+                if k:
+                    parts.append(r.buf[:k])
+                    r.buf = r.buf[k:]
+        pending.append(np.sort(np.concatenate(parts), kind="stable"))
+        pending_len += len(pending[-1])
+        # Every run whose buffer tail was the bound is now empty; all are
+        # popped before any is refilled, as a refill may end on bound again
+        empty = []
+        while heap and heap[0][0] == bound:
+            empty.append(heapq.heappop(heap)[1])
+        for k in empty:
+            readers[k].fill()
+            if len(readers[k].buf):
+                heapq.heappush(heap, (int(readers[k].buf[-1]), k))
+        if pending_len >= buffer_size or not heap:
+            block = np.concatenate(pending)
+            out[lo + written:lo + written + len(block)] = block if sign == 1 else -block
+            written += len(block)
+            pending = []
+            pending_len = 0
+            yield written, readers
+
+def external_sort_steps(src, out, run_size=RUN_SIZE, buffer_size=BUFFER_SIZE, fan_in=FAN_IN,
+                        tmp_dir=None, ascending=True):
+    # Sorts src (any int array, typically a memmap) into out, a writable
+    # array of the same length. Yields (lo, hi, parts, fresh, line):
+    # concatenated, parts are the current contents of positions [lo, hi),
+    # fresh the positions just written and line the EXTERNAL_STEPS line.
+    # Descending order sorts negated values; parts always hold real values.
+    n = len(src)
+    sign = 1 if ascending else -1
+    real = (lambda a: a) if ascending else (lambda a: -a)
+    with tempfile.TemporaryDirectory(dir=tmp_dir) as tmp:
+        runs = []
+        for lo in range(0, n, run_size):
+            hi = min(n, lo + run_size)
+            chunk = np.sort(sign * np.asarray(src[lo:hi], dtype=np.int64))
+            path = os.path.join(tmp, f"run-0-{len(runs)}.bin")
+            chunk.tofile(path)
+            runs.append((lo, hi, np.memmap(path, np.int64, "r", shape=(hi - lo,))))
+            yield lo, hi, [real(chunk)], range(lo, hi), RUN
+
+        merge_pass = 1
+        while runs:
+            final = len(runs) <= fan_in
+            merged = []
+            for g in range(0, len(runs), fan_in):
+                group = runs[g:g + fan_in]
+                lo, hi = group[0][0], group[-1][1]
+                if final:
+                    target, base, out_sign = out, lo, sign
+                    shown = lambda written: out[lo:lo + written]
+                else:
+                    path = os.path.join(tmp, f"run-{merge_pass}-{len(merged)}.bin")
+                    target = np.memmap(path, np.int64, "w+", shape=(hi - lo,))
+                    base, out_sign = 0, 1
+                    shown = lambda written: real(target[:written])
+                done = 0
+                for written, readers in merge_runs([run for _, _, run in group], target, base,
+                                                   buffer_size, out_sign):
+                    parts = [shown(written)] + [real(r.rest()) for r in readers]
+                    yield lo, hi, parts, range(lo + done, lo + written), MERGE
+                    done = written
+                if not final:
+                    target.flush()
+                    merged.append((lo, hi, np.memmap(path, np.int64, "r", shape=(hi - lo,))))
+            if final:
+                break
+            runs = merged
+            merge_pass += 1
+
+# ---------------- Visualizer Adapter ---------------- #
+# Runs the real external sort over the visualizer's list through temporary
+# files, with runs small enough that several form and merge on screen.
+
+GUI_RUNS = 8
+GUI_FAN_IN = 4
+
+def external_merge_sort(arr, ascending=True):
+    n = len(arr)
+    if n < 2:
+        return
+    run_size = max(2, -(-n // GUI_RUNS))
+    with tempfile.TemporaryDirectory() as tmp:
+        out = np.lib.format.open_memmap(os.path.join(tmp, "out.npy"), "w+", np.int64, (n,))
+        steps = external_sort_steps(np.array(arr, dtype=np.int64), out, run_size,
+                                    max(1, run_size // 4), GUI_FAN_IN, tmp, ascending)
+        for lo, hi, parts, fresh, line in steps:
+            # Merging shifts what is left of the runs too, so every position
+            # whose value changed is reported along with the new block
+            span = np.concatenate(parts)
+            changed = set((lo + np.flatnonzero(span != arr[lo:hi])).tolist())
+            arr[lo:hi] = span.tolist()
+            yield arr, sorted(changed.union(fresh)), line
+        del out
+
+# ---------------- Headless Sort ---------------- #
+
+def open_input(path):
+    # .npy files keep their header; anything else is raw int64
+    if path.endswith(".npy"):
+        return np.load(path, mmap_mode="r")
+    return np.memmap(path, np.int64, "r")
+
+def is_sorted(arr, block=BUFFER_SIZE * 16):
+    for lo in range(0, len(arr), block):
+        chunk = np.asarray(arr[lo:lo + block + 1])
+        if (chunk[1:] < chunk[:-1]).any():
+            return False
+    return True
+
+def external_sort(src_path, dst_path, run_size=RUN_SIZE, buffer_size=BUFFER_SIZE, fan_in=FAN_IN,
+                  tmp_dir=None):
+    # Sorts the file at src_path into a new .npy file at dst_path and
+    # returns timing and throughput figures
+    src = open_input(src_path)
+    n = len(src)
+    out = np.lib.format.open_memmap(dst_path, "w+", np.int64, (n,))
+    phase_time = {RUN: 0.0, MERGE: 0.0}
+    runs = 0
+    last = time.perf_counter()
+    start = last
+    for _, _, _, _, line in external_sort_steps(src, out, run_size, buffer_size, fan_in, tmp_dir):
+        now = time.perf_counter()
+        phase_time[line] += now - last
+        last = now
+        runs += line == RUN
+    out.flush()
+    del out
+    seconds = time.perf_counter() - start
+    mb = n * 8 / 1e6
+    passes, left = (1, runs) if runs else (0, 0)
+    while left > fan_in:
+        left = -(-left // fan_in)
+        passes += 1
+    return {
+        "n": n,
+        "mb": mb,
+        "runs": runs,
+        "merge_passes": passes,
+        "run_seconds": phase_time[RUN],
+        "merge_seconds": phase_time[MERGE],
+        "seconds": seconds,
+        "mb_per_sec": mb / seconds if seconds else 0.0
+    }
+
+# ---------------- Command Line ---------------- #
+
+def main(argv=None):
+    import argparse
+    from datasets import PRESETS, dataset, dataset_path, DATASET_DIR
+
+    parser = argparse.ArgumentParser(description="Sort an int64 .npy or raw file larger than memory")
+    parser.add_argument("output", help="sorted .npy file to write")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--input", help=".npy file or raw int64 file")
+    source.add_argument("--dataset", choices=PRESETS, help="sort a generated datasets.py preset")
+    parser.add_argument("--size", type=int, default=10000000, help="elements for --dataset")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--run-size", type=int, default=RUN_SIZE, help="elements per in-memory run")
+    parser.add_argument("--buffer", type=int, default=BUFFER_SIZE, help="elements per read/write buffer")
+    parser.add_argument("--fan-in", type=int, default=FAN_IN, help="runs merged per pass")
+    parser.add_argument("--tmp-dir", help="where run files go (default: system temp)")
+    parser.add_argument("--check", action="store_true", help="verify the output is sorted")
+    args = parser.parse_args(argv)
+
+    src_path = args.input
+    if args.dataset:
+        arr = dataset(args.dataset, args.size, seed=args.seed)
+        src_path = dataset_path(args.dataset, args.size, 1, max(args.size, 1), args.seed)
+        if not os.path.exists(src_path):
+            # Small datasets are not cached by datasets.py
+            os.makedirs(DATASET_DIR, exist_ok=True)
+            np.save(src_path, arr)
+
+    stats = external_sort(src_path, args.output, args.run_size, args.buffer, args.fan_in,
+                          args.tmp_dir)
+    print(f"{stats['n']} elements ({stats['mb']:.1f} MB), {stats['runs']} runs, "
+          f"{stats['merge_passes']} merge pass(es)")
+    for name, seconds in [("run formation", stats["run_seconds"]), ("merge", stats["merge_seconds"]),
+                          ("total", stats["seconds"])]:
+        rate = stats["mb"] / seconds if seconds else 0.0
+        print(f"{name:<14}{seconds:9.3f} s {rate:10.1f} MB/s")
+    if args.check:
+        ok = is_sorted(np.load(args.output, mmap_mode="r"))
+        print("sorted" if ok else "NOT SORTED", file=sys.stderr)
+        if not ok:
+            sys.exit(1)
+
+# -------------------- Main -------------------- #
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,288 @@
+import operator
+import random
+import sys
+import time
+from collections import Counter
+from itertools import islice
+
+# ---------------- Hybrid Sorts ---------------- #
+# Engines that adapt to the input instead of assuming random data:
+#   introsort           quicksort with a 3-way partition, so equal keys are
+#                       finished in one pass; insertion sort below
+#                       INSERTION_CUTOFF and heap sort once a range has been
+#                       split 2 * log2(n) times, so it stays O(n log n)
+#   natural merge sort  merges the runs already in the input (descending runs
+#                       are reversed first), so sorted input costs one scan
+#   counting sort       one counting pass when the values span a small range;
+#                       past it the keys present are sorted instead of the
+#                       whole span walked, so it never hangs on wide input
+# profile samples the input and choose_engine picks one of them ("Auto").
+# The visualizer versions live in sortingalgorithm.py; the plain versions
+# below are what race.py and this module's command line time.
+
+INSERTION_CUTOFF = 16     # ranges this short are insertion sorted
+MIN_RUN = 32              # natural runs are extended to at least this length
+SAMPLE_SIZE = 256         # elements and neighbor pairs profile looks at
+COUNTING_SPAN = 2         # counting sort if max - min < COUNTING_SPAN * n ...
+COUNTING_MIN_SPAN = 1024  # ... or below this, however small n is
+PRESORTED = 0.9           # share of sampled neighbor pairs already in order
+LONG_RUN = 64             # estimated mean run length worth merging
+SKIP_COUNTING = 16        # command line: no counting sort past this span / n
+
+ENGINES = ["Introsort", "Natural Merge Sort", "Counting Sort"]
+
+def profile(arr, ascending=True, sample_size=SAMPLE_SIZE, seed=0):
+    # Range (exact, one C-speed scan each), duplicate ratio and presortedness
+    # (from a seeded sample, so the same list always gets the same profile).
+    #   in_order / reversed  shares of sampled neighbor pairs already in the
+    #                        requested order / strictly against it
+    #   run                  estimated mean run length: one over the share of
+    #                        sampled positions where the direction turns
+    #   sorted               only when every sampled pair is in order is the
+    #                        whole list checked, stopping at the first pair out
+    n = len(arr)
+    if n < 2:
+        return {"n": n, "span": n, "duplicates": 0.0, "in_order": 1.0, "reversed": 0.0,
+                "run": n, "sorted": True}
+    rng = random.Random(seed)
+    picks = arr if n <= sample_size else rng.sample(arr, sample_size)
+    pairs = range(n - 1) if n - 1 <= sample_size else rng.sample(range(n - 1), sample_size)
+    fits, against = (operator.le, operator.gt) if ascending else (operator.ge, operator.lt)
+    up = sum(fits(arr[i], arr[i + 1]) for i in pairs)
+    down = sum(against(arr[i], arr[i + 1]) for i in pairs)
+    turns = sum(against(arr[i], arr[i + 1]) != against(arr[i + 1], arr[i + 2])
+                for i in pairs if i + 2 < n)
+    ordered = up == len(pairs) and all(map(fits, arr, islice(arr, 1, None)))
+    return {
+        "n": n,
+        "span": max(arr) - min(arr) + 1,
+        "duplicates": 1 - len(set(picks)) / len(picks),
+        "in_order": up / len(pairs),
+        "reversed": down / len(pairs),
+        "run": min(n, len(pairs) / turns) if turns else n,
+        "sorted": ordered
+    }
+
+def counting_fits(span, n):
+    # Whether n values over `span` keys are worth walking the whole span
+    return span < max(COUNTING_SPAN * n, COUNTING_MIN_SPAN)
+
+def choose_engine(p):
+    # (engine, reason) for a profile
+    n, span = p["n"], p["span"]
+    if n < 2:
+        return "Introsort", "nothing to sort"
+    if p["sorted"]:
+        return "Natural Merge Sort", "already in order: one scan finds a single run"
+    if counting_fits(span, n):
+        return "Counting Sort", f"{n} values span only {span} keys: one counting pass"
+    if p["in_order"] >= PRESORTED:
+        return "Natural Merge Sort", f"{p['in_order']:.0%} of sampled neighbors in order: few runs to merge"
+    if p["reversed"] >= PRESORTED:
+        return "Natural Merge Sort", f"{p['reversed']:.0%} of sampled neighbors reversed: runs flip in place"
+    if p["run"] >= LONG_RUN:
+        return "Natural Merge Sort", f"runs of about {p['run']:.0f} in the sample: few runs to merge"
+    if p["duplicates"] > 0:
+        return "Introsort", f"{p['duplicates']:.0%} duplicates in the sample, wide range, no long runs"
+    return "Introsort", "wide range, no duplicates or long runs in the sample"
+
+# ---------------- Untraced Engines ---------------- #
+# Same protocol as comparesortingalgorithm.PLAIN_ALGORITHMS: sort the list in
+# place (ascending), calling progress(fraction) now and then.
+
+PROGRESS_CHUNK = 1024
+
+def insertion_range(arr, low, high):
+    # Insertion sort of arr[low:high+1]
+    for i in range(low + 1, high + 1):
+        key = arr[i]
+        j = i - 1
+        while j >= low and arr[j] > key:
+            arr[j + 1] = arr[j]
+            j -= 1
+        arr[j + 1] = key
+
+def heap_range(arr, low, high):
+    # Heap sort of arr[low:high+1], the introsort fallback
+    def sift(n, i):
+        while True:
+            largest = i
+            l, r = 2*i+1, 2*i+2
+            if l < n and arr[low + l] > arr[low + largest]:
+                largest = l
+            if r < n and arr[low + r] > arr[low + largest]:
+                largest = r
+            if largest == i:
+                return
+            arr[low + i], arr[low + largest] = arr[low + largest], arr[low + i]
+            i = largest
+
+    n = high - low + 1
+    for i in range(n//2 - 1, -1, -1):
+        sift(n, i)
+    for i in range(n-1, 0, -1):
+        arr[low], arr[low + i] = arr[low + i], arr[low]
+        sift(i, 0)
+
+def introsort_plain(arr, progress=None):
+    # Progress is the share of elements already in their final position
+    stack = [(0, len(arr)-1, 2 * len(arr).bit_length())] if len(arr) > 1 else []
+    placed = 0
+    while stack:
+        low, high, depth = stack.pop()
+        if high - low < INSERTION_CUTOFF:
+            insertion_range(arr, low, high)
+            placed += high - low + 1
+            continue
+        if depth == 0:
+            heap_range(arr, low, high)
+            placed += high - low + 1
+            continue
+        mid = (low + high) // 2
+        a, b, c = arr[low], arr[mid], arr[high]
+        if a <= b:
+            pivot = b if b <= c else (c if a <= c else a)
+        else:
+            pivot = a if a <= c else (c if b <= c else b)
+        lt, i, gt = low, low, high
+        while i <= gt:
+            x = arr[i]
+            if x < pivot:
+                arr[lt], arr[i] = x, arr[lt]
+                lt += 1
+                i += 1
+            elif x > pivot:
+                arr[i], arr[gt] = arr[gt], x
+                gt -= 1
+            else:
+                i += 1
+        placed += gt - lt + 1
+        left, right = (low, lt-1), (gt+1, high)
+        if lt - low > high - gt:
+            left, right = right, left
+        for part in (right, left):
+            if part[0] < part[1]:
+                stack.append((part[0], part[1], depth - 1))
+            elif part[0] == part[1]:
+                placed += 1
+        if progress and high - low >= PROGRESS_CHUNK:
+            progress(placed / len(arr))
+
+def find_runs(arr):
+    # Boundaries [0, ..., n] of the natural runs, with strictly descending
+    # runs reversed (strictly, so equal keys keep their order) and runs
+    # shorter than MIN_RUN extended by insertion sort
+    n = len(arr)
+    bounds = [0]
+    i = 0
+    while i < n:
+        j = i + 1
+        if j < n and arr[j] < arr[j-1]:
+            while j < n and arr[j] < arr[j-1]:
+                j += 1
+            arr[i:j] = arr[i:j][::-1]
+        else:
+            while j < n and arr[j] >= arr[j-1]:
+                j += 1
+        if j - i < MIN_RUN and j < n:
+            j = min(n, i + MIN_RUN)
+            insertion_range(arr, i, j - 1)
+        bounds.append(j)
+        i = j
+    return bounds
+
+def natural_merge_sort_plain(arr, progress=None):
+    bounds = find_runs(arr)
+    passes = max(1, (len(bounds) - 2).bit_length())
+    done = 0
+    while len(bounds) > 2:
+        merged = [0]
+        for k in range(0, len(bounds) - 2, 2):
+            low, mid, high = bounds[k], bounds[k+1], bounds[k+2]
+            if arr[mid] < arr[mid-1]:
+                left = arr[low:mid]
+                i, j, m = 0, mid, low
+                while i < len(left) and j < high:
+                    if left[i] <= arr[j]:
+                        arr[m] = left[i]
+                        i += 1
+                    else:
+                        arr[m] = arr[j]
+                        j += 1
+                    m += 1
+                arr[m:j] = left[i:]
+            merged.append(high)
+        if len(bounds) % 2 == 0:
+            # Odd number of runs: the last one waits for the next pass
+            merged.append(bounds[-1])
+        bounds = merged
+        done += 1
+        if progress:
+            progress(done / passes)
+
+def counting_sort_plain(arr, progress=None):
+    if not arr:
+        return
+    counts = Counter(arr)
+    low, high = min(counts), max(counts)
+    keys = range(low, high + 1) if counting_fits(high - low + 1, len(arr)) else sorted(counts)
+    k = 0
+    for value in keys:
+        c = counts.get(value)
+        if c:
+            arr[k:k+c] = [value] * c
+            k += c
+    if progress:
+        progress(1.0)
+
+PLAIN_ENGINES = {
+    "Introsort": introsort_plain,
+    "Natural Merge Sort": natural_merge_sort_plain,
+    "Counting Sort": counting_sort_plain
+}
+
+def auto_sort_plain(arr, progress=None):
+    engine, _ = choose_engine(profile(arr))
+    PLAIN_ENGINES[engine](arr, progress)
+
+# ---------------- Command Line ---------------- #
+
+def main(argv=None):
+    # Times every engine on each preset next to the one Auto picks. Counting
+    # sort is skipped when the span would make its count pass the whole cost.
+    import argparse
+    from datasets import PRESETS, generate
+
+    parser = argparse.ArgumentParser(description="Check the Auto engine choice against timings")
+    parser.add_argument("--size", type=int, default=100000)
+    parser.add_argument("--max-value", type=int, help="largest value (default: --size)")
+    parser.add_argument("--datasets", nargs="+", choices=PRESETS, default=PRESETS)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    print(f"{'dataset':<15}" + "".join(f"{name:>20}" for name in PLAIN_ENGINES) + "  auto pick")
+    for preset in args.datasets:
+        base = generate(preset, args.size, 1, args.max_value or args.size, args.seed).tolist()
+        times = {}
+        span = max(base) - min(base) + 1
+        for name, run in PLAIN_ENGINES.items():
+            if name == "Counting Sort" and span > SKIP_COUNTING * len(base):
+                continue
+            arr = base[:]
+            start = time.perf_counter()
+            run(arr)
+            times[name] = time.perf_counter() - start
+            if arr != sorted(base):
+                print(f"{name} failed on {preset}", file=sys.stderr)
+        start = time.perf_counter()
+        engine, reason = choose_engine(profile(base))
+        pick_ms = (time.perf_counter() - start) * 1000
+        best = min(times, key=times.get)
+        cells = "".join(f"{times[name]:19.3f}{'*' if name == best else ' '}" if name in times
+                        else f"{'-':>19} " for name in PLAIN_ENGINES)
+        print(f"{preset:<15}{cells}  {engine} ({pick_ms:.1f} ms): {reason}")
+    print(f"seconds; * fastest; - not run (span over {SKIP_COUNTING} x n)")
+
+# -------------------- Main -------------------- #
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+# ---------------- Operation Counting ---------------- #
+# Exact work counters for the algorithm generators, independent of wall-clock
+# noise. Reads are counted by CountingArray, comparisons against a search key
+# by CountedValue; the sorting modules feed comparisons, swaps, writes and
+# auxiliary memory into an OpCounter from the events their generators yield.
+
+class OpCounter:
+    def __init__(self):
+        self.comparisons = 0
+        self.swaps = 0
+        self.writes = 0
+        self.reads = 0
+        self.aux = 0
+        self.aux_peak = 0
+
+    def alloc(self, size):
+        # Auxiliary memory in array slots; negative sizes release it
+        self.aux += size
+        if self.aux > self.aux_peak:
+            self.aux_peak = self.aux
+
+    @classmethod
+    def from_dict(cls, counts):
+        counter = cls()
+        for name, value in counts.items():
+            setattr(counter, name, value)
+        return counter
+
+    def as_dict(self):
+        return {
+            "comparisons": self.comparisons,
+            "swaps": self.swaps,
+            "writes": self.writes,
+            "reads": self.reads,
+            "aux_peak": self.aux_peak
+        }
+
+    def summary(self):
+        return (f"cmp {self.comparisons}  swp {self.swaps}  wr {self.writes}  "
+                f"rd {self.reads}  aux {self.aux_peak}")
+
+class CountingArray(list):
+    # A list that counts element reads made through indexing, slicing and
+    # iteration. Writes are left to the event stream so they are not counted
+    # twice.
+    def __init__(self, values=(), counter=None):
+        super().__init__(values)
+        self.counter = counter if counter is not None else OpCounter()
+
+    def __getitem__(self, index):
+        value = list.__getitem__(self, index)
+        self.counter.reads += len(value) if isinstance(index, slice) else 1
+        return value
+
+    def __iter__(self):
+        self.counter.reads += len(self)
+        return list.__iter__(self)
+
+class CountedValue(int):
+    # An int that counts every comparison made against it. Because it
+    # subclasses int, Python tries its reflected methods first, so both
+    # `arr[i] == key` and `arr[i] < key` are counted.
+    def __new__(cls, value, counter):
+        obj = super().__new__(cls, value)
+        obj.counter = counter
+        return obj
+
+    def __eq__(self, other):
+        self.counter.comparisons += 1
+        return int.__eq__(self, other)
+
+    def __ne__(self, other):
+        self.counter.comparisons += 1
+        return int.__ne__(self, other)
+
+    def __lt__(self, other):
+        self.counter.comparisons += 1
+        return int.__lt__(self, other)
+
+    def __le__(self, other):
+        self.counter.comparisons += 1
+        return int.__le__(self, other)
+
+    def __gt__(self, other):
+        self.counter.comparisons += 1
+        return int.__gt__(self, other)
+
+    def __ge__(self, other):
+        self.counter.comparisons += 1
+        return int.__ge__(self, other)
+
+    __hash__ = int.__hash__
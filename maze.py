@@ -1,55 +1,687 @@
 import tkinter as tk
-from tkinter import ttk
+from tkinter import ttk, filedialog
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 import numpy as np
+import heapq
+import math
 import time
-import threading
+from array import array
+from collections import deque
+from itertools import chain
+from columnrender import ColumnImage, axes_pixels
+from mazegen import GENERATORS, generate_maze
+from tracefile import Trace, maze_path, record_maze
 
-# ================= Maze Solver Algorithm ==================
-def bfs_solver_steps(maze, start, end):
+# ================= Maze Solver Algorithms ==================
+# Cells are flat indices into the maze padded with a ring of walls, so a
+# neighbor is i - width, i + width, i - 1 or i + 1 with no bounds checks.
+# Every solver yields (path, step) like the BFS: path is the route to the
+# node being worked on, a ParentPath read back through a flat int32 parent
+# array only when it is drawn, and step a line of the solver's pseudocode.
+# A SolverStats passed as `stats` is filled in as the solver runs.
+
+SQRT2 = math.sqrt(2)
+
+BFS_STEPS = [
+    "1. Mark start visited, queue = [start]",
+    "2. While queue is not empty:",
+    "3. Pop node from front of queue",
+    "4. If node is end, stop",
+    "5. Mark unvisited open neighbors, set parent, enqueue"
+]
+
+DIJKSTRA_STEPS = [
+    "1. dist[start] = 0, heap = [(0, start)]",
+    "2. While heap is not empty:",
+    "3. Pop node with least dist; skip if done",
+    "4. If node is end, stop",
+    "5. For each neighbor with dist + cost lower: set dist, parent, push"
+]
+
+ASTAR_STEPS = [
+    "1. g[start] = 0, heap = [(h(start), start)]",
+    "2. While heap is not empty:",
+    "3. Pop node with least f = g + h; skip if closed",
+    "4. If node is end, stop",
+    "5. For each neighbor with g + cost lower: set g, parent, push g + h"
+]
+
+BIDIRECTIONAL_STEPS = [
+    "1. Queue start forward and end backward, mark both",
+    "2. While both queues are non-empty:",
+    "3. Pop a node of the smaller side's next layer",
+    "4. If a neighbor is marked by the other side, join the halves",
+    "5. Mark unvisited open neighbors, set parent, enqueue"
+]
+
+JPS_STEPS = [
+    "1. g[start] = 0, heap = [(h(start), start)]",
+    "2. While heap is not empty:",
+    "3. Pop jump point with least f = g + h",
+    "4. If it is the end, stop",
+    "5. Scan straight on from it in each pruned direction",
+    "6. Push each jump point found (forced neighbor or end)"
+]
+
+WAVEFRONT_STEPS = [
+    "1. dist = -1 everywhere, dist[start] = 0, frontier = [start]",
+    "2. Each layer: shift the frontier up, down, left and right",
+    "3. Open unreached cells it covers: dist = layer + 1, next frontier",
+    "4. From end, step to a neighbor with dist - 1 until start"
+]
+
+VISITED, FRONTIER = 1, 2   # kinds of logged cell changes
+
+class SolverStats:
     """
-    Generator-based BFS solver that yields (current_path, current_step)
-    for each action, so visualization can sync with pseudocode.
+    What a solver run cost: nodes expanded (taken off the frontier and
+    worked on), the largest the frontier grew, and the path it found. With
+    log set the solver also logs each cell that joins the frontier or is
+    expanded, for take_changes to hand to a renderer. Solvers that build a
+    whole distance field leave it in distances.
     """
-    rows, cols = maze.shape
-    visited = np.zeros_like(maze)
-    queue = [(start, [start])]
+    def __init__(self, log=False):
+        self.expanded = 0
+        self.peak_frontier = 0
+        self.path_length = 0
+        self.cost = None
+        self.changes = [] if log else None
+        self.width = 0
+        self.distances = None
+
+    def frontier(self, size):
+        if size > self.peak_frontier:
+            self.peak_frontier = size
+
+    def log(self, width):
+        # The list a solver on a padded grid `width` wide appends (cell, kind)
+        # to, or None when not logging
+        self.width = width
+        return self.changes
 
-    # Step mapping
-    INIT_QUEUE = 0
-    WHILE_QUEUE = 1
-    POP_NODE = 2
-    MARK_VISITED = 3
-    CHECK_END = 4
-    ADD_NEIGHBORS = 5
+    def take_changes(self):
+        # (rows, cols, kinds) of the cells logged since the last call
+        logged = np.array(self.changes or [], dtype=np.int64).reshape(-1, 2)
+        if self.changes:
+            self.changes.clear()
+        rows, cols = np.divmod(logged[:, 0], max(self.width, 1))
+        return rows - 1, cols - 1, logged[:, 1]
 
-    yield [], INIT_QUEUE  # Initialize queue
+    def as_dict(self):
+        return {
+            "expanded": self.expanded,
+            "peak_frontier": self.peak_frontier,
+            "path_length": self.path_length,
+            "cost": self.cost
+        }
+
+    def summary(self):
+        cost = "no path" if self.cost is None else f"path {self.path_length} cells, cost {self.cost:g}"
+        return f"expanded {self.expanded}  peak frontier {self.peak_frontier}  {cost}"
+
+def padded_grid(maze):
+    # (flags, width): 1 for walls and the padding ring, 0 for open cells
+    flags = bytearray(np.pad(maze != 0, 1, constant_values=True).tobytes())
+    return flags, maze.shape[1] + 2
+
+def padded_costs(weights, width):
+    # Cost of entering each padded cell, or None for unit costs
+    if weights is None:
+        return None
+    return np.pad(np.asarray(weights, dtype=float), 1, constant_values=1.0).ravel().tolist()
+
+class ParentPath:
+    """
+    The path from the root of a parent array (the start, or the end for a
+    backward search) to one cell, read back only when iterated, so yielding
+    it is O(1) however long it is. Iterating gives (row, col) cells from the
+    root; parents two or more cells apart on one row or column (jump point
+    search links only its jump points) are joined by the cells between.
+    A popped node's parents no longer change, so a path read soon after it
+    was yielded is the one that was yielded. chain() walks the parent array
+    itself back from the cell lazily, jump points only, so a reader can stop
+    partway.
+    """
+    __slots__ = ("parent", "cell", "width")
+
+    def __init__(self, parent, cell, width):
+        self.parent = parent
+        self.cell = cell
+        self.width = width
+
+    def __iter__(self):
+        cells = []
+        for r, c in self.chain():
+            if cells and (r == cells[-1][0] or c == cells[-1][1]):
+                pr, pc = cells[-1]
+                dr, dc = (r > pr) - (r < pr), (c > pc) - (c < pc)
+                while (pr + dr, pc + dc) != (r, c):
+                    pr, pc = pr + dr, pc + dc
+                    cells.append((pr, pc))
+            cells.append((r, c))
+        cells.reverse()
+        return iter(cells)
+
+    def chain(self):
+        parent = self.parent
+        i = self.cell
+        while True:
+            r, c = divmod(i, self.width)
+            yield r - 1, c - 1
+            if parent[i] == i:
+                return
+            i = parent[i]
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __bool__(self):
+        return True
+
+def flat(cell, width):
+    return (cell[0] + 1) * width + cell[1] + 1
+
+def finish(stats, path, cost):
+    stats.path_length = len(path)
+    stats.cost = cost
+
+def bfs_solver_steps(maze, start, end, stats=None):
+    """
+    Generator-based BFS solver that yields (current_path, current_step)
+    for each action, so visualization can sync with pseudocode. Walls and
+    visited cells share one flag array and a cell is marked when it is
+    enqueued, so it enters the queue at most once.
+    """
+    INIT_QUEUE, WHILE_QUEUE, POP_NODE, CHECK_END, ADD_NEIGHBORS = range(5)
+    stats = stats if stats is not None else SolverStats()
+
+    seen, width = padded_grid(maze)
+    parent = array("i", [-1]) * len(seen)
+    source, goal = flat(start, width), flat(end, width)
+    log = stats.log(width)
+    yield [], INIT_QUEUE
+    if seen[source]:
+        return
+    seen[source] = 1
+    parent[source] = source
+    queue = deque([source])
 
     while queue:
-        yield [], WHILE_QUEUE  # Start of while loop
+        yield [], WHILE_QUEUE
+        stats.frontier(len(queue))
+        i = queue.popleft()
+        stats.expanded += 1
+        if log is not None:
+            log.append((i, VISITED))
+        path = ParentPath(parent, i, width)
+        yield path, POP_NODE
+        if i == goal:
+            finish(stats, path, len(path) - 1)
+            yield path, CHECK_END
+            return
+        for j in (i - width, i + width, i - 1, i + 1):
+            if not seen[j]:
+                seen[j] = 1
+                parent[j] = i
+                queue.append(j)
+                if log is not None:
+                    log.append((j, FRONTIER))
+        yield path, ADD_NEIGHBORS
+
+def best_first_steps(maze, start, end, weights, heuristic, diagonal, stats):
+    # Dijkstra (no heuristic) and A*. Entering a cell costs its weight (1
+    # without weights) times the step length, sqrt(2) for diagonal steps,
+    # which may not cut a wall corner. The heap holds (f, h, cell) with lazy
+    # deletion: a cell popped again after it was closed is skipped.
+    INIT, WHILE, POP, CHECK_END, RELAX = range(5)
+    stats = stats if stats is not None else SolverStats()
 
-        (r, c), path = queue.pop(0)
-        yield [], POP_NODE  # Pop node
+    wall, width = padded_grid(maze)
+    costs = padded_costs(weights, width)
+    parent = array("i", [-1]) * len(wall)
+    g = array("d", [math.inf]) * len(wall)
+    closed = bytearray(len(wall))
+    source, goal = flat(start, width), flat(end, width)
+    gr, gc = divmod(goal, width)
+    # (offset, length, the two cells a diagonal step passes between)
+    steps = [(d, 1.0, 0, 0) for d in (-width, width, -1, 1)]
+    if diagonal:
+        steps += [(dr * width + dc, SQRT2, dr * width, dc) for dr in (-1, 1) for dc in (-1, 1)]
+    h = (lambda i: heuristic(i // width - gr, i % width - gc)) if heuristic else (lambda i: 0)
+    log = stats.log(width)
+    yield [], INIT
+    if wall[source]:
+        return
+    g[source] = 0.0
+    parent[source] = source
+    heap = [(h(source), 0, source)]
 
-        if visited[r, c]:
+    while heap:
+        yield [], WHILE
+        stats.frontier(len(heap))
+        _, _, i = heapq.heappop(heap)
+        if closed[i]:
             continue
+        closed[i] = 1
+        stats.expanded += 1
+        if log is not None:
+            log.append((i, VISITED))
+        path = ParentPath(parent, i, width)
+        yield path, POP
+        if i == goal:
+            finish(stats, path, g[i])
+            yield path, CHECK_END
+            return
+        for d, length, side_a, side_b in steps:
+            j = i + d
+            if wall[j] or closed[j] or wall[i + side_a] or wall[i + side_b]:
+                continue
+            cost = g[i] + length * (costs[j] if costs else 1.0)
+            if cost < g[j]:
+                g[j] = cost
+                parent[j] = i
+                hj = h(j)
+                heapq.heappush(heap, (cost + hj, hj, j))
+                if log is not None:
+                    log.append((j, FRONTIER))
+        yield path, RELAX
+
+def manhattan(dr, dc):
+    return abs(dr) + abs(dc)
+
+def octile(dr, dc):
+    dr, dc = abs(dr), abs(dc)
+    return max(dr, dc) + (SQRT2 - 1) * min(dr, dc)
+
+def dijkstra_solver_steps(maze, start, end, stats=None, weights=None):
+    yield from best_first_steps(maze, start, end, weights, None, False, stats)
+
+def astar_solver_steps(maze, start, end, stats=None, weights=None):
+    yield from best_first_steps(maze, start, end, weights, manhattan, False, stats)
+
+def astar_octile_solver_steps(maze, start, end, stats=None, weights=None):
+    # 8-way moves; octile distance is exact on an open grid
+    yield from best_first_steps(maze, start, end, weights, octile, True, stats)
+
+def bidirectional_bfs_solver_steps(maze, start, end, stats=None):
+    # BFS from both ends, one whole layer at a time from whichever side has
+    # the smaller frontier. Every meeting found while a layer is expanded is
+    # a candidate; the shortest of that layer's candidates is a shortest
+    # path, so the layer is finished before the halves are joined.
+    INIT, WHILE, POP, MEET, ENQUEUE = range(5)
+    stats = stats if stats is not None else SolverStats()
+
+    wall, width = padded_grid(maze)
+    size = len(wall)
+    parents = (array("i", [-1]) * size, array("i", [-1]) * size)
+    dist = (array("i", [-1]) * size, array("i", [-1]) * size)
+    source, goal = flat(start, width), flat(end, width)
+    log = stats.log(width)
+    yield [], INIT
+    if wall[source] or wall[goal]:
+        return
+    queues = (deque([source]), deque([goal]))
+    for side, root in ((0, source), (1, goal)):
+        parents[side][root] = root
+        dist[side][root] = 0
+
+    while queues[0] and queues[1]:
+        side = 0 if len(queues[0]) <= len(queues[1]) else 1
+        queue, parent, here, there = queues[side], parents[side], dist[side], dist[1 - side]
+        stats.frontier(len(queues[0]) + len(queues[1]))
+        best = None
+        for _ in range(len(queue)):
+            yield [], WHILE
+            i = queue.popleft()
+            stats.expanded += 1
+            if log is not None:
+                log.append((i, VISITED))
+            path = ParentPath(parent, i, width)
+            yield path, POP
+            if there[i] >= 0:
+                # Only when start == end
+                best = (here[i] + there[i], i, i)
+            for j in (i - width, i + width, i - 1, i + 1):
+                if wall[j]:
+                    continue
+                if there[j] >= 0:
+                    length = here[i] + 1 + there[j]
+                    if best is None or length < best[0]:
+                        best = (length, i, j)
+                elif here[j] < 0:
+                    here[j] = here[i] + 1
+                    parent[j] = i
+                    queue.append(j)
+                    if log is not None:
+                        log.append((j, FRONTIER))
+            yield path, ENQUEUE
+        if best is not None:
+            _, i, j = best
+            near = list(ParentPath(parent, i, width))
+            far = list(ParentPath(parents[1 - side], j, width))[::-1]
+            if i == j:
+                far = far[1:]
+            path = near + far if side == 0 else far[::-1] + near[::-1]
+            finish(stats, path, len(path) - 1)
+            yield path, MEET
+            return
+
+def jps_solver_steps(maze, start, end, stats=None):
+    # Jump point search for 4-way moves (no diagonals): from each jump point
+    # it scans straight on in the pruned directions and only stops at cells
+    # with a forced neighbor (an open side cell whose cell behind is a wall)
+    # or, on vertical scans, cells from which a horizontal scan finds one.
+    # Only jump points enter the heap; ParentPath fills in the straight runs.
+    INIT, WHILE, POP, CHECK_END, SCAN, PUSH = range(6)
+    stats = stats if stats is not None else SolverStats()
+
+    wall, width = padded_grid(maze)
+    parent = array("i", [-1]) * len(wall)
+    g = array("d", [math.inf]) * len(wall)
+    closed = bytearray(len(wall))
+    source, goal = flat(start, width), flat(end, width)
+    gr, gc = divmod(goal, width)
+
+    def h(i):
+        return abs(i // width - gr) + abs(i % width - gc)
+
+    def jump(i, d):
+        # First jump point from i in direction d, or -1
+        side = width if d in (1, -1) else 1
+        while True:
+            i += d
+            if wall[i]:
+                return -1
+            if i == goal:
+                return i
+            if (not wall[i - side] and wall[i - d - side]) or (not wall[i + side] and wall[i - d + side]):
+                return i
+            if side == 1 and (jump(i, 1) >= 0 or jump(i, -1) >= 0):
+                return i
+
+    log = stats.log(width)
+    yield [], INIT
+    if wall[source]:
+        return
+    g[source] = 0.0
+    parent[source] = source
+    heap = [(h(source), 0, source)]
+
+    while heap:
+        yield [], WHILE
+        stats.frontier(len(heap))
+        _, _, i = heapq.heappop(heap)
+        if closed[i]:
+            continue
+        closed[i] = 1
+        stats.expanded += 1
+        if log is not None:
+            log.append((i, VISITED))
+        path = ParentPath(parent, i, width)
+        yield path, POP
+        if i == goal:
+            finish(stats, path, g[i])
+            yield path, CHECK_END
+            return
+        p = parent[i]
+        if p == i:
+            directions = (-width, width, -1, 1)
+        elif abs(i - p) < width:
+            d = 1 if i > p else -1
+            directions = (d, -width, width)
+        else:
+            d = width if i > p else -width
+            directions = (d, -1, 1)
+        yield path, SCAN
+        for d in directions:
+            j = jump(i, d)
+            if j < 0 or closed[j]:
+                continue
+            cost = g[i] + abs(j - i) // (1 if d in (1, -1) else width)
+            if cost < g[j]:
+                g[j] = cost
+                parent[j] = i
+                hj = h(j)
+                heapq.heappush(heap, (cost + hj, hj, j))
+                if log is not None:
+                    log.append((j, FRONTIER))
+        yield path, PUSH
+
+# ================= Wavefront Solver ==================
+# BFS a whole layer at a time in NumPy, for grids far too big for a queue of
+# single cells. Layer k + 1 is every open, unreached cell next to layer k.
+# While the frontier fills a good share of its bounding box the layer is
+# grown as a boolean array: the box shifted one cell up, down, left and
+# right, ORed and masked by the open, unreached cells. A thin frontier (the
+# usual case in a big maze, a ragged line across a large box) is grown from
+# its flat indices instead, so a layer costs in proportion to the frontier,
+# not the box. The result is the full distance field (int32, -1 where
+# unreachable); the path is read back by gradient descent from the end.
+
+DENSE_SHARE = 1 / 16      # grow by masks while the frontier fills this much of its box
+
+def wavefront_solver_steps(maze, start, end, stats=None):
+    # One step per layer. end may be None for just the distance field,
+    # which is stats.distances (the padding stripped).
+    INIT, SHIFT, MARK, DESCEND = range(4)
+    stats = stats if stats is not None else SolverStats()
+
+    rows, cols = maze.shape
+    width = cols + 2
+    todo = np.zeros((rows + 2, width), dtype=bool)
+    todo[1:-1, 1:-1] = maze == 0
+    dist = np.full(todo.shape, -1, dtype=np.int32)
+    stats.distances = dist[1:-1, 1:-1]
+    flat_todo, flat_dist = todo.reshape(-1), dist.reshape(-1)
+    source = flat(start, width)
+    yield [], INIT
+    if not flat_todo[source]:
+        return
+    flat_todo[source] = False
+    flat_dist[source] = 0
+    frontier = np.array([source], dtype=np.int64)
+    offsets = np.array([-width, width, -1, 1], dtype=np.int64)
+    layer = 0
+
+    while len(frontier):
+        stats.expanded += len(frontier)
+        stats.frontier(len(frontier))
+        r, c = np.divmod(frontier, width)
+        r0, r1, c0, c1 = r.min() - 1, r.max() + 2, c.min() - 1, c.max() + 2
+        if len(frontier) >= DENSE_SHARE * (r1 - r0) * (c1 - c0):
+            box = np.s_[r0:r1, c0:c1]
+            front = dist[box] == layer
+            grow = np.zeros_like(front)
+            grow[1:] |= front[:-1]
+            grow[:-1] |= front[1:]
+            grow[:, 1:] |= front[:, :-1]
+            grow[:, :-1] |= front[:, 1:]
+            grow &= todo[box]
+            todo[box][grow] = False
+            dist[box][grow] = layer + 1
+            gr, gc = np.nonzero(grow)
+            frontier = (gr + r0) * width + (gc + c0)
+        else:
+            near = (frontier[:, None] + offsets).ravel()
+            near = near[flat_todo[near]]
+            flat_todo[near] = False
+            # A cell reached from two frontier cells is listed twice: tag
+            # each entry with its own negative code, keep the one that stuck
+            codes = -2 - np.arange(len(near), dtype=np.int32)
+            flat_dist[near] = codes
+            frontier = near[flat_dist[near] == codes]
+            flat_dist[frontier] = layer + 1
+        layer += 1
+        yield [], MARK
+
+    if end is None:
+        return
+    goal = flat(end, width)
+    if flat_dist[goal] < 0:
+        return
+    # Gradient descent: any neighbor one closer to the start will do
+    closer = memoryview(flat_dist)
+    cells = array("i", [goal])
+    i = goal
+    for d in range(flat_dist[goal] - 1, -1, -1):
+        for j in (i - width, i + width, i - 1, i + 1):
+            if closer[j] == d:
+                i = j
+                break
+        cells.append(i)
+    r, c = np.divmod(np.frombuffer(cells, dtype=np.int32)[::-1], width)
+    path = list(zip((r - 1).tolist(), (c - 1).tolist()))
+    finish(stats, path, len(path) - 1)
+    yield path, DESCEND
+
+# name -> (solver, pseudocode, takes weights)
+SOLVERS = {
+    "BFS": (bfs_solver_steps, BFS_STEPS, False),
+    "Bidirectional BFS": (bidirectional_bfs_solver_steps, BIDIRECTIONAL_STEPS, False),
+    "Dijkstra": (dijkstra_solver_steps, DIJKSTRA_STEPS, True),
+    "A* (Manhattan)": (astar_solver_steps, ASTAR_STEPS, True),
+    "A* (octile, 8-way)": (astar_octile_solver_steps, ASTAR_STEPS, True),
+    "Jump Point Search": (jps_solver_steps, JPS_STEPS, False),
+    "Wavefront (NumPy)": (wavefront_solver_steps, WAVEFRONT_STEPS, False)
+}
+
+# ================= Maze Renderer ==================
+# The maze is one RGBA image the size of the axes in pixels, pinned to the
+# axes like columnrender's ColumnImage, so it is never resampled. Each pixel
+# shows the cell its top left corner falls in, so a cell smaller than a
+# pixel shares it with its neighbors. Repainting everything (a new layout,
+# a generator step) samples one cell per pixel, so it costs the same for
+# any maze size; a solver step only repaints the cells it logged as visited
+# or on the frontier. A distance field, when set, is drawn over the open
+# cells as a heatmap, scaled to the largest distance on screen. The image
+# and the path line are animated: a frame restores the cached background,
+# draws the two and blits the axes.
+
+OPEN, WALL = 0, 3         # PALETTE rows, next to VISITED and FRONTIER
+PALETTE = np.array([
+    [255, 255, 255, 255],     # open
+    [173, 216, 230, 255],     # visited
+    [255, 190, 110, 255],     # frontier
+    [30, 30, 30, 255]         # wall
+], dtype=np.uint8)
+HEAT = (plt.get_cmap("viridis")(np.linspace(0, 1, 256)) * 255).astype(np.uint8)
+
+class MazeRenderer:
+    """
+    Persistent maze image with a visited / frontier layer and the current
+    path: reset for a new maze, paint_cells for a solver step's changes,
+    refresh after the maze or the distance field changed in place,
+    set_path, then redraw.
+    """
+    def __init__(self, ax, canvas):
+        self.ax = ax
+        self.canvas = canvas
+        self.image = None
+        self.distances = None
+        self.size = None
+        self.background = None
+        self.cid = self.canvas.mpl_connect("draw_event", self.on_draw)
+
+    def reset(self, maze):
+        self.ax.clear()
+        self.maze = maze
+        self.state = np.zeros(maze.shape, dtype=np.uint8)
+        self.distances = None
+        rows, cols = maze.shape
+        self.ax.set_xlim(-0.5, cols - 0.5)
+        self.ax.set_ylim(rows - 0.5, -0.5)
+        self.ax.set_aspect('equal')
+        self.image = self.ax.add_artist(ColumnImage(self.ax, np.zeros((1, 1, 4), dtype=np.uint8),
+                                                    animated=True))
+        self.path, = self.ax.plot([], [], color='red', linewidth=2, animated=True)
+        self.size = None
+        self.background = None
+        self.canvas.draw()
+
+    def layout(self):
+        # Cell of each pixel, and the pixels of each cell, for the current
+        # axes size; pixel row 0 is the bottom of the axes
+        size = axes_pixels(self.ax)
+        if size == self.size:
+            return
+        self.size = size
+        width, height = size
+        rows, cols = self.maze.shape
+        self.pixel_rows = (np.arange(height)[::-1] * rows) // height
+        self.pixel_cols = (np.arange(width) * cols) // width
+        left, right = self.spans(cols, width)
+        top, bottom = self.spans(rows, height)
+        # Plain lists: paint_cells slices with them one cell at a time
+        self.col_span = (left.tolist(), right.tolist())
+        self.row_span = ((height - bottom).tolist(), (height - top).tolist())
+        self.refresh(redraw=False)
 
-        visited[r, c] = 1
-        yield path, MARK_VISITED  # Mark visited
+    @staticmethod
+    def spans(cells, pixels):
+        # [first, last) pixel of each cell: the pixels that show it, or the
+        # one it falls in when it is smaller than a pixel
+        k = np.arange(cells + 1, dtype=np.int64)
+        edge = -(-k * pixels // cells)
+        first, last = edge[:-1], edge[1:]
+        hidden = last <= first
+        first = np.where(hidden, k[:-1] * pixels // cells, first)
+        return first, np.where(hidden, first + 1, last)
 
-        if (r, c) == end:
-            yield path, CHECK_END  # End found
+    def refresh(self, redraw=True):
+        # Repaints every pixel from the maze and the visited / frontier
+        # layer; a maze value of 2 (a generator's frontier) shows as frontier
+        if self.size is None:
             return
+        maze = self.maze[self.pixel_rows[:, None], self.pixel_cols]
+        state = self.state[self.pixel_rows[:, None], self.pixel_cols]
+        codes = np.where(maze == 0, state, np.where(maze == 2, FRONTIER, WALL))
+        self.pixels = PALETTE[codes]
+        if self.distances is not None:
+            d = self.distances[self.pixel_rows[:, None], self.pixel_cols]
+            reached = d >= 0
+            top = max(int(d.max()), 1)
+            self.pixels[reached] = HEAT[d[reached].astype(np.int64) * 255 // top]
+        self.image.set_data(self.pixels)
+        if redraw:
+            self.redraw()
 
-        # Add neighbors
-        for dr, dc in [(-1,0),(1,0),(0,-1),(0,1)]:
-            nr, nc = r+dr, c+dc
-            if 0 <= nr < rows and 0 <= nc < cols and maze[nr, nc] == 0 and not visited[nr, nc]:
-                queue.append(((nr, nc), path + [(nr, nc)]))
-        yield path, ADD_NEIGHBORS  # Neighbors added
+    def clear_state(self):
+        self.state[:] = 0
+        self.distances = None
+        self.refresh()
+
+    def paint_cells(self, rows, cols, kinds):
+        self.state[rows, cols] = kinds
+        if self.size is None:
+            return
+        (x0, x1), (y0, y1) = self.col_span, self.row_span
+        for r, c, k in zip(rows.tolist(), cols.tolist(), kinds.tolist()):
+            self.pixels[y0[r]:y1[r], x0[c]:x1[c]] = PALETTE[k]
+
+    def set_path(self, path):
+        cells = np.array(list(path), dtype=np.int64).reshape(-1, 2)
+        self.path.set_data(cells[:, 1], cells[:, 0])
+
+    def on_draw(self, event):
+        if self.image is None:
+            return
+        self.layout()
+        self.background = self.canvas.copy_from_bbox(self.ax.bbox)
+        self.ax.draw_artist(self.image)
+        self.ax.draw_artist(self.path)
+
+    def redraw(self):
+        if self.background is None:
+            return
+        self.canvas.restore_region(self.background)
+        self.ax.draw_artist(self.image)
+        self.ax.draw_artist(self.path)
+        self.canvas.blit(self.ax.bbox)
 
 # ================= Maze Visualizer ==================
+STEP_MS = 300       # default delay between steps
+FRAME_MS = 30       # with no delay, the steps run for this long per frame
 class MazeVisualizer:
     def __init__(self, root, maze):
         self.root = root
@@ -60,20 +692,23 @@ class MazeVisualizer:
         self.start = (0, 0)
         self.end = (maze.shape[0]-1, maze.shape[1]-1)
 
-        # Pseudocode steps
-        self.algorithm_steps = [
-            "1. Initialize queue with start node",
-            "2. While queue is not empty:",
-            "3. Pop node from queue",
-            "4. Mark node as visited",
-            "5. If node is end, stop",
-            "6. Add unvisited neighbors to queue"
-        ]
+        # Pseudocode steps of the selected solver
+        self.solver_name = tk.StringVar(value="BFS")
+        self.algorithm_steps = BFS_STEPS
 
         # Set up matplotlib figure
         self.fig, self.ax = plt.subplots()
         self.canvas = FigureCanvasTkAgg(self.fig, master=root)
         self.canvas.get_tk_widget().grid(row=0, column=0, rowspan=6)
+        self.renderer = MazeRenderer(self.ax, self.canvas)
+
+        # Steps run on the Tk main loop, one frame per tick
+        self.steps = None
+        self.tick_id = None
+        self.generating = False
+        self.delay = tk.IntVar(value=STEP_MS)
+        tk.Scale(root, from_=0, to=1000, orient=tk.HORIZONTAL, label="Delay (ms)",
+                 variable=self.delay).grid(row=9, column=0, columnspan=2, sticky='ew')
 
         # Control buttons
         self.start_btn = ttk.Button(root, text="Start", command=self.start_visualization)
@@ -83,31 +718,78 @@ class MazeVisualizer:
         self.stop_btn = ttk.Button(root, text="Stop", command=self.stop_visualization)
         self.stop_btn.grid(row=2, column=1, sticky='ew')
 
+        # Trace player: Start plays the open trace from the scrubber position
+        trace_frame = ttk.Frame(root)
+        trace_frame.grid(row=6, column=1, sticky='ew')
+        ttk.Button(trace_frame, text="Record Trace...", command=self.record_trace).pack(side=tk.LEFT)
+        ttk.Button(trace_frame, text="Open Trace...", command=self.open_trace).pack(side=tk.LEFT)
+        self.step_scale = tk.Scale(root, from_=0, to=0, orient=tk.HORIZONTAL, label="Trace step")
+        self.step_scale.grid(row=6, column=0, sticky='ew')
+        self.step_scale.bind("<B1-Motion>", lambda e: self.seek_trace(self.step_scale.get()))
+        self.step_scale.bind("<ButtonRelease-1>", lambda e: self.seek_trace(self.step_scale.get()))
+        self.trace = None
+        self.trace_pos = -1
+
         # Text area for pseudocode
         self.text = tk.Text(root, height=15, width=40)
         self.text.grid(row=3, column=1, rowspan=3)
         self.text.tag_configure("highlight", background="yellow")
 
-        self.draw_maze()
+        # Solver choice and what the last run cost
+        solver_menu = ttk.Combobox(root, textvariable=self.solver_name, values=list(SOLVERS), state="readonly")
+        solver_menu.grid(row=7, column=1, sticky='ew')
+        solver_menu.bind("<<ComboboxSelected>>", lambda e: self.select_solver())
+        self.stats_label = ttk.Label(root, text="")
+        self.stats_label.grid(row=7, column=0, sticky='w')
+        self.stats = None
+
+        # Maze generation: Generate builds a size x size maze, drawing every
+        # step when Animate is on
+        gen_frame = ttk.Frame(root)
+        gen_frame.grid(row=8, column=0, columnspan=2, sticky='ew')
+        self.generator_name = tk.StringVar(value="Recursive Backtracker")
+        ttk.Combobox(gen_frame, textvariable=self.generator_name, values=list(GENERATORS),
+                     state="readonly").pack(side=tk.LEFT)
+        self.size_var = tk.IntVar(value=21)
+        ttk.Label(gen_frame, text="Size").pack(side=tk.LEFT)
+        tk.Spinbox(gen_frame, from_=3, to=10001, textvariable=self.size_var, width=6).pack(side=tk.LEFT)
+        self.seed_var = tk.IntVar(value=0)
+        ttk.Label(gen_frame, text="Seed").pack(side=tk.LEFT)
+        tk.Spinbox(gen_frame, from_=0, to=999999, textvariable=self.seed_var, width=7).pack(side=tk.LEFT)
+        self.animate = tk.BooleanVar(value=False)
+        tk.Checkbutton(gen_frame, text="Animate", variable=self.animate).pack(side=tk.LEFT)
+        ttk.Button(gen_frame, text="Generate", command=self.generate).pack(side=tk.LEFT)
+
+        self.renderer.reset(self.maze)
+
+    def select_solver(self):
+        self.stop_visualization()
+        self.trace = None
+        self.algorithm_steps = SOLVERS[self.solver_name.get()][1]
+        self.text.delete(1.0, tk.END)
+        for line in self.algorithm_steps:
+            self.text.insert(tk.END, line + "\n")
+        self.stats_label.config(text="")
 
     def draw_maze(self, path=[]):
-        self.ax.clear()
-        self.ax.imshow(self.maze, cmap='gray_r')
-        if path:
-            y, x = zip(*path)
-            self.ax.plot(x, y, color='red', linewidth=2)
-        self.canvas.draw()
+        self.renderer.set_path(path)
+        self.renderer.redraw()
 
     def start_visualization(self):
         if self.running:
             return
-        self.running = True
-        self.paused = False
         self.text.delete(1.0, tk.END)
         for line in self.algorithm_steps:
             self.text.insert(tk.END, line + "\n")
-
-        threading.Thread(target=self.visualize_steps).start()
+        if self.trace is not None:
+            start = self.trace_pos + 1 if self.trace_pos + 1 < len(self.trace) else 0
+            self.stats = None
+            self.run(self.trace_steps(start))
+        else:
+            self.stats = SolverStats(log=True)
+            self.renderer.clear_state()
+            solver = SOLVERS[self.solver_name.get()][0]
+            self.run(solver(self.maze, self.start, self.end, self.stats))
 
     def pause_visualization(self):
         self.paused = not self.paused
@@ -115,6 +797,59 @@ class MazeVisualizer:
     def stop_visualization(self):
         self.running = False
         self.paused = False
+        if self.tick_id is not None:
+            self.root.after_cancel(self.tick_id)
+            self.tick_id = None
+        if self.generating:
+            self.finish_generation()
+
+    def run(self, steps, generating=False):
+        # steps yields (path, step)
+        self.steps = steps
+        self.generating = generating
+        self.running = True
+        self.paused = False
+        self.tick()
+
+    def tick(self):
+        # One frame: the next step, or with no delay as many as fit in
+        # FRAME_MS, drawn once
+        self.tick_id = None
+        if not self.running:
+            return
+        if self.paused:
+            self.tick_id = self.root.after(100, self.tick)
+            return
+        delay = int(self.delay.get())
+        deadline = time.perf_counter() + FRAME_MS / 1000
+        shown = None
+        for shown in self.steps:
+            if self.stats is not None:
+                self.renderer.paint_cells(*self.stats.take_changes())
+            if delay or time.perf_counter() >= deadline:
+                break
+        else:
+            self.running = False
+        if shown is not None:
+            self.show_step(*shown)
+        if self.running:
+            self.tick_id = self.root.after(delay, self.tick)
+        elif self.generating:
+            self.finish_generation()
+
+    def show_step(self, path, step):
+        if self.generating:
+            self.renderer.refresh(redraw=False)
+        elif self.stats is not None and self.stats.distances is not None:
+            # Distance field solvers: the heatmap grows a layer per step
+            self.renderer.distances = self.stats.distances
+            self.renderer.refresh(redraw=False)
+        self.draw_maze(path)
+        self.highlight_step(step)
+        if self.trace is not None:
+            self.step_scale.set(self.trace_pos)
+        elif self.stats is not None:
+            self.stats_label.config(text=self.stats.summary())
 
     def highlight_step(self, step_num):
         self.text.tag_remove("highlight", "1.0", tk.END)
@@ -122,20 +857,140 @@ class MazeVisualizer:
         line_end = f"{step_num+1}.end"
         self.text.tag_add("highlight", line_start, line_end)
 
-    def visualize_steps(self):
-        generator = bfs_solver_steps(self.maze, self.start, self.end)
-        for path, step in generator:
-            if not self.running:
-                break
-            while self.paused:
-                time.sleep(0.1)
-            self.draw_maze(path)
-            self.highlight_step(step)
-            time.sleep(0.3)
-        self.running = False
+    # ================= Maze Generation ==================
+    def generate(self):
+        if self.running:
+            return
+        self.trace = None
+        self.stats = None
+        name = self.generator_name.get()
+        size, seed = int(self.size_var.get()), int(self.seed_var.get())
+        if not self.animate.get():
+            self.set_maze(generate_maze(name, size, size, seed))
+            return
+        self.text.delete(1.0, tk.END)
+        for line in GENERATORS[name][1]:
+            self.text.insert(tk.END, line + "\n")
+        steps = GENERATORS[name][0](size, size, seed)
+        maze, cells, step = next(steps)
+        self.renderer.reset(maze)
+        self.run(chain([(cells, step)], ((cells, step) for _, cells, step in steps)), generating=True)
+
+    def finish_generation(self):
+        # Stop skips the drawing, not the rest of the maze
+        self.generating = False
+        for _ in self.steps:
+            pass
+        self.set_maze(np.ascontiguousarray(self.renderer.maze))
+
+    def set_maze(self, maze):
+        self.maze = maze
+        self.start = (0, 0)
+        self.end = (maze.shape[0]-1, maze.shape[1]-1)
+        self.stats_label.config(text="")
+        self.renderer.reset(maze)
+
+    # ================= Trace Recording and Playback ==================
+    def record_trace(self):
+        path = filedialog.asksaveasfilename(defaultextension=".trc",
+                                            filetypes=[("Trace files", "*.trc")])
+        if not path:
+            return
+        name = self.solver_name.get()
+        solver, steps, _ = SOLVERS[name]
+        record_maze(path, solver, self.maze, self.start, self.end, {"name": name, "lines": steps})
+        self.load_trace(path)
+
+    def open_trace(self):
+        path = filedialog.askopenfilename(filetypes=[("Trace files", "*.trc")])
+        if path:
+            self.load_trace(path)
+
+    def load_trace(self, path):
+        trace = Trace(path)
+        if trace.kind != "maze":
+            return
+        self.stop_visualization()
+        self.trace = trace
+        self.trace_pos = -1
+        self.maze = trace.state_at(-1).reshape(trace.shape)[0]
+        self.start = tuple(trace.meta["start"])
+        self.end = tuple(trace.meta["end"])
+        self.algorithm_steps = trace.meta.get("lines", self.algorithm_steps)
+        self.step_scale.config(to=max(0, len(trace) - 1))
+        self.step_scale.set(0)
+        self.renderer.reset(self.maze)
+
+    def trace_path(self, state, highlights):
+        cols = self.maze.shape[1]
+        return [divmod(i, cols) for i in maze_path(state, highlights, cols)]
+
+    def trace_steps(self, start):
+        for s, (state, highlights, step) in enumerate(self.trace.play(start), start):
+            self.trace_pos = s
+            yield self.trace_path(state, highlights), step
+
+    def seek_trace(self, s):
+        if self.trace is None or not len(self.trace):
+            return
+        self.stop_visualization()
+        self.trace_pos = int(s)
+        state, highlights, step = self.trace.frame(self.trace_pos)
+        if not self.text.get("1.0", "end-1c"):
+            for line in self.algorithm_steps:
+                self.text.insert(tk.END, line + "\n")
+        self.draw_maze(self.trace_path(state, highlights))
+        self.highlight_step(step)
+
+# ================= Headless Solve ==================
+def solve_headless(solver, maze, start, end, stats=None, **kwargs):
+    # Drains a solver generator without drawing; returns (steps, final path)
+    steps = 0
+    path = []
+    for path, _ in solver(maze, start, end, stats, **kwargs):
+        steps += 1
+    return steps, list(path)
+
+def main(argv=None):
+    # No arguments: the visualizer on the demo maze. --size N: solve an N x N
+    # maze (random walls, or --generator) headless with each solver and
+    # report what it cost.
+    import argparse
+    parser = argparse.ArgumentParser(description="Maze solver visualizer")
+    parser.add_argument("--size", type=int, help="solve a random size x size maze headless")
+    parser.add_argument("--density", type=float, default=0.3, help="share of wall cells")
+    parser.add_argument("--generator", choices=GENERATORS, help="build the maze with a generator instead")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--solvers", nargs="+", choices=SOLVERS, default=list(SOLVERS))
+    parser.add_argument("--weighted", action="store_true",
+                        help="random cell costs 1-9 (only the solvers that take weights)")
+    args = parser.parse_args(argv)
+
+    if args.size:
+        rng = np.random.default_rng(args.seed)
+        if args.generator:
+            t = time.perf_counter()
+            maze = generate_maze(args.generator, args.size, args.size, args.seed)
+            print(f"{args.generator}: {maze.shape[0]} x {maze.shape[1]} in {time.perf_counter() - t:.2f} s")
+        else:
+            maze = (rng.random((args.size, args.size)) < args.density).astype(np.int8)
+        start, end = (0, 0), (maze.shape[0] - 1, maze.shape[1] - 1)
+        maze[start] = maze[end] = 0
+        weights = rng.integers(1, 10, maze.shape) if args.weighted else None
+        w = max(len(name) for name in args.solvers)
+        for name in args.solvers:
+            solver, _, weighted = SOLVERS[name]
+            if args.weighted and not weighted:
+                print(f"{name:<{w}}  skipped: unit costs only")
+                continue
+            stats = SolverStats()
+            t = time.perf_counter()
+            steps, _ = solve_headless(solver, maze, start, end, stats,
+                                      **({"weights": weights} if weighted else {}))
+            seconds = time.perf_counter() - t
+            print(f"{name:<{w}}  {steps} steps  {stats.summary()}  {seconds:.2f} s")
+        return
 
-# ================= Main ==================
-if __name__ == "__main__":
     maze = np.zeros((10, 10))
     maze[1, 2:9] = 1
     maze[2:7, 5] = 1
@@ -147,5 +1002,6 @@ if __name__ == "__main__":
     app = MazeVisualizer(root, maze)
     root.mainloop()
 
-
-
+# ================= Main ==================
+if __name__ == "__main__":
+    main()
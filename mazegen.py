@@ -0,0 +1,371 @@
+import random
+import sys
+import time
+from array import array
+
+import numpy as np
+
+# ================= Maze Generators ==================
+# Mazes use maze.py's layout: an int8 grid, 1 for walls and 0 for open cells.
+# The perfect mazes (recursive backtracker, Kruskal, Prim) put their cells on
+# the even rows and columns with a wall or passage between each pair of
+# neighbors, so the grid sizes are odd (even sizes are rounded down) and the
+# corners, where maze.py starts and ends, are always cells. Every maze has
+# exactly one path between any two cells. The cave generator fills any size
+# and makes no such promise.
+#
+# Every generator yields (grid, cells, line): grid is the maze being built,
+# changed in place, cells the ones the step worked on, line a step of its
+# pseudocode. The first step is always the untouched grid, so draining the
+# generator after it (generate_maze) builds the maze without drawing. With
+# track=False the generators only yield that first step and take their fast
+# paths. All of them are seeded, so a seed always gives the same maze.
+
+BACKTRACKER_STEPS = [
+    "1. Mark start visited, stack = [start]",
+    "2. While stack is not empty:",
+    "3. Pick a random unvisited neighbor of the top cell",
+    "4. Carve through to it and push it",
+    "5. None left: pop the top cell (backtrack)"
+]
+
+KRUSKAL_STEPS = [
+    "1. Every cell is its own set; shuffle the walls",
+    "2. For each wall in shuffled order:",
+    "3. Find the sets of the cells on both sides",
+    "4. Different sets: carve the wall, union the sets"
+]
+
+PRIM_STEPS = [
+    "1. Add a random cell to the maze, its neighbors to the frontier",
+    "2. While frontier is not empty:",
+    "3. Take a random frontier cell",
+    "4. Carve to a random neighbor already in the maze",
+    "5. Add its unvisited neighbors to the frontier"
+]
+
+CAVE_STEPS = [
+    "1. Fill each cell with wall at random (FILL)",
+    "2. Repeat ITERATIONS times:",
+    "3. Count walls in each 3x3 block",
+    "4. Cell becomes wall if 5 or more, else open"
+]
+
+CAVE_FILL = 0.45          # share of walls in the random fill
+CAVE_ITERATIONS = 5       # smoothing rounds
+
+def cell_shape(rows, cols):
+    # Cells down and across of the largest perfect maze in rows x cols
+    if rows < 1 or cols < 1:
+        raise ValueError("a maze needs at least one row and column")
+    return (rows + 1) // 2, (cols + 1) // 2
+
+def padded_cells(rows, cols):
+    # (buffer, maze, width) for the sequential generators: a flat bytearray of
+    # the grid padded by a ring of two, so a cell's neighbors are two steps
+    # away (i +- 2, i +- 2 * width) with no bounds checks. The ring holds 3,
+    # cells start at 1 (unvisited) and maze is the unpadded int8 view.
+    h, w = cell_shape(rows, cols)
+    grid = np.full((2 * h + 3, 2 * w + 3), 3, dtype=np.int8)
+    grid[2:-2, 2:-2] = 1
+    buf = bytearray(grid.tobytes())
+    maze = np.frombuffer(buf, dtype=np.int8).reshape(grid.shape)[2:-2, 2:-2]
+    return buf, maze, grid.shape[1]
+
+def unpad(i, width):
+    r, c = divmod(i, width)
+    return r - 2, c - 2
+
+def backtracker_steps(rows, cols, seed=0, track=True):
+    INIT, WHILE, PICK, CARVE, BACKTRACK = range(5)
+    buf, maze, width = padded_cells(rows, cols)
+    rand = random.Random(seed).random
+    # Every order of the four directions, one picked at random per step
+    dirs = (-2 * width, 2 * width, -2, 2)
+    orders = [(a, b, c, d) for a in dirs for b in dirs for c in dirs for d in dirs
+              if len({a, b, c, d}) == 4]
+    n = len(orders)
+
+    start = 2 * width + 2
+    buf[start] = 0
+    stack = array("i", [start])
+    yield maze, [(0, 0)], INIT
+    while stack:
+        i = stack[-1]
+        if track:
+            yield maze, [], WHILE
+            yield maze, [unpad(i, width)], PICK
+        for d in orders[int(rand() * n)]:
+            if buf[i + d] == 1:
+                buf[i + d // 2] = 0
+                buf[i + d] = 0
+                stack.append(i + d)
+                if track:
+                    yield maze, [unpad(j, width) for j in stack], CARVE
+                break
+        else:
+            stack.pop()
+            if track:
+                yield maze, [unpad(j, width) for j in stack], BACKTRACK
+
+def prim_steps(rows, cols, seed=0, track=True):
+    # Frontier cells are marked 2 in the grid and kept in an array; a random
+    # one is taken by swapping it with the last and popping
+    INIT, WHILE, TAKE, CARVE, GROW = range(5)
+    buf, maze, width = padded_cells(rows, cols)
+    rand = random.Random(seed).random
+    h, w = cell_shape(rows, cols)
+    dirs = (-2 * width, 2 * width, -2, 2)
+
+    start = (2 * int(rand() * h) + 2) * width + 2 * int(rand() * w) + 2
+    buf[start] = 0
+    frontier = array("i")
+    for d in dirs:
+        if buf[start + d] == 1:
+            buf[start + d] = 2
+            frontier.append(start + d)
+    yield maze, [unpad(start, width)], INIT
+    while frontier:
+        if track:
+            yield maze, [], WHILE
+        k = int(rand() * len(frontier))
+        i = frontier[k]
+        frontier[k] = frontier[-1]
+        frontier.pop()
+        if track:
+            yield maze, [unpad(i, width)], TAKE
+        inside = [d for d in dirs if buf[i + d] == 0]
+        d = inside[int(rand() * len(inside))]
+        buf[i + d // 2] = 0
+        buf[i] = 0
+        if track:
+            yield maze, [unpad(i, width), unpad(i + d, width)], CARVE
+        for d in dirs:
+            if buf[i + d] == 1:
+                buf[i + d] = 2
+                frontier.append(i + d)
+        if track:
+            yield maze, [unpad(i, width)], GROW
+
+class UnionFind:
+    """
+    Disjoint sets of 0 .. n-1 in two flat arrays: each element's parent
+    (int32, a root is its own parent) and each root's rank (a bound on its
+    tree height). find compresses the path it walks; union hangs the lower
+    ranked root under the higher.
+    """
+    __slots__ = ("parent", "rank")
+
+    def __init__(self, n):
+        self.parent = array("i", np.arange(n, dtype=np.int32).tobytes())
+        self.rank = bytearray(n)
+
+    def find(self, x):
+        parent = self.parent
+        root = x
+        while parent[root] != root:
+            root = parent[root]
+        while parent[x] != root:
+            parent[x], x = root, parent[x]
+        return root
+
+    def union(self, a, b):
+        # False if a and b were already in one set
+        a, b = self.find(a), self.find(b)
+        if a == b:
+            return False
+        rank = self.rank
+        if rank[a] < rank[b]:
+            a, b = b, a
+        self.parent[b] = a
+        if rank[a] == rank[b]:
+            rank[a] += 1
+        return True
+
+def edge_keys(h, w, seed):
+    # A random weight for every wall between two neighboring cells, as one
+    # int64 key per edge: 31 random bits above the edge id, so no two keys
+    # tie. Ids below h * (w - 1) join row neighbors, the rest column neighbors.
+    edges = h * (w - 1) + (h - 1) * w
+    keys = np.random.default_rng(seed).integers(0, 1 << 31, edges, dtype=np.int64) << 32
+    keys |= np.arange(edges, dtype=np.int64)
+    return keys
+
+EDGE_ID = (1 << 32) - 1   # key & EDGE_ID is the edge id
+
+def edge_ends(edges, h, w):
+    # Cell ids (r * w + c) on both sides of each edge
+    across = h * (w - 1)
+    horizontal = edges < across
+    step = max(w - 1, 1)
+    u = np.where(horizontal, edges // step * w + edges % step, edges - across)
+    return u, u + np.where(horizontal, 1, w).astype(u.dtype)
+
+def carve_edges(maze, edges, h, w):
+    # Opens the wall of each edge: it sits halfway between the two cells
+    u, v = edge_ends(edges, h, w)
+    cols = maze.shape[1]
+    gu = (u // w * 2).astype(np.int64) * cols + u % w * 2
+    gv = (v // w * 2).astype(np.int64) * cols + v % w * 2
+    maze.reshape(-1)[(gu + gv) // 2] = 0
+
+def settle(parent, roots):
+    # After each of roots was hooked to another root: undo one hook of every
+    # pair that hooked to each other, then point each root at its new root
+    other = parent[roots]
+    pairs = roots[(parent[other] == roots) & (roots < other)]
+    parent[pairs] = pairs
+    up = parent[roots]
+    while True:
+        higher = parent[up]
+        if np.array_equal(higher, up):
+            return
+        parent[roots] = up = higher
+
+def renumber(parent):
+    # Component of each element of a settled parent array, numbered by root
+    is_root = parent == np.arange(len(parent), dtype=parent.dtype)
+    number = np.cumsum(is_root, dtype=np.int32) - 1
+    return number[parent]
+
+def boruvka_carve(maze, keys, h, w):
+    # Carves the walls of the edges Kruskal keeps when it scans the edges by
+    # key, found in parallel rounds instead (Boruvka): every component takes
+    # its cheapest edge to another component, all at once. With distinct keys
+    # the minimum spanning tree is unique, so this is exactly Kruskal's tree.
+    # Components are a union-find: each round hooks every root to the root
+    # across its chosen edge and compresses the paths (settle), then the
+    # components are numbered 0 .. k-1 again so the arrays indexed by them
+    # keep shrinking. In the first round every cell is a root and its edges
+    # are its neighbors in the grid, so that round works on whole 2D slices.
+    across = h * (w - 1)
+    row_keys = keys[:across].reshape(h, w - 1)     # (r, c) to (r, c + 1)
+    col_keys = keys[across:].reshape(h - 1, w)     # (r, c) to (r + 1, c)
+    ids = np.arange(h * w, dtype=np.int32).reshape(h, w)
+    # (cells on one side, the cells across, keys of the edges between)
+    sides = [(np.s_[:, :-1], np.s_[:, 1:], row_keys), (np.s_[:, 1:], np.s_[:, :-1], row_keys),
+             (np.s_[:-1], np.s_[1:], col_keys), (np.s_[1:], np.s_[:-1], col_keys)]
+    none = np.iinfo(np.int64).max
+    best = np.full((h, w), none, dtype=np.int64)
+    for here, _, side in sides:
+        np.minimum(best[here], side, out=best[here])
+    parent = ids.copy()
+    for here, there, side in sides:
+        np.copyto(parent[here], ids[there], where=best[here] == side)
+    maze[::2, 1::2][(row_keys == best[:, :-1]) | (row_keys == best[:, 1:])] = 0
+    maze[1::2, ::2][(col_keys == best[:-1]) | (col_keys == best[1:])] = 0
+    parent = parent.reshape(-1)
+    settle(parent, ids.reshape(-1))
+    labels = renumber(parent).reshape(h, w)
+
+    # Edges still between two components, as (key, component, component)
+    split = [(labels[here] != labels[there], here, there, side) for here, there, side in sides[::2]]
+    key = np.concatenate([side[m] for m, _, _, side in split])
+    u = np.concatenate([labels[here][m] for m, here, _, _ in split])
+    v = np.concatenate([labels[there][m] for m, _, there, _ in split])
+    kept = []
+    while len(key):
+        k = int(labels.max()) + 1
+        best = np.full(k, none, dtype=np.int64)
+        np.minimum.at(best, u, key)
+        np.minimum.at(best, v, key)
+        from_u = best[u] == key
+        from_v = best[v] == key
+        kept.append(key[from_u | from_v] & EDGE_ID)
+        parent = np.arange(k, dtype=np.int32)
+        roots = np.concatenate([u[from_u], v[from_v]])
+        parent[roots] = np.concatenate([v[from_u], u[from_v]])
+        settle(parent, roots)
+        labels = renumber(parent)
+        u, v = labels[u], labels[v]
+        split = u != v
+        key, u, v = key[split], u[split], v[split]
+    if kept:
+        carve_edges(maze, np.concatenate(kept), h, w)
+
+def kruskal_steps(rows, cols, seed=0, track=True):
+    INIT, FOR, FIND, JOIN = range(4)
+    h, w = cell_shape(rows, cols)
+    maze = np.ones((2 * h - 1, 2 * w - 1), dtype=np.int8)
+    maze[::2, ::2] = 0
+    keys = edge_keys(h, w, seed)
+    yield maze, [], INIT
+    if not track:
+        boruvka_carve(maze, keys, h, w)
+        return
+    sets = UnionFind(h * w)
+    u, v = edge_ends(np.sort(keys) & EDGE_ID, h, w)
+    for a, b in zip(u.tolist(), v.tolist()):
+        ends = [(a // w * 2, a % w * 2), (b // w * 2, b % w * 2)]
+        yield maze, [], FOR
+        yield maze, ends, FIND
+        if sets.union(a, b):
+            maze[(ends[0][0] + ends[1][0]) // 2, (ends[0][1] + ends[1][1]) // 2] = 0
+            yield maze, ends, JOIN
+
+def cave_steps(rows, cols, seed=0, track=True, fill=CAVE_FILL, iterations=CAVE_ITERATIONS):
+    # Cellular automaton: each round a cell becomes wall when five or more of
+    # the nine cells of its 3x3 block are (cells past the edge count as open),
+    # summed from nine shifted views of the padded grid. The start and end
+    # corners are opened at the end.
+    INIT, REPEAT, COUNT, UPDATE = range(4)
+    rng = np.random.default_rng(seed)
+    if rows < 1 or cols < 1:
+        raise ValueError("a maze needs at least one row and column")
+    maze = (rng.integers(0, 1 << 16, (rows, cols), dtype=np.uint16) < fill * (1 << 16)).astype(np.int8)
+    yield maze, [], INIT
+    padded = np.zeros((rows + 2, cols + 2), dtype=np.uint8)
+    count = np.empty((rows, cols), dtype=np.uint8)
+    for _ in range(iterations):
+        if track:
+            yield maze, [], REPEAT
+        padded[1:-1, 1:-1] = maze
+        count[:] = padded[:-2, :-2]
+        for dr in range(3):
+            for dc in range(3):
+                if dr or dc:
+                    count += padded[dr:dr + rows, dc:dc + cols]
+        if track:
+            yield maze, [], COUNT
+        np.greater_equal(count, 5, out=maze, casting="unsafe")
+        if track:
+            yield maze, [], UPDATE
+    maze[0, 0] = maze[-1, -1] = 0
+
+# name -> (generator, pseudocode)
+GENERATORS = {
+    "Recursive Backtracker": (backtracker_steps, BACKTRACKER_STEPS),
+    "Kruskal": (kruskal_steps, KRUSKAL_STEPS),
+    "Prim": (prim_steps, PRIM_STEPS),
+    "Cellular Automaton Cave": (cave_steps, CAVE_STEPS)
+}
+
+def generate_maze(name, rows, cols, seed=0):
+    steps = GENERATORS[name][0](rows, cols, seed, track=False)
+    maze, _, _ = next(steps)
+    for _ in steps:
+        pass
+    return np.ascontiguousarray(maze)
+
+# ================= Command Line ==================
+def main(argv=None):
+    # Times each generator on one size
+    import argparse
+    parser = argparse.ArgumentParser(description="Time the maze generators")
+    parser.add_argument("--size", type=int, default=2001, help="rows and columns of the grid")
+    parser.add_argument("--generators", nargs="+", choices=GENERATORS, default=list(GENERATORS))
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    w = max(len(name) for name in args.generators)
+    for name in args.generators:
+        t = time.perf_counter()
+        maze = generate_maze(name, args.size, args.size, args.seed)
+        seconds = time.perf_counter() - t
+        print(f"{name:<{w}}  {maze.shape[0]} x {maze.shape[1]}  {1 - maze.mean():.1%} open  "
+              f"{seconds:.2f} s  {maze.size / seconds / 1e6:.1f} M cells/s")
+        sys.stdout.flush()
+
+# ================= Main ==================
+if __name__ == "__main__":
+    main()
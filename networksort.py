@@ -0,0 +1,102 @@
+import numpy as np
+
+# ---------------- Sorting Networks ---------------- #
+# Bitonic sort and odd-even transposition sort as sequences of
+# compare-exchange passes. The comparators of a pass touch disjoint pairs, so
+# a pass is one vectorized min / max over two strided views of the array (no
+# gathers), and a sort is O(log^2 n) passes (bitonic) or at most n passes
+# (odd-even) of Python work however large the array. The visualizers and
+# the benchmark wrap network_steps, one step per pass.
+#
+# Bitonic sort uses the form in which every comparator puts the smaller value
+# at the lower index: the first pass of each block size k compares i with its
+# mirror in its k-block, the rest compare i with i + j. Lengths that are not
+# a power of two are padded with the largest value (smallest when sorting
+# descending), which never moves.
+
+BITONIC_STEPS = [
+    "bitonicSort(arr):",
+    "  for k = 2, 4, 8, ... while k/2 < n:",
+    "    compare-exchange each i with its mirror in its k-block",
+    "    for j = k/4, k/8, ..., 1:",
+    "      compare-exchange each i with i + j (i & j == 0)"
+]
+
+ODD_EVEN_STEPS = [
+    "oddEvenTranspositionSort(arr):",
+    "  repeat until two passes in a row swap nothing:",
+    "    compare-exchange every (even, even + 1) pair",
+    "    compare-exchange every (odd, odd + 1) pair"
+]
+
+def bitonic_passes(values, index):
+    # (line, lo, hi, lo index, hi index) per pass: views of values and of
+    # index (its positions) with comparator lo[k] < hi[k]; len(values) must
+    # be a power of two
+    m = len(values)
+    k = 2
+    while k <= m:
+        half = k // 2
+        blocks = values.reshape(-1, k)
+        at = index.reshape(-1, k)
+        yield 2, blocks[:, :half], blocks[:, :half - 1:-1], at[:, :half], at[:, :half - 1:-1]
+        j = half // 2
+        while j:
+            pairs = values.reshape(-1, 2, j)
+            at = index.reshape(-1, 2, j)
+            yield 4, pairs[:, 0], pairs[:, 1], at[:, 0], at[:, 1]
+            j //= 2
+        k *= 2
+
+def odd_even_passes(values, index):
+    # At most n passes alternate between the two sets of neighbor pairs;
+    # network_steps stops early once the array settles
+    n = len(values)
+    for p in range(n):
+        s = p % 2
+        yield 2 + s, values[s:n - 1:2], values[s + 1:n:2], index[s:n - 1:2], index[s + 1:n:2]
+
+# name -> (passes, passes in a row without a swap that end the sort, pad to
+# a power of two)
+NETWORKS = {
+    "Bitonic Sort": (bitonic_passes, None, True),
+    "Odd-Even Transposition Sort": (odd_even_passes, 2, False)
+}
+
+def network_steps(values, name, ascending=True, track=True):
+    # Sorts the int64 NumPy array values in place with network `name`.
+    # Yields (line, comparisons, changed) per pass, with values up to date;
+    # changed (the positions the pass moved) is only worked out when track
+    # is set, and is None otherwise.
+    passes, settle, pad = NETWORKS[name]
+    n = len(values)
+    work = values
+    if pad and n > 1 and n & (n - 1):
+        limits = np.iinfo(values.dtype)
+        work = np.full(1 << (n - 1).bit_length(), limits.max if ascending else limits.min,
+                       values.dtype)
+        work[:n] = values
+    index = np.arange(len(work))
+    low, high = (np.minimum, np.maximum) if ascending else (np.maximum, np.minimum)
+    quiet = 0
+    for line, lo, hi, lo_at, hi_at in passes(work, index):
+        changed = None
+        comparisons = lo.size
+        if track or settle:
+            swap = lo > hi if ascending else lo < hi
+            quiet = 0 if swap.any() else quiet + 1
+            if track:
+                changed = np.concatenate([lo_at[swap], hi_at[swap]])
+                if work is not values:
+                    # Comparators against the padding do nothing
+                    comparisons = int(np.count_nonzero(hi_at < n))
+        first = low(lo, hi)
+        high(lo, hi, out=hi)
+        lo[...] = first
+        if changed is not None and work is not values:
+            values[changed] = work[changed]
+        yield line, comparisons, changed
+        if settle and quiet >= settle:
+            break
+    if work is not values:
+        values[:] = work[:n]
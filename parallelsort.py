@@ -0,0 +1,305 @@
+import multiprocessing as mp
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+
+import numpy as np
+
+# ---------------- Parallel Sorts ---------------- #
+# Two multi-process engines over shared-memory int64 buffers. The input is
+# copied into `src`, the result is built in `dst` and copied back. Each
+# phase is one task per worker:
+#   sample  classify  each worker finds the bucket of every element of its
+#                     block (kept in `ids`) and counts them per bucket; the
+#                     buckets are cut by p-1 splitters taken from a sorted
+#                     random sample
+#           scatter   each worker moves its block into the buckets of dst, at
+#                     offsets computed from everyone's counts
+#           sort      each worker sorts one bucket of dst in place
+#   merge   sort      each worker sorts its block of src in place
+#           merge     each worker merges one n/p slice of the output out of
+#                     every sorted block into dst; the cut points in each
+#                     block are found by binary search on value, so the
+#                     slices are exactly equal
+# Sample sort buckets can be uneven on duplicate-heavy data; the merge is
+# balanced whatever the input. Every task returns the ranges it changed,
+# and parallel_sort_steps yields those as the tasks finish.
+
+OVERSAMPLE = 64           # sample elements per bucket when picking splitters
+LINEAR_SPLITTERS = 8      # up to this many, compare against each in turn
+
+SAMPLE_STEPS = [
+    "sampleSort(arr, p):",
+    "  pick p-1 splitters from a sorted random sample",
+    "  each worker: count its block's elements per bucket",
+    "  each worker: scatter its block into the buckets",
+    "  each worker: sort one bucket"
+]
+
+MERGE_STEPS = [
+    "parallelMergeSort(arr, p):",
+    "  each worker: sort its n/p block",
+    "  cut every block so the output splits into p equal slices",
+    "  each worker: merge its slice from every block"
+]
+
+PHASES = {
+    "sample": {1: "splitters", 2: "classify", 3: "scatter", 4: "sort"},
+    "merge": {1: "sort", 2: "cuts", 3: "merge"}
+}
+
+# ---------------- Workers ---------------- #
+# Each worker process attaches to the shared buffers once, in the
+# initializer. Tasks return (worker, buffer, ranges changed, result).
+
+BUFFERS = [("src", np.int64), ("dst", np.int64), ("ids", np.uint16)]
+
+worker_shms = None
+buffers = None
+
+def views_of(shms, n):
+    return {name: np.ndarray(n, dtype, shm.buf) for (name, dtype), shm in zip(BUFFERS, shms)}
+
+def init_worker(names, n):
+    global worker_shms, buffers
+    worker_shms = [shared_memory.SharedMemory(name=name) for name in names]
+    buffers = views_of(worker_shms, n)
+
+def ready(_):
+    return os.getpid()
+
+def buckets_of(values, splitters, out):
+    # Number of splitters <= each value; a few comparison passes beat a
+    # binary search per element until there are many splitters
+    if len(splitters) > LINEAR_SPLITTERS:
+        out[:] = np.searchsorted(splitters, values, side="right")
+        return
+    out[:] = 0
+    for splitter in splitters:
+        out += values >= splitter
+
+def classify_block(w, lo, hi, splitters):
+    ids = buffers["ids"][lo:hi]
+    buckets_of(buffers["src"][lo:hi], splitters, ids)
+    return w, None, [(lo, hi)], np.bincount(ids, minlength=len(splitters) + 1)
+
+def scatter_block(w, lo, hi, offsets):
+    block = buffers["src"][lo:hi]
+    ids = buffers["ids"][lo:hi]
+    grouped = block[np.argsort(ids, kind="stable")]
+    ranges = []
+    start = 0
+    for offset, count in zip(offsets, np.bincount(ids, minlength=len(offsets)).tolist()):
+        buffers["dst"][offset:offset + count] = grouped[start:start + count]
+        ranges.append((offset, offset + count))
+        start += count
+    return w, "dst", ranges, None
+
+def sort_range(w, lo, hi, buffer):
+    buffers[buffer][lo:hi].sort()
+    return w, buffer, [(lo, hi)], None
+
+def merge_slice(w, pieces, lo, hi):
+    src = buffers["src"]
+    merged = np.concatenate([src[a:b] for a, b in pieces] or [src[:0]])
+    # Stable sort is a run-aware merge sort, so sorted pieces merge cheaply
+    merged.sort(kind="stable")
+    buffers["dst"][lo:hi] = merged
+    return w, "dst", [(lo, hi)], None
+
+# ---------------- Splitting ---------------- #
+
+def even_blocks(n, parts):
+    bounds = [n * k // parts for k in range(parts + 1)]
+    return list(zip(bounds[:-1], bounds[1:]))
+
+def pick_splitters(arr, parts, seed=0):
+    rng = np.random.default_rng(seed)
+    sample = np.sort(arr[rng.integers(0, len(arr), parts * OVERSAMPLE)])
+    return sample[OVERSAMPLE::OVERSAMPLE][:parts - 1]
+
+def bucket_offsets(counts):
+    # counts[w][b]: elements of block w in bucket b. Returns where each block
+    # writes into each bucket, and the (lo, hi) of every bucket.
+    totals = counts.sum(axis=0)
+    starts = np.concatenate([[0], np.cumsum(totals)[:-1]])
+    offsets = starts + np.cumsum(counts, axis=0) - counts
+    return offsets.tolist(), list(zip(starts.tolist(), (starts + totals).tolist()))
+
+def rank_cuts(blocks, rank):
+    # How many elements to take from the front of each sorted block so that
+    # together they are the `rank` smallest; ties go to earlier blocks
+    lo = min(int(b[0]) for b in blocks if len(b))
+    hi = max(int(b[-1]) for b in blocks if len(b))
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if sum(int(np.searchsorted(b, mid, side="right")) for b in blocks) >= rank:
+            hi = mid
+        else:
+            lo = mid + 1
+    cuts = []
+    need = rank - sum(int(np.searchsorted(b, lo, side="left")) for b in blocks)
+    for b in blocks:
+        left = int(np.searchsorted(b, lo, side="left"))
+        take = min(need, int(np.searchsorted(b, lo, side="right")) - left)
+        cuts.append(left + take)
+        need -= take
+    return cuts
+
+# ---------------- Engine ---------------- #
+
+def parallel_sort_steps(arr, method="merge", workers=None, timings=None):
+    # Sorts the int64 NumPy array arr in place with `workers` processes.
+    # Yields (line, worker, buffer, ranges, partitions) when a phase starts
+    # (worker None) and whenever a task finishes: the task changed `ranges`
+    # of `buffer` (the src or dst array, or None), and partitions is the
+    # (lo, hi, worker) each worker owns in this phase. timings, if given,
+    # gets the seconds spent in each phase.
+    n = len(arr)
+    workers = max(1, min(workers or os.cpu_count() or 1, n or 1))
+    timings = {} if timings is None else timings
+    phases = PHASES[method]
+    # spawn, like race.py: the parent is usually a running Tk application
+    ctx = mp.get_context("spawn")
+    # An empty block still needs one byte
+    shms = [shared_memory.SharedMemory(create=True, size=max(1, n * np.dtype(dtype).itemsize))
+            for _, dtype in BUFFERS]
+    views = views_of(shms, n)
+    views[None] = None
+    src, dst = views["src"], views["dst"]
+    pool = ProcessPoolExecutor(workers, ctx, init_worker, ([shm.name for shm in shms], n))
+
+    def run(line, jobs, partitions):
+        # One phase: yields each task's step as it finishes, then records
+        # the phase time; results[w] gets each task's result
+        start = time.perf_counter()
+        yield line, None, None, [], partitions
+        for f in as_completed([pool.submit(*job) for job in jobs]):
+            w, buffer, ranges, result = f.result()
+            results[w] = result
+            yield line, w, views[buffer], ranges, partitions
+        timings[phases[line]] = time.perf_counter() - start
+
+    try:
+        src[:] = arr
+        # Start every worker before the clock does
+        list(pool.map(ready, range(workers)))
+        blocks = even_blocks(n, workers)
+        owned = [(lo, hi, w) for w, (lo, hi) in enumerate(blocks)]
+        results = [None] * workers
+        if method == "sample":
+            start = time.perf_counter()
+            splitters = pick_splitters(src, workers) if n else np.empty(0, np.int64)
+            timings["splitters"] = time.perf_counter() - start
+            yield 1, None, None, [], owned
+            yield from run(2, [(classify_block, w, lo, hi, splitters)
+                               for w, (lo, hi) in enumerate(blocks)], owned)
+            offsets, buckets = bucket_offsets(np.array(results).reshape(workers, workers))
+            yield from run(3, [(scatter_block, w, lo, hi, offsets[w])
+                               for w, (lo, hi) in enumerate(blocks)], owned)
+            yield from run(4, [(sort_range, w, lo, hi, "dst") for w, (lo, hi) in enumerate(buckets)],
+                           [(lo, hi, w) for w, (lo, hi) in enumerate(buckets)])
+        else:
+            yield from run(1, [(sort_range, w, lo, hi, "src") for w, (lo, hi) in enumerate(blocks)],
+                           owned)
+            start = time.perf_counter()
+            yield 2, None, None, [], owned
+            sorted_blocks = [src[lo:hi] for lo, hi in blocks]
+            ranks = [n * k // workers for k in range(workers + 1)]
+            cuts = [[0] * workers] + [rank_cuts(sorted_blocks, r) for r in ranks[1:-1]] + \
+                   [[hi - lo for lo, hi in blocks]]
+            del sorted_blocks
+            timings["cuts"] = time.perf_counter() - start
+            slices = list(zip(ranks[:-1], ranks[1:]))
+            jobs = [(merge_slice, w, [(lo + a, lo + b) for (lo, _), a, b in zip(blocks, cuts[w], cuts[w + 1])
+                                      if b > a], out_lo, out_hi)
+                    for w, (out_lo, out_hi) in enumerate(slices)]
+            yield from run(3, jobs, [(lo, hi, w) for w, (lo, hi) in enumerate(slices)])
+        arr[:] = dst
+    finally:
+        pool.shutdown()
+        views.clear()
+        del src, dst
+        for shm in shms:
+            shm.close()
+            shm.unlink()
+
+def parallel_sort(arr, method="merge", workers=None):
+    # Headless: sorts arr in place and returns the seconds per phase
+    timings = {}
+    for _ in parallel_sort_steps(arr, method, workers, timings):
+        pass
+    return timings
+
+# ---------------- Visualizer Adapter ---------------- #
+# Runs the real engine on the visualizer's list with GUI_WORKERS processes
+# (whatever the CPU count, so the partitions are there to see). Steps carry
+# a fourth element, the (lo, hi, color) partitions of the current phase.
+
+GUI_WORKERS = 4
+PARTITION_COLORS = ["tab:blue", "tab:orange", "tab:green", "tab:red", "tab:purple", "tab:brown",
+                    "tab:pink", "tab:olive"]
+
+def partition_colors(partitions):
+    return [(lo, hi, PARTITION_COLORS[w % len(PARTITION_COLORS)]) for lo, hi, w in partitions]
+
+def visual_parallel_sort(method):
+    def sort(arr, ascending=True):
+        data = np.array(arr, dtype=np.int64)
+        for line, w, buffer, ranges, partitions in parallel_sort_steps(data, method, GUI_WORKERS):
+            positions = []
+            for lo, hi in ranges:
+                if buffer is not None:
+                    arr[lo:hi] = buffer[lo:hi].tolist()
+                positions.extend(range(lo, hi))
+            yield arr, positions, line, partition_colors(partitions)
+        arr[:] = data.tolist() if ascending else data[::-1].tolist()
+    return sort
+
+parallel_sample_sort = visual_parallel_sort("sample")
+parallel_merge_sort = visual_parallel_sort("merge")
+
+# ---------------- Command Line ---------------- #
+
+def main(argv=None):
+    import argparse
+    from datasets import PRESETS, dataset
+
+    parser = argparse.ArgumentParser(description="Time the parallel sorts against np.sort")
+    parser.add_argument("--size", type=int, default=10000000)
+    parser.add_argument("--dataset", choices=PRESETS, default="uniform")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--methods", nargs="+", choices=list(PHASES), default=list(PHASES))
+    parser.add_argument("--workers", type=int, nargs="+",
+                        default=sorted({1, 2, 4, os.cpu_count() or 1}),
+                        help="worker counts to try (default: 1 2 4 and the CPU count)")
+    args = parser.parse_args(argv)
+
+    base = np.asarray(dataset(args.dataset, args.size, seed=args.seed))
+    mb = base.nbytes / 1e6
+    arr = base.copy()
+    start = time.perf_counter()
+    arr.sort()
+    single = time.perf_counter() - start
+    expected = arr.copy()
+    print(f"{args.size} elements ({mb:.1f} MB, {args.dataset}), {os.cpu_count()} CPUs")
+    print(f"{'np.sort':<8}{'':>8}{single:10.3f} s {mb / single:9.1f} MB/s")
+    for method in args.methods:
+        first = None
+        for workers in args.workers:
+            arr = base.copy()
+            timings = parallel_sort(arr, method, workers)
+            if not np.array_equal(arr, expected):
+                print(f"{method}: wrong result with {workers} workers", file=sys.stderr)
+                sys.exit(1)
+            seconds = sum(timings.values())
+            first = first or seconds
+            phases = "  ".join(f"{name} {t:.2f}" for name, t in timings.items())
+            print(f"{method:<8}{workers:>4} wk {seconds:10.3f} s {mb / seconds:9.1f} MB/s "
+                  f"{first / seconds:5.2f}x  ({phases})")
+
+# -------------------- Main -------------------- #
+if __name__ == "__main__":
+    main()
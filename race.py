@@ -0,0 +1,175 @@
+import multiprocessing as mp
+import os
+import sys
+import time
+from array import array
+from multiprocessing import shared_memory
+
+# ---------------- True Race ---------------- #
+# Runs the untraced sorts side by side, one worker process per algorithm, so
+# "who finishes first" reflects real speed instead of event counts. Every
+# worker copies the same shared-memory input and reports through shared
+# arrays that the GUI (or any caller) polls:
+#   state[k]     PENDING / RUNNING / DONE / FAILED / STOPPED
+#   progress[k]  fraction of the work done, from the sort's progress callback
+#   started[k]   time.perf_counter() when the sort began (system-wide clock)
+#   elapsed[k]   seconds the sort took, set when it finishes
+# Timing covers the sort alone, not process start-up or copying the input.
+
+PENDING, RUNNING, DONE, FAILED, STOPPED = range(5)
+STATE_NAMES = ["pending", "running", "finished", "failed", "stopped"]
+
+class RaceStopped(Exception):
+    pass
+
+def race_worker(sort, slot, shm_name, n, state, progress, started, elapsed, stop):
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        arr = shm.buf[:n * 8].cast("q").tolist()
+    finally:
+        shm.close()
+
+    def report(fraction):
+        progress[slot] = fraction
+        if stop.value:
+            raise RaceStopped
+
+    started[slot] = time.perf_counter()
+    state[slot] = RUNNING
+    try:
+        sort(arr, report)
+    except RaceStopped:
+        elapsed[slot] = time.perf_counter() - started[slot]
+        state[slot] = STOPPED
+        return
+    except Exception:
+        state[slot] = FAILED
+        raise
+    elapsed[slot] = time.perf_counter() - started[slot]
+    if all(arr[i] <= arr[i+1] for i in range(n - 1)):
+        progress[slot] = 1.0
+        state[slot] = DONE
+    else:
+        state[slot] = FAILED
+
+class Race:
+    """
+    One race between the untraced sorts in `algorithms` (name -> function
+    taking (arr, progress)), each sorting its own copy of `base`. At most
+    `max_workers` sorts run at once (default: one per CPU) so that no two
+    share a core; the rest wait their turn. Call poll() periodically.
+    """
+    def __init__(self, algorithms, base, max_workers=None):
+        self.algorithms = dict(algorithms)
+        self.names = list(self.algorithms)
+        self.n = len(base)
+        self.max_workers = max_workers or os.cpu_count() or 1
+        # spawn, not fork: the parent is usually a running Tk application
+        self.ctx = mp.get_context("spawn")
+
+        # int64 input; an empty block still needs one byte
+        self.shm = shared_memory.SharedMemory(create=True, size=max(1, self.n * 8))
+        self.shm.buf[:self.n * 8] = array("q", base).tobytes()
+
+        k = len(self.names)
+        self.state = self.ctx.Array("b", k, lock=False)
+        self.progress = self.ctx.Array("d", k, lock=False)
+        self.started = self.ctx.Array("d", k, lock=False)
+        self.elapsed = self.ctx.Array("d", k, lock=False)
+        self.stop_flag = self.ctx.Value("b", 0, lock=False)
+        self.procs = {}
+        self.queue = list(range(k))
+
+    def poll(self):
+        # Reaps exited workers, starts queued ones while a CPU is free and
+        # returns one (name, state, progress, seconds) row per algorithm
+        for slot, proc in list(self.procs.items()):
+            if not proc.is_alive():
+                proc.join()
+                del self.procs[slot]
+                if self.state[slot] in (PENDING, RUNNING):
+                    self.state[slot] = STOPPED if self.stop_flag.value else FAILED
+        while self.queue and len(self.procs) < self.max_workers and not self.stop_flag.value:
+            slot = self.queue.pop(0)
+            proc = self.ctx.Process(target=race_worker, daemon=True, args=(
+                self.algorithms[self.names[slot]], slot, self.shm.name, self.n, self.state,
+                self.progress, self.started, self.elapsed, self.stop_flag))
+            proc.start()
+            self.procs[slot] = proc
+        return [(name, self.state[k], self.progress[k], self.seconds(k))
+                for k, name in enumerate(self.names)]
+
+    def seconds(self, slot):
+        if self.state[slot] == RUNNING:
+            return time.perf_counter() - self.started[slot]
+        return self.elapsed[slot]
+
+    @property
+    def finished(self):
+        return not self.procs and not self.queue
+
+    def stop(self, timeout=1.0):
+        # Sorts notice the flag at their next progress report; the few that
+        # report rarely (a long insertion sort pass) are terminated
+        self.stop_flag.value = 1
+        for slot in self.queue:
+            self.state[slot] = STOPPED
+        self.queue = []
+        deadline = time.perf_counter() + timeout
+        for proc in self.procs.values():
+            proc.join(max(0, deadline - time.perf_counter()))
+            if proc.is_alive():
+                proc.terminate()
+                proc.join()
+        self.poll()
+
+    def close(self):
+        if not self.finished:
+            self.stop()
+        self.shm.close()
+        self.shm.unlink()
+
+    def results(self):
+        # Finished algorithms, fastest first
+        rows = [(self.elapsed[k], name) for k, name in enumerate(self.names)
+                if self.state[k] == DONE]
+        return [(name, seconds) for seconds, name in sorted(rows)]
+
+# ---------------- Command Line ---------------- #
+
+def main(argv=None):
+    # Imported here: comparesortingalgorithm imports this module for its GUI
+    import argparse
+    from comparesortingalgorithm import PLAIN_ALGORITHMS, QUADRATIC
+    from datasets import PRESETS, dataset
+
+    parser = argparse.ArgumentParser(description="Race the untraced sorts in parallel processes")
+    parser.add_argument("--algorithms", nargs="+", default=list(PLAIN_ALGORITHMS))
+    parser.add_argument("--size", type=int, default=1000000)
+    parser.add_argument("--dataset", choices=PRESETS, default="uniform")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, help="concurrent sorts (default: CPU count)")
+    parser.add_argument("--quadratic-limit", type=int, default=20000)
+    args = parser.parse_args(argv)
+
+    algorithms = {a: PLAIN_ALGORITHMS[a] for a in args.algorithms if a in PLAIN_ALGORITHMS
+                  and not (a in QUADRATIC and args.size > args.quadratic_limit)}
+    race = Race(algorithms, dataset(args.dataset, args.size, seed=args.seed), args.workers)
+    try:
+        while not race.finished:
+            rows = race.poll()
+            print("  ".join(f"{name} {p:4.0%}" for name, _, p, _ in rows), end="\r", file=sys.stderr)
+            time.sleep(0.5)
+        print(file=sys.stderr)
+    finally:
+        race.close()
+    w = max([16] + [len(name) + 2 for name in algorithms])
+    for place, (name, seconds) in enumerate(race.results(), 1):
+        print(f"{place}. {name:<{w}}{seconds:10.3f} s")
+    for name, state, _, _ in race.poll():
+        if state != DONE:
+            print(f"   {name:<{w}}{STATE_NAMES[state]:>10}")
+
+# -------------------- Main -------------------- #
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+import sys
+import time
+
+import numpy as np
+
+# ---------------- LSD Radix Sort ---------------- #
+# Sorts an int64 NumPy array by `bits`-bit digits, least significant first.
+# The keys are the offsets from the smallest value as uint64 (from the
+# largest, descending), which orders negatives before positives without a
+# separate pass and leaves only as many digits as the span of the values
+# needs. Each pass is a counting sort of one digit: a bincount, prefix sums
+# for the start of each bucket and a stable scatter of the keys into the
+# buckets (NumPy's stable argsort of uint8 / uint16 digits is itself a
+# counting sort, so a pass is O(n)). A pass whose digits all land in one
+# bucket is skipped.
+
+RADIX_BITS = 8            # base 256: at most 8 passes for any int64
+
+RADIX_STEPS = [
+    "keys = values - min (max - values descending)",
+    "for each BITS-bit digit, lowest first:",
+    "  counts = bincount(digit); skip if one bucket",
+    "  starts = prefix sums of counts",
+    "  scatter keys to their bucket, in order"
+]
+
+SKIP, COUNT, SCATTER = 2, 3, 4   # RADIX_STEPS line of each kind of step
+
+def radix_passes(values, bits=RADIX_BITS):
+    # Digits needed for the largest key, max - min
+    if len(values) < 2:
+        return 0
+    return -(-(int(values.max()) - int(values.min())).bit_length() // bits)
+
+def radix_steps(values, bits=RADIX_BITS, ascending=True, track=True):
+    # Sorts the int64 NumPy array values in place. Yields (line, starts,
+    # counts) per digit: after counting (line COUNT, or SKIP with starts None
+    # when the pass is skipped) and after scattering (line SCATTER), so every
+    # pass ends on a SKIP or SCATTER step. values is only kept up to date
+    # between steps when track is set.
+    if not 1 <= bits <= 16:
+        raise ValueError("radix digits must be 1 to 16 bits")
+    n = len(values)
+    passes = radix_passes(values, bits)
+    if not passes:
+        return
+    # Two's complement wraps, so the subtraction is exact in uint64
+    low, high = values.min(), values.max()
+    if ascending:
+        keys = values.view(np.uint64) - low.view(np.uint64)
+    else:
+        keys = high.view(np.uint64) - values.view(np.uint64)
+    digit_type = np.uint8 if bits <= 8 else np.uint16
+    mask = np.uint64((1 << bits) - 1)
+
+    def decode():
+        if ascending:
+            values[:] = (keys + low.view(np.uint64)).view(np.int64)
+        else:
+            values[:] = (high.view(np.uint64) - keys).view(np.int64)
+
+    for p in range(passes):
+        digit = ((keys >> np.uint64(p * bits)) & mask).astype(digit_type)
+        counts = np.bincount(digit, minlength=1 << bits)
+        if counts.max() == n:
+            yield SKIP, None, counts
+            continue
+        starts = np.cumsum(counts) - counts
+        yield COUNT, starts, counts
+        keys = keys[np.argsort(digit, kind="stable")]
+        if track:
+            decode()
+        yield SCATTER, starts, counts
+    if not track:
+        decode()
+
+def radix_sort_array(values, bits=RADIX_BITS, ascending=True):
+    for _ in radix_steps(values, bits, ascending, track=False):
+        pass
+
+# ---------------- Command Line ---------------- #
+
+def main(argv=None):
+    # Times the radix sort against np.sort and Python's sorted on one array
+    import argparse
+    from datasets import PRESETS, dataset
+
+    parser = argparse.ArgumentParser(description="Time the NumPy LSD radix sort")
+    parser.add_argument("--size", type=int, default=10000000)
+    parser.add_argument("--dataset", choices=PRESETS, default="uniform")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--bits", type=int, nargs="+", default=[4, 8, 11, 16],
+                        help="digit widths to time (base 2^bits)")
+    parser.add_argument("--negative", action="store_true", help="shift values to straddle zero")
+    args = parser.parse_args(argv)
+
+    base = np.array(dataset(args.dataset, args.size, seed=args.seed), dtype=np.int64)
+    if args.negative:
+        base -= args.size // 2
+    expected = np.sort(base)
+    rows = []
+    for bits in args.bits:
+        values = base.copy()
+        start = time.perf_counter()
+        radix_sort_array(values, bits)
+        rows.append((f"radix, {bits}-bit digits ({radix_passes(base, bits)} passes)",
+                     time.perf_counter() - start))
+        if not np.array_equal(values, expected):
+            print(f"radix sort with {bits}-bit digits failed", file=sys.stderr)
+            sys.exit(1)
+    for name, run in [("np.sort", lambda: np.sort(base)), ("sorted(list)", lambda: sorted(base.tolist()))]:
+        start = time.perf_counter()
+        run()
+        rows.append((name, time.perf_counter() - start))
+    mb = base.nbytes / 1e6
+    for name, seconds in rows:
+        print(f"{name:<34}{seconds:9.3f} s {mb / seconds:10.1f} MB/s")
+
+# -------------------- Main -------------------- #
+if __name__ == "__main__":
+    main()
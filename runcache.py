@@ -0,0 +1,237 @@
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import types
+
+import numpy as np
+
+# ---------------- Run Cache ---------------- #
+# Finished runs stored on disk so that repeating one replays it instead of
+# recomputing it. An entry is addressed by a hash of
+#   algorithm name, algorithm version, input, parameters
+# where the version is a hash of the source of the module defining the
+# algorithm and of every project module it uses, directly or through
+# another (radixsort and networksort for the comparison radix and network
+# sorts, instrument for the counts), so editing an algorithm or anything it
+# calls invalidates its entries. Each entry is two files:
+#   <key>.bin   fixed-size records (any NumPy dtype), e.g. an event stream
+#   <key>.json  the record dtype and count plus the run's final metrics
+# The .json is written last, so an entry without one is incomplete. Reading
+# an entry touches it; once the cache is over its size cap the least
+# recently used entries are deleted.
+
+CACHE_DIR = os.environ.get("RUN_CACHE_DIR",
+                           os.path.join(os.path.expanduser("~"), ".cache", "jackfruit", "runs"))
+MAX_BYTES = 512 * 1024 * 1024
+FLUSH_RECORDS = 1 << 16
+
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+_module_hashes = {}
+
+def project_files(name):
+    # Source files of module `name` and of every project module reachable
+    # from its globals (modules, or functions and classes defined in one)
+    files = set()
+    seen = set()
+    todo = [name]
+    while todo:
+        name = todo.pop()
+        if name in seen:
+            continue
+        seen.add(name)
+        path = getattr(sys.modules.get(name), "__file__", None)
+        if not path or os.path.dirname(os.path.abspath(path)) != PROJECT_DIR:
+            continue
+        files.add(os.path.abspath(path))
+        for value in vars(sys.modules[name]).values():
+            dep = value.__name__ if isinstance(value, types.ModuleType) else \
+                getattr(value, "__module__", None)
+            if isinstance(dep, str):
+                todo.append(dep)
+    return sorted(files)
+
+def algorithm_version(fn):
+    if fn.__module__ not in _module_hashes:
+        h = hashlib.sha256()
+        for path in project_files(fn.__module__):
+            h.update(os.path.basename(path).encode())
+            with open(path, "rb") as f:
+                h.update(f.read())
+        _module_hashes[fn.__module__] = h.hexdigest()
+    return _module_hashes[fn.__module__]
+
+def input_hash(data):
+    return hashlib.sha256(np.asarray(data, dtype=np.int64).tobytes()).hexdigest()
+
+class RunCache:
+    def __init__(self, directory=CACHE_DIR, max_bytes=MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def key(self, algorithm, fn, data, params=None):
+        h = hashlib.sha256()
+        h.update(json.dumps([algorithm, algorithm_version(fn), input_hash(data),
+                             params or {}], sort_keys=True).encode())
+        return h.hexdigest()
+
+    def path(self, key, ext):
+        return os.path.join(self.directory, key + ext)
+
+    def get(self, key):
+        # (records, metrics) of a stored run, or None; records is a
+        # read-only memory map (None for metrics-only entries)
+        try:
+            with open(self.path(key, ".json")) as f:
+                info = json.load(f)
+            records = None
+            if info["dtype"] is not None:
+                dtype = np.dtype([tuple(field) for field in info["dtype"]])
+                records = np.memmap(self.path(key, ".bin"), dtype, "r", shape=(info["count"],)) \
+                    if info["count"] else np.empty(0, dtype)
+            for ext in (".bin", ".json"):
+                if os.path.exists(self.path(key, ext)):
+                    os.utime(self.path(key, ext))
+        except (OSError, ValueError, KeyError):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return records, info["metrics"]
+
+    def put(self, key, metrics, records=(), dtype=None):
+        # Stores a run at once; records: tuples matching dtype (None for a
+        # metrics-only entry). Returns False if it did not fit in the cache.
+        writer = EntryWriter(self, key, dtype)
+        for record in records:
+            writer.append(record)
+        return writer.close(metrics)
+
+    def evict(self, keep=None):
+        entries = {}
+        for name in os.listdir(self.directory):
+            key, ext = os.path.splitext(name)
+            if ext not in (".bin", ".json"):
+                continue
+            st = os.stat(os.path.join(self.directory, name))
+            size, used = entries.get(key, (0, 0))
+            entries[key] = (size + st.st_size, max(used, st.st_mtime))
+        total = sum(size for size, _ in entries.values())
+        for key in sorted(entries, key=lambda k: entries[k][1]):
+            if total <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            for ext in (".json", ".bin"):
+                if os.path.exists(self.path(key, ext)):
+                    os.remove(self.path(key, ext))
+            total -= entries[key][0]
+
+    def metrics(self, key, compute):
+        # Metrics-only entries: compute() on a miss, and store the result
+        entry = self.get(key)
+        if entry is not None:
+            return entry[1]
+        metrics = compute()
+        self.put(key, metrics)
+        return metrics
+
+    def clear(self):
+        for name in os.listdir(self.directory):
+            if os.path.splitext(name)[1] in (".bin", ".json"):
+                os.remove(os.path.join(self.directory, name))
+
+    def summary(self):
+        return f"{self.hits} hits, {self.misses} misses"
+
+    def tee(self, key, items, encode, metrics, dtype):
+        # Yields items unchanged while recording the records encode(item)
+        # returns (a list) for each; a run consumed to the end is stored with
+        # metrics(), one abandoned part way is discarded
+        writer = EntryWriter(self, key, dtype)
+        try:
+            for item in items:
+                for record in encode(item):
+                    writer.append(record)
+                yield item
+            writer.close(metrics())
+        finally:
+            writer.abort()
+
+class EntryWriter:
+    # Streams records to a temporary file, in chunks so long runs never sit
+    # in memory whole, and turns them into an entry on close(). Gives up
+    # (storing nothing) once the records alone would exceed the cache cap.
+    def __init__(self, cache, key, dtype):
+        self.cache = cache
+        self.key = key
+        self.dtype = np.dtype(dtype) if dtype is not None else None
+        self.chunk = []
+        self.count = 0
+        self.f = None
+        if self.dtype is not None:
+            fd, self.tmp = tempfile.mkstemp(dir=cache.directory, suffix=".tmp")
+            self.f = os.fdopen(fd, "wb")
+
+    def append(self, record):
+        if self.f is None:
+            return
+        self.chunk.append(record)
+        if len(self.chunk) >= FLUSH_RECORDS:
+            self.flush()
+            if self.count * self.dtype.itemsize > self.cache.max_bytes:
+                self.abort()
+
+    def flush(self):
+        np.array(self.chunk, self.dtype).tofile(self.f)
+        self.count += len(self.chunk)
+        self.chunk = []
+
+    def abort(self):
+        if self.f is not None:
+            self.f.close()
+            os.remove(self.tmp)
+            self.f = None
+        self.dtype = None
+        self.chunk = []
+
+    def close(self, metrics):
+        if self.f is not None:
+            self.flush()
+            self.f.close()
+            self.f = None
+            os.replace(self.tmp, self.cache.path(self.key, ".bin"))
+        elif self.dtype is not None or self.count:
+            return False
+        info = {"dtype": self.dtype.descr if self.dtype is not None else None,
+                "count": self.count, "metrics": metrics}
+        fd, tmp = tempfile.mkstemp(dir=self.cache.directory, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump(info, f)
+        os.replace(tmp, self.cache.path(self.key, ".json"))
+        self.cache.evict(keep=self.key)
+        return True
+
+# ---------------- Command Line ---------------- #
+
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(description="Inspect or clear the run cache")
+    parser.add_argument("action", choices=["info", "clear"])
+    parser.add_argument("--dir", default=CACHE_DIR)
+    args = parser.parse_args(argv)
+    cache = RunCache(args.dir)
+    if args.action == "clear":
+        cache.clear()
+    files = [os.path.join(args.dir, n) for n in os.listdir(args.dir)]
+    entries = sum(1 for f in files if f.endswith(".json"))
+    size = sum(os.path.getsize(f) for f in files)
+    print(f"{args.dir}: {entries} entries, {size / 1e6:.1f} MB (cap {cache.max_bytes / 1e6:.0f} MB)")
+
+# -------------------- Main -------------------- #
+if __name__ == "__main__":
+    main()
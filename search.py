@@ -5,6 +5,10 @@ from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolb
 import numpy as np
 import time
 import threading
+from columnrender import draw_columns, use_columns
+from datasets import PRESETS, generate, parse_seed
+
+MAX_TICK_LABELS = 50   # one x tick per index only for arrays this small
 
 class AlgorithmVisualizer:
     def __init__(self, root):
@@ -49,6 +53,15 @@ class AlgorithmVisualizer:
         self.size_entry.insert(0, "20")
         self.size_entry.pack()
         
+        ttk.Label(control_frame, text="Dataset:").pack()
+        self.dataset_var = tk.StringVar(value=PRESETS[0])
+        ttk.Combobox(control_frame, textvariable=self.dataset_var, values=PRESETS,
+                     state="readonly", width=14).pack()
+        
+        ttk.Label(control_frame, text="Seed (blank: random):").pack()
+        self.seed_entry = ttk.Entry(control_frame, width=10)
+        self.seed_entry.pack()
+        
         ttk.Button(control_frame, text="Generate Array", 
                   command=self.generate_array).pack(pady=10)
         
@@ -116,12 +129,14 @@ class AlgorithmVisualizer:
             min_val = int(self.min_entry.get())
             max_val = int(self.max_entry.get())
             size = int(self.size_entry.get())
+            seed = parse_seed(self.seed_entry.get())
             
             if min_val >= max_val or size <= 0:
                 messagebox.showerror("Error", "Invalid array parameters")
                 return
                 
-            self.array = np.random.randint(min_val, max_val, size)
+            self.array = generate(self.dataset_var.get(), size, min_val, max_val, seed)
+            self.result_label.config(text=f"Result: Not searched ({self.dataset_var.get()}, seed {seed})")
             if self.algo_var.get() == "binary":
                 self.array.sort()
             
@@ -143,7 +158,7 @@ class AlgorithmVisualizer:
                 "            return i",
                 "    return -1",
                 "",
-                f"Result = linear_search({list(self.array)}, {self.search_value})"
+                f"Result = linear_search({self.array_text()}, {self.search_value})"
             ]
             self.linear_steps = [0, 1, 2, 3]  # line numbers to highlight
         else:
@@ -160,13 +175,18 @@ class AlgorithmVisualizer:
                 "            right = mid - 1",
                 "    return -1",
                 "",
-                f"Result = binary_search({list(self.array)}, {self.search_value})"
+                f"Result = binary_search({self.array_text()}, {self.search_value})"
             ]
             self.binary_steps = [0, 1, 2, 3, 4, 5, 6, 7]  # line numbers to highlight
         
         for i, line in enumerate(code):
             self.code_text.insert(tk.END, line + "\n")
     
+    def array_text(self):
+        if len(self.array) <= MAX_TICK_LABELS:
+            return list(self.array)
+        return f"<{len(self.array)} values>"
+
     def plot_array(self, highlight_indices=None, found_index=None):
         self.ax.clear()
         
@@ -174,22 +194,31 @@ class AlgorithmVisualizer:
             return
             
         indices = np.arange(len(self.array))
-        colors = ['lightblue'] * len(self.array)
-        
-        if highlight_indices:
-            for idx in highlight_indices:
-                if idx < len(colors):
-                    colors[idx] = 'yellow'
-        
-        if found_index is not None and found_index >= 0:
-            colors[found_index] = 'green'
-        
-        bars = self.ax.bar(indices, self.array, color=colors, alpha=0.7, edgecolor='black')
+        found = [found_index] if found_index is not None and found_index >= 0 else []
+
+        if use_columns(len(self.array)):
+            # Large arrays: per-pixel-column min/max image instead of bars
+            highlights = [i for i in highlight_indices or [] if 0 <= i < len(self.array)]
+            draw_columns(self.ax, self.array, color='lightblue',
+                         overlays=[(highlights, 'yellow'), (found, 'green')])
+        else:
+            colors = ['lightblue'] * len(self.array)
+
+            if highlight_indices:
+                for idx in highlight_indices:
+                    if idx < len(colors):
+                        colors[idx] = 'yellow'
+
+            for idx in found:
+                colors[idx] = 'green'
+
+            bars = self.ax.bar(indices, self.array, color=colors, alpha=0.7, edgecolor='black')
         self.ax.set_title(f"{'Binary' if self.algo_var.get() == 'binary' else 'Linear'} Search")
         self.ax.set_xlabel("Index")
         self.ax.set_ylabel("Value")
-        self.ax.set_xticks(indices)
-        self.ax.tick_params(axis='x', rotation=45)
+        if len(self.array) <= MAX_TICK_LABELS:
+            self.ax.set_xticks(indices)
+            self.ax.tick_params(axis='x', rotation=45)
         
         self.ax.axhline(y=self.search_value, color='red', linestyle='--', alpha=0.7, 
                        label=f'Target: {self.search_value}')
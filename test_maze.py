@@ -0,0 +1,136 @@
+import heapq
+import math
+
+import numpy as np
+import pytest
+
+from maze import SOLVERS, SolverStats, solve_headless
+from mazegen import GENERATORS, generate_maze
+
+# ================= Solver Cross-Checks ==================
+# Every solver's cost is checked against a plain Dijkstra over (row, col)
+# cells on seeded random grids, generated mazes and the edge cases: start
+# == end, a walled-in start, a wall at either end and single row or column
+# grids. A found path must also be a real one: open cells, legal moves
+# (diagonals only for the 8-way A*, never across a wall corner) and the
+# reported cost.
+
+SQRT2 = math.sqrt(2)
+DIAGONAL = {"A* (octile, 8-way)"}
+
+def reference_cost(maze, start, end, weights=None, diagonal=False):
+    # Least cost from start to end, None if there is no path. Entering a
+    # cell costs its weight (1 without weights) times the step length.
+    rows, cols = maze.shape
+    if maze[start] or maze[end]:
+        return None
+    moves = [(-1, 0, 1.0), (1, 0, 1.0), (0, -1, 1.0), (0, 1, 1.0)]
+    if diagonal:
+        moves += [(dr, dc, SQRT2) for dr in (-1, 1) for dc in (-1, 1)]
+    dist = {start: 0.0}
+    heap = [(0.0, start)]
+    while heap:
+        d, (r, c) = heapq.heappop(heap)
+        if (r, c) == end:
+            return d
+        if d > dist[r, c]:
+            continue
+        for dr, dc, length in moves:
+            nr, nc = r + dr, c + dc
+            if not (0 <= nr < rows and 0 <= nc < cols) or maze[nr, nc]:
+                continue
+            if dr and dc and (maze[r, nc] or maze[nr, c]):
+                continue
+            nd = d + length * (weights[nr, nc] if weights is not None else 1.0)
+            if nd < dist.get((nr, nc), math.inf):
+                dist[nr, nc] = nd
+                heapq.heappush(heap, (nd, (nr, nc)))
+    return None
+
+def path_cost(maze, path, weights=None, diagonal=False):
+    total = 0.0
+    for (r0, c0), (r1, c1) in zip(path, path[1:]):
+        dr, dc = abs(r1 - r0), abs(c1 - c0)
+        assert maze[r1, c1] == 0
+        if dr and dc:
+            assert diagonal and dr == dc == 1
+            assert maze[r0, c1] == 0 and maze[r1, c0] == 0
+            length = SQRT2
+        else:
+            assert dr + dc == 1
+            length = 1.0
+        total += length * (weights[r1, c1] if weights is not None else 1.0)
+    return total
+
+def random_grid(rng, rows, cols, density):
+    maze = (rng.random((rows, cols)) < density).astype(np.int8)
+    open_cells = np.argwhere(maze == 0)
+    a, b = rng.integers(len(open_cells), size=2)
+    return maze, tuple(open_cells[a].tolist()), tuple(open_cells[b].tolist())
+
+def cases():
+    rng = np.random.default_rng(2024)
+    for seed in range(12):
+        rows, cols = rng.integers(4, 30, size=2).tolist()
+        maze, start, end = random_grid(rng, rows, cols, 0.2 + 0.02 * seed)
+        yield f"random-{seed}", maze, start, end
+    for name in GENERATORS:
+        for seed in range(2):
+            maze = generate_maze(name, 21, 31, seed)
+            end = (maze.shape[0] - 1, maze.shape[1] - 1)
+            maze[0, 0] = maze[end] = 0
+            yield f"{name}-{seed}", maze, (0, 0), end
+
+    open_grid = np.zeros((9, 13), dtype=np.int8)
+    yield "open", open_grid, (0, 0), (8, 12)
+    yield "start-is-end", open_grid, (4, 6), (4, 6)
+    maze, start, _ = random_grid(rng, 15, 15, 0.3)
+    yield "random-start-is-end", maze, start, start
+
+    walled = np.zeros((7, 7), dtype=np.int8)
+    walled[2:5, 2:5] = 1
+    walled[3, 3] = 0
+    yield "walled-in-start", walled, (3, 3), (6, 6)
+    yield "walled-in-end", walled, (0, 0), (3, 3)
+    yield "start-on-wall", walled, (2, 2), (6, 6)
+    yield "end-on-wall", walled, (0, 0), (2, 3)
+
+    row = np.zeros((1, 15), dtype=np.int8)
+    yield "1xN", row, (0, 0), (0, 14)
+    yield "1xN-reversed", row, (0, 12), (0, 2)
+    blocked = row.copy()
+    blocked[0, 7] = 1
+    yield "1xN-blocked", blocked, (0, 0), (0, 14)
+    yield "Nx1", row.T.copy(), (14, 0), (0, 0)
+    yield "1x1", np.zeros((1, 1), dtype=np.int8), (0, 0), (0, 0)
+
+CASES = list(cases())
+
+def check(name, maze, start, end, weights=None):
+    solver, _, takes_weights = SOLVERS[name]
+    diagonal = name in DIAGONAL
+    stats = SolverStats()
+    _, path = solve_headless(solver, maze, start, end, stats,
+                             **({"weights": weights} if takes_weights else {}))
+    expected = reference_cost(maze, start, end, weights, diagonal)
+    if expected is None:
+        assert stats.cost is None
+        return
+    assert stats.cost == pytest.approx(expected)
+    assert path[0] == start and path[-1] == end
+    assert len(path) == stats.path_length
+    assert path_cost(maze, path, weights, diagonal) == pytest.approx(expected)
+
+@pytest.mark.parametrize("case", CASES, ids=[case[0] for case in CASES])
+@pytest.mark.parametrize("name", list(SOLVERS))
+def test_solver_cost(name, case):
+    _, maze, start, end = case
+    check(name, maze, start, end)
+
+@pytest.mark.parametrize("seed", range(6))
+@pytest.mark.parametrize("name", [name for name, entry in SOLVERS.items() if entry[2]])
+def test_weighted_cost(name, seed):
+    rng = np.random.default_rng(seed)
+    maze, start, end = random_grid(rng, 20, 24, 0.25)
+    weights = rng.integers(1, 10, maze.shape)
+    check(name, maze, start, end, weights)
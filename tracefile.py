@@ -0,0 +1,365 @@
+import json
+import os
+import shutil
+import struct
+import sys
+import tempfile
+
+import numpy as np
+
+# ---------------- Trace Files ---------------- #
+# A recorded run of any visualizer generator, replayable and seekable without
+# recomputing it. Layout (little-endian):
+#   MAGIC, footer offset (u8), footer length (u8)
+#   events          EVENT_DTYPE records, one STEP marker per step followed by
+#                   that step's HIGHLIGHT records
+#   step offsets    int64 [steps + 1, 2], first event and first write of
+#                   each step
+#   writes          WRITE_DTYPE records, every step's writes in order
+#   keyframes       int64 [keyframes, n], full state snapshots
+#   footer          JSON: kind, metadata, the step each keyframe was taken
+#                   after (-1 is the initial state) and the offset of every
+#                   array
+# Arrays start on 64-byte boundaries so the reader can memory-map them.
+# Keyframes are taken every `keyframe_interval` steps, but only once at least
+# n / 4 values were written since the last one, so they never cost more than
+# a small multiple of the write log. Writes are kept apart from the events,
+# so seeking applies only the writes since the nearest keyframe (fewer than
+# n / 4 plus one interval's worth) and never scans the steps between.
+
+MAGIC = b"SORTTRC2"
+HEADER = struct.Struct("<8sQQ")
+ALIGN = 64
+
+STEP, HIGHLIGHT = 0, 1
+EVENT_DTYPE = np.dtype([("op", "u1"), ("index", "<i4"), ("line", "<i2")])
+WRITE_DTYPE = np.dtype([("index", "<i4"), ("value", "<i8")])
+
+KEYFRAME_INTERVAL = 1024
+FLUSH_EVENTS = 1 << 16
+
+def pad_to(f, align=ALIGN):
+    f.write(b"\0" * (-f.tell() % align))
+    return f.tell()
+
+class TraceWriter:
+    def __init__(self, path, kind, initial, meta=None, keyframe_interval=KEYFRAME_INTERVAL):
+        self.path = path
+        self.kind = kind
+        self.meta = meta or {}
+        self.keyframe_interval = keyframe_interval
+        self.state = np.array(initial, dtype=np.int64).ravel()
+        self.shape = list(np.shape(initial))
+
+        self.f = open(path, "wb")
+        self.f.write(HEADER.pack(MAGIC, 0, 0))
+        self.events_at = pad_to(self.f)
+        self.offsets = tempfile.TemporaryFile()
+        self.writes = tempfile.TemporaryFile()
+        self.frames = tempfile.TemporaryFile()
+        self.buffer = []
+        self.write_buffer = []
+        self.offset_buffer = []
+        self.events = 0
+        self.written = 0
+        self.steps = 0
+        self.keyframe_steps = []
+        self.writes_since = 0
+        self.keyframe(-1)
+
+    def keyframe(self, step):
+        self.frames.write(self.state.tobytes())
+        self.keyframe_steps.append(step)
+        self.writes_since = 0
+
+    def step(self, line, highlights=(), writes=()):
+        # writes: (index, value) pairs, applied in order
+        self.offset_buffer.append((self.events, self.written))
+        buf = self.buffer
+        buf.append((STEP, self.steps, line))
+        for i in highlights:
+            buf.append((HIGHLIGHT, i, line))
+        for i, v in writes:
+            self.state[i] = v
+        self.write_buffer.extend(writes)
+        self.events += 1 + len(highlights)
+        self.written += len(writes)
+        self.writes_since += len(writes)
+        if len(buf) + len(self.write_buffer) >= FLUSH_EVENTS:
+            self.flush()
+        if (self.steps - self.keyframe_steps[-1] >= self.keyframe_interval
+                and self.writes_since >= max(1, len(self.state) // 4)):
+            self.keyframe(self.steps)
+        self.steps += 1
+
+    def flush(self):
+        if self.buffer:
+            np.array(self.buffer, dtype=EVENT_DTYPE).tofile(self.f)
+            self.buffer = []
+        if self.write_buffer:
+            np.array(self.write_buffer, dtype=WRITE_DTYPE).tofile(self.writes)
+            self.write_buffer = []
+        if self.offset_buffer:
+            np.array(self.offset_buffer, dtype="<i8").tofile(self.offsets)
+            self.offset_buffer = []
+
+    def close(self):
+        self.offset_buffer.append((self.events, self.written))
+        self.flush()
+        arrays = {"events": [self.events_at, self.events]}
+        for name, src, count in [("offsets", self.offsets, self.steps + 1),
+                                 ("writes", self.writes, self.written),
+                                 ("frames", self.frames, len(self.keyframe_steps))]:
+            arrays[name] = [pad_to(self.f), count]
+            src.seek(0)
+            shutil.copyfileobj(src, self.f)
+            src.close()
+        footer = json.dumps({
+            "kind": self.kind,
+            "meta": self.meta,
+            "shape": self.shape,
+            "n": len(self.state),
+            "steps": self.steps,
+            "keyframe_interval": self.keyframe_interval,
+            "keyframe_steps": self.keyframe_steps,
+            "arrays": arrays
+        }).encode()
+        footer_at = pad_to(self.f)
+        self.f.write(footer)
+        self.f.seek(0)
+        self.f.write(HEADER.pack(MAGIC, footer_at, len(footer)))
+        self.f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        if exc[0] is None:
+            self.close()
+        else:
+            self.f.close()
+            os.remove(self.path)
+
+class Trace:
+    """
+    Read side of a trace file. Every array is a read-only memory map, so
+    opening a large trace costs nothing until steps are actually read.
+    """
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            magic, footer_at, footer_len = HEADER.unpack(f.read(HEADER.size))
+            if magic != MAGIC:
+                raise ValueError(f"{path} is not a trace file")
+            f.seek(footer_at)
+            footer = json.loads(f.read(footer_len))
+        self.path = path
+        self.kind = footer["kind"]
+        self.meta = footer["meta"]
+        self.shape = tuple(footer["shape"])
+        self.n = footer["n"]
+        self.steps = footer["steps"]
+        self.keyframe_steps = np.array(footer["keyframe_steps"], dtype=np.int64)
+
+        arrays = footer["arrays"]
+        offset, count = arrays["events"]
+        self.events = np.memmap(path, EVENT_DTYPE, "r", offset, (count,)) if count else \
+            np.empty(0, EVENT_DTYPE)
+        offset, count = arrays["offsets"]
+        self.offsets = np.memmap(path, "<i8", "r", offset, (count, 2))
+        offset, count = arrays["writes"]
+        self.writes = np.memmap(path, WRITE_DTYPE, "r", offset, (count,)) if count else \
+            np.empty(0, WRITE_DTYPE)
+        offset, count = arrays["frames"]
+        self.frames = np.memmap(path, "<i8", "r", offset, (count, self.n)) if self.n else \
+            np.empty((count, 0), np.int64)
+
+    def __len__(self):
+        return self.steps
+
+    def step(self, s):
+        # (line, highlight indices, write indices, write values) of step s
+        (event, write), (event_end, write_end) = self.offsets[s:s + 2].tolist()
+        ev = self.events[event:event_end]
+        wr = self.writes[write:write_end]
+        return int(ev["line"][0]), ev["index"][ev["op"] == HIGHLIGHT], wr["index"], wr["value"]
+
+    def state_at(self, s):
+        # Full state after step s (s = -1: before the first step), rebuilt
+        # from the nearest earlier keyframe
+        k = np.searchsorted(self.keyframe_steps, s, side="right") - 1
+        state = np.array(self.frames[k])
+        wr = self.writes[self.offsets[self.keyframe_steps[k] + 1, 1]:self.offsets[s + 1, 1]][::-1]
+        # Latest write to each index wins
+        index, first = np.unique(wr["index"], return_index=True)
+        state[index] = wr["value"][first]
+        return state
+
+    def frame(self, s):
+        # (state, highlights, line) as the GUI shows step s
+        line, highlights, _, _ = self.step(s)
+        return self.state_at(s), tuple(highlights.tolist()), line
+
+    def play(self, start=0):
+        # Yields (state, highlights, line) from step `start` on, applying each
+        # step's writes to one state array like a live generator would
+        state = self.state_at(start - 1)
+        for s in range(start, self.steps):
+            line, highlights, index, value = self.step(s)
+            state[index] = value
+            yield state, tuple(highlights.tolist()), line
+
+# ---------------- Recorders ---------------- #
+# Run a generator headless and write its steps. Sorting generators only name
+# the positions they touched, so writes are found by comparing those
+# positions (or, for steps that name none, the whole array) with the values
+# last recorded.
+
+def record_sort(path, alg, arr, meta=None, ascending=True, keyframe_interval=KEYFRAME_INTERVAL):
+    # alg: a sortingalgorithm generator, yielding (arr, positions, step);
+    # the partition colors some steps carry are not recorded
+    arr = list(arr)
+    prev = arr.copy()
+    line = 0
+    with TraceWriter(path, "sort", arr, meta, keyframe_interval) as w:
+        for state, positions, line, *_ in alg(arr, ascending):
+            if positions:
+                changed = [i for i in set(positions) if state[i] != prev[i]]
+            else:
+                changed = [i for i in range(len(state)) if state[i] != prev[i]]
+            for i in changed:
+                prev[i] = state[i]
+            w.step(line, positions, [(i, state[i]) for i in changed])
+        # Anything done after the last yield (e.g. a final reverse)
+        changed = [i for i in range(len(arr)) if arr[i] != prev[i]]
+        if changed:
+            w.step(line, (), [(i, arr[i]) for i in changed])
+    return w.steps
+
+def record_events(path, alg, base, meta=None, keyframe_interval=KEYFRAME_INTERVAL):
+    # alg: a comparesortingalgorithm event generator
+    from comparesortingalgorithm import BLOCK, COMPARE, SWAP, WRITE as EVENT_WRITE
+    arr = list(base)
+    shadow = list(base)
+    with TraceWriter(path, "sort", base, meta, keyframe_interval) as w:
+        for op, a, b in alg(arr):
+            if op == COMPARE:
+                w.step(0, (a, b))
+            elif op == SWAP:
+                shadow[a], shadow[b] = shadow[b], shadow[a]
+                w.step(0, (a, b), [(a, shadow[a]), (b, shadow[b])])
+            elif op == EVENT_WRITE:
+                shadow[a] = b
+                w.step(0, (a,), [(a, b)])
+            elif op == BLOCK:
+                writes = list(zip(a.tolist(), b.tolist()))
+                for i, value in writes:
+                    shadow[i] = value
+                w.step(0, a.tolist(), writes)
+    return w.steps
+
+def record_search(path, search, arr, target, meta=None):
+    # search: a comparesearch generator, yielding (arr, index, line)
+    with TraceWriter(path, "search", arr, dict(meta or {}, target=target)) as w:
+        for _, index, line in search(arr, target):
+            w.step(line, () if index is None else (index,))
+    return w.steps
+
+def record_maze(path, solver, maze, start, end, meta=None, keyframe_interval=KEYFRAME_INTERVAL):
+    # solver: a maze generator, yielding (path, step). The state is two
+    # planes, the maze and a parent for every cell on a recorded path (-1
+    # for none, itself for a root). Each step highlights its path's last cell
+    # and writes the parent links that are new, found by walking the path
+    # back from its last cell to the first link already recorded: solvers
+    # only yield paths to nodes whose parents are final, so the rest of the
+    # path is on record and a step costs the cells it adds, not its length.
+    # A maze.ParentPath is walked by its chain(), which links jump point
+    # search's jump points directly: the cells between them can lie on
+    # several jumps, so they get no parent of their own.
+    rows, cols = maze.shape
+    cells = rows * cols
+    parent = [-1] * cells
+    meta = dict(meta or {}, start=list(start), end=list(end))
+    initial = np.stack([np.asarray(maze), np.full(maze.shape, -1)])
+    with TraceWriter(path, "maze", initial, meta, keyframe_interval) as w:
+        for path_cells, step in solver(maze, start, end):
+            writes = []
+            last = child = None
+            nodes = path_cells.chain() if hasattr(path_cells, "chain") else reversed(path_cells)
+            for r, c in nodes:
+                i = r * cols + c
+                if child is None:
+                    last = i
+                elif parent[child] == i:
+                    break
+                else:
+                    parent[child] = i
+                    writes.append((cells + child, i))
+                child = i
+            else:
+                if child is not None and parent[child] != child:
+                    parent[child] = child
+                    writes.append((cells + child, child))
+            w.step(step, () if last is None else (last,), writes)
+    return w.steps
+
+def maze_path(state, highlights, cols):
+    # The path a maze trace step shows, as flat maze indices from its root:
+    # the highlighted last cell's chain in the parent plane of state, with
+    # the cells between two links on one row or column filled in
+    if not len(highlights):
+        return []
+    parent = state[len(state) // 2:]
+    i = int(highlights[0])
+    path = [i]
+    while parent[i] != i:
+        j = int(parent[i])
+        if i // cols == j // cols:
+            step = 1 if j > i else -1
+        elif (j - i) % cols == 0:
+            step = cols if j > i else -cols
+        else:
+            step = j - i
+        path.extend(range(i + step, j + step, step))
+        i = j
+    path.reverse()
+    return path
+
+# ---------------- Command Line ---------------- #
+
+def main(argv=None):
+    # Imported here: the visualizers import this module for their players
+    import argparse
+    import random
+    from comparesearch import SEARCHES
+    from datasets import PRESETS, generate
+    from sortingalgorithm import SORTS, algorithm_steps
+
+    parser = argparse.ArgumentParser(description="Record a sort or search run to a trace file")
+    parser.add_argument("kind", choices=["sort", "search"])
+    parser.add_argument("algorithm", help="a sortingalgorithm or comparesearch algorithm name")
+    parser.add_argument("output")
+    parser.add_argument("--size", type=int, default=1000)
+    parser.add_argument("--dataset", choices=PRESETS, default="uniform")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--target", type=int, help="search target (default: a random element)")
+    parser.add_argument("--descending", action="store_true")
+    parser.add_argument("--keyframe-interval", type=int, default=KEYFRAME_INTERVAL)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    arr = generate(args.dataset, args.size, seed=args.seed).tolist()
+    meta = {"name": args.algorithm, "dataset": args.dataset, "seed": args.seed}
+    if args.kind == "sort":
+        meta["lines"] = algorithm_steps(args.algorithm, arr, not args.descending)
+        steps = record_sort(args.output, SORTS[args.algorithm], arr, meta,
+                            not args.descending, args.keyframe_interval)
+    else:
+        if args.algorithm == "Binary":
+            arr.sort()
+        target = args.target if args.target is not None else rng.choice(arr)
+        steps = record_search(args.output, SEARCHES[args.algorithm], arr, target, meta)
+    print(f"{steps} steps, {os.path.getsize(args.output)} bytes -> {args.output}", file=sys.stderr)
+
+# -------------------- Main -------------------- #
+if __name__ == "__main__":
+    main()